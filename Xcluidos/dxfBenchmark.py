@@ -0,0 +1,831 @@
+"""Benchmarks for the dxf import modules.
+
+	Run from this folder, e.g.:
+		python dxfBenchmark.py reader --size 50
+		python dxfBenchmark.py lazy --file plan.dxf
+		python dxfBenchmark.py convert
+		python dxfBenchmark.py memory --size 20
+		python dxfBenchmark.py batch --size 10 --count 8
+		python dxfBenchmark.py parallel --size 100
+		python dxfBenchmark.py binary --size 20
+		python dxfBenchmark.py cache --size 20
+		python dxfBenchmark.py spatial --size 10
+		python dxfBenchmark.py select --size 20 --layers 300
+		python dxfBenchmark.py export --entities 100000
+		python dxfBenchmark.py bulk --entities 100000
+		python dxfBenchmark.py binexport --entities 100000
+		python dxfBenchmark.py symbols --entities 20000
+		python dxfBenchmark.py colors --entities 100000
+		python dxfBenchmark.py diff --size 10
+		python dxfBenchmark.py profile --size 10
+
+	Synthetic drawings are written to the temp folder and removed afterwards
+	unless --keep is given.
+"""
+
+import os
+import sys
+import math
+import heapq
+import time
+import random
+import tempfile
+import struct
+import argparse
+import subprocess
+import tracemalloc
+
+import dxfReader
+from dxfReader import Object, convert, get_name, objectify, iter_pairs
+
+
+LAYERS = ['0', 'A-WALL', 'A-DOOR', 'A-GLAZ', 'A-FURN', 'E-POWER', 'E-LIGHT', 'E-COMM']
+
+
+def layer_names(count):
+	"""Returns LAYERS padded with made up names up to count layers, like a big architectural file."""
+	disciplines = ['A', 'S', 'M', 'P', 'E', 'F', 'I', 'L']
+	names = list(LAYERS)
+	while len(names) < count:
+		i = len(names)
+		names.append('%s-%s-%03d' % (disciplines[i % len(disciplines)], 'DETL', i))
+	return names[:max(count, 1)]
+
+
+def _header(out, layers=LAYERS):
+	out.write('999\nsynthetic benchmark drawing\n')
+	out.write('  0\nSECTION\n  2\nHEADER\n')
+	out.write('  9\n$ACADVER\n  1\nAC1015\n  9\n$DWGCODEPAGE\n  3\nANSI_1252\n')
+	out.write('  9\n$INSBASE\n 10\n0.0\n 20\n0.0\n 30\n0.0\n')
+	out.write('  0\nENDSEC\n')
+	out.write('  0\nSECTION\n  2\nTABLES\n')
+	out.write('  0\nTABLE\n  2\nLAYER\n 70\n%d\n' % len(layers))
+	for i, name in enumerate(layers):
+		out.write('  0\nLAYER\n  2\n%s\n 70\n0\n 62\n%d\n  6\nCONTINUOUS\n' % (name, i % 255 + 1))
+	out.write('  0\nENDTAB\n  0\nENDSEC\n')
+	out.write('  0\nSECTION\n  2\nBLOCKS\n')
+	out.write('  0\nBLOCK\n  8\n0\n  2\nTOMA\n 70\n0\n 10\n0.0\n 20\n0.0\n 30\n0.0\n  3\nTOMA\n')
+	out.write('  0\nCIRCLE\n  8\n0\n 10\n0.0\n 20\n0.0\n 30\n0.0\n 40\n75.0\n')
+	out.write('  0\nLINE\n  8\n0\n 10\n-75.0\n 20\n0.0\n 30\n0.0\n 11\n75.0\n 21\n0.0\n 31\n0.0\n')
+	out.write('  0\nENDBLK\n  8\n0\n')
+	out.write('  0\nENDSEC\n')
+
+
+def _entities(rnd, handle, layers=LAYERS):
+	"""Returns a list of dxf strings for a random mix of entities."""
+	r = rnd.random
+	layer = layers[int(r() * len(layers))]
+	x, y = r() * 50000.0, r() * 30000.0
+	kind = int(r() * 7)
+	if kind == 0:
+		return ['  0\nLINE\n  5\n%X\n  8\n%s\n 10\n%.4f\n 20\n%.4f\n 30\n0.0\n 11\n%.4f\n 21\n%.4f\n 31\n0.0\n'
+				% (handle, layer, x, y, x + r() * 1000, y + r() * 1000)]
+	elif kind == 1:
+		n = 4 + int(r() * 5)
+		out = ['  0\nLWPOLYLINE\n  5\n%X\n  8\n%s\n 90\n%d\n 70\n1\n' % (handle, layer, n)]
+		for i in range(n):
+			out.append(' 10\n%.4f\n 20\n%.4f\n' % (x + r() * 500, y + r() * 500))
+			if i % 3 == 0:
+				out.append(' 42\n%.4f\n' % (r() - 0.5))
+		return out
+	elif kind == 2:
+		return ['  0\nCIRCLE\n  5\n%X\n  8\n%s\n 10\n%.4f\n 20\n%.4f\n 30\n0.0\n 40\n%.4f\n'
+				% (handle, layer, x, y, r() * 300)]
+	elif kind == 3:
+		return ['  0\nARC\n  5\n%X\n  8\n%s\n 10\n%.4f\n 20\n%.4f\n 30\n0.0\n 40\n%.4f\n 50\n%.4f\n 51\n%.4f\n'
+				% (handle, layer, x, y, r() * 300, r() * 360, r() * 360)]
+	elif kind == 4:
+		return ['  0\nTEXT\n  5\n%X\n  8\n%s\n 10\n%.4f\n 20\n%.4f\n 30\n0.0\n 40\n150.0\n  1\nT-%d\n'
+				% (handle, layer, x, y, handle)]
+	elif kind == 5:
+		return ['  0\nINSERT\n  5\n%X\n  8\n%s\n  2\nTOMA\n 10\n%.4f\n 20\n%.4f\n 30\n0.0\n 50\n%.1f\n'
+				% (handle, layer, x, y, int(r() * 4) * 90.0)]
+	else:
+		out = ['  0\nPOLYLINE\n  5\n%X\n  8\n%s\n 66\n1\n 10\n0.0\n 20\n0.0\n 30\n0.0\n 70\n0\n' % (handle, layer)]
+		for i in range(3 + int(r() * 4)):
+			out.append('  0\nVERTEX\n  8\n%s\n 10\n%.4f\n 20\n%.4f\n 30\n0.0\n' % (layer, x + r() * 500, y + r() * 500))
+		out.append('  0\nSEQEND\n  8\n%s\n' % layer)
+		return out
+
+
+def write_synthetic_dxf(filename, size_mb=50, seed=0, layers=LAYERS):
+	"""Writes a drawing of roughly size_mb megabytes with a mix of common entities spread over layers."""
+	rnd = random.Random(seed)
+	limit = size_mb * 1024 * 1024
+	with open(filename, 'w', encoding='cp1252', newline='\n') as out:
+		_header(out, layers)
+		out.write('  0\nSECTION\n  2\nENTITIES\n')
+		handle = 0x100
+		while out.tell() < limit:
+			chunk = []
+			for i in range(1000):
+				chunk.extend(_entities(rnd, handle, layers))
+				handle += 1
+			out.write(''.join(chunk))
+		out.write('  0\nENDSEC\n  0\nEOF\n')
+	return filename
+
+
+def write_binary_dxf(filename, binary_filename, encoding='cp1252'):
+	"""Writes the pairs of an ascii dxf file as a binary dxf file (2 byte group codes)."""
+	types = dxfReader.BINARY_TYPES
+	code_format = struct.Struct('<h')
+	number_formats = {'h': struct.Struct('<h'), 'l': struct.Struct('<i'), 'q': struct.Struct('<q'),
+					  'd': struct.Struct('<d'), 'b': struct.Struct('<B')}
+	with open(filename, encoding=encoding) as infile, open(binary_filename, 'wb') as out:
+		out.write(dxfReader.BINARY_SENTINEL)
+		for code, value in iter_pairs(infile):
+			out.write(code_format.pack(code))
+			kind = types[code & 0xffff]
+			if kind == 's':
+				out.write(value.encode(encoding) + b'\x00')
+			elif kind == 'x':
+				chunk = bytes.fromhex(value)
+				out.write(bytes((len(chunk),)) + chunk)
+			elif kind == 'd':
+				out.write(number_formats['d'].pack(float(value)))
+			else:
+				out.write(number_formats[kind].pack(dxfReader._to_int(value)))
+
+
+#---convert as it was before the CONVERTERS table (used as the baseline)
+def legacy_convert(code, value):
+	import sys
+	if 59 < code < 80 or 169 < code < 180 or 269 < code < 290 or 369 < code < 390 or 399 < code < 410 or 1059 < code < 1071:
+		value = int(float(value))
+	elif 89 < code < 100 or 419 < code < 430 or 439 < code < 460 or code == 1071:
+		value = int(float(value))
+	elif 9 < code < 60 or 109 < code < 150 or 209 < code < 240 or 459 < code < 470 or 1009 < code < 1060:
+		value = float(value)
+	elif code == 105 or 309 < code < 380 or 389 < code < 400:
+		try:
+			value = int(value, 16)
+		except:
+			pass
+	return value
+
+
+#---the line based reader as it was before the chunked tokenizer (used as the baseline)
+def _legacy_findObject(infile, kind):
+	obj = False
+	while 1:
+		line = infile.readline()
+		if not line:
+			return False
+		if not obj:
+			if line.lower().strip() == '0':
+				obj = True
+		else:
+			if line.lower().strip() == kind:
+				return Object(line.lower().strip())
+			obj = False
+
+def _legacy_handleObject(infile):
+	line = infile.readline()
+	if line.lower().strip() == 'section':
+		return 'section'
+	elif line.lower().strip() == 'endsec':
+		return 'endsec'
+	obj = Object(line.lower().strip())
+	obj.name = obj.type
+	data = []
+	while 1:
+		line = infile.readline()
+		if not data:
+			if line.lower().strip() == '0':
+				return obj
+			data.append(int(line.lower().strip()))
+		else:
+			data.append(legacy_convert(data[0], line.strip()))
+			obj.data.append(data)
+			data = []
+
+def _legacy_handleNested(parent, infile, start, stop):
+	while 1:
+		obj = _legacy_handleObject(infile)
+		if obj.type == start or obj.type == stop:
+			return parent
+		parent.data.append(obj)
+
+def _legacy_readSection(infile, section):
+	data = []
+	while 1:
+		line = infile.readline()
+		if not data:
+			if line.lower().strip() == '0':
+				break
+			data.append(int(line.lower().strip()))
+		else:
+			data.append(legacy_convert(data[0], line.strip()))
+			section.data.append(data)
+			data = []
+	while 1:
+		obj = _legacy_handleObject(infile)
+		if obj == 'section' or obj == 'endsec':
+			return obj
+		elif obj.type == 'table':
+			item, name = get_name(obj.data)
+			if name:
+				obj.data.remove(item)
+				obj.name = name.lower()
+			section.data.append(_legacy_handleNested(obj, infile, 'table', 'endtab'))
+		elif obj.type == 'block':
+			obj.name = get_name(obj.data)[1]
+			section.data.append(_legacy_handleNested(obj, infile, 'block', 'endblk'))
+		else:
+			section.data.append(obj)
+
+def legacy_readDXF(filename, encoding=None):
+	"""readDXF with the original two-readline()-per-pair tokenizing.
+
+	The codepage restart is replaced by the encoding argument.
+	"""
+	drawing = Object('drawing')
+	with open(filename, encoding=encoding) as infile:
+		while 1:
+			section = _legacy_findObject(infile, 'section')
+			if not section:
+				break
+			if _legacy_readSection(infile, section) == 'endsec':
+				drawing.data.append(section)
+	drawing.name = filename
+	for obj in drawing.data:
+		item, name = get_name(obj.data)
+		if name:
+			obj.data.remove(item)
+			obj.name = name.lower()
+			setattr(drawing, name.lower(), obj)
+			obj.data = objectify(obj.data)
+	return drawing
+
+
+#---helpers
+def dump(obj):
+	"""Returns a comparable nested tuple for a tree of dxf objects and wrappers."""
+	if isinstance(obj, (list, tuple)):
+		return tuple(dump(x) for x in obj)
+	if isinstance(obj, (str, int, float)) or obj is None:
+		return obj
+	attrs = {}
+	if hasattr(obj, '__dict__'):
+		attrs.update(vars(obj))
+	for cls in type(obj).__mro__:
+		for name in getattr(cls, '__slots__', ()):
+			if hasattr(obj, name):
+				attrs[name] = getattr(obj, name)
+	return (type(obj).__name__,) + tuple((k, dump(v)) for k, v in sorted(attrs.items()) if k[0] != '_')
+
+
+def timed(func, *args, **kwargs):
+	"""Returns (seconds, result) for one call of func."""
+	t = time.perf_counter()
+	result = func(*args, **kwargs)
+	return time.perf_counter() - t, result
+
+
+def _report(label, seconds, nbytes):
+	print("%-28s %8.3f s  %8.2f MB/s" % (label, seconds, nbytes / seconds / 1e6))
+
+
+#---benchmarks
+def bench_reader(filename):
+	"""Compares the chunked tokenizer with the line based reader on one file."""
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	probe = dxfReader.LazyDrawing(filename)
+	encoding = probe.encoding
+	probe.close()
+	t_old, old = timed(legacy_readDXF, filename, encoding)
+	_report("legacy readline reader", t_old, nbytes)
+	t_new, new = timed(dxfReader.readDXF, filename)
+	_report("chunked tokenizer", t_new, nbytes)
+	print("speedup: %.2fx" % (t_old / t_new))
+	same = dump(old.data) == dump(new.data)
+	print("identical object tree: %s" % same)
+	return same
+
+
+def bench_lazy(filename):
+	"""Times listing the layers of a file through a lazy drawing against a full read."""
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	t_open, drawing = timed(dxfReader.readDXF, filename, lazy=True)
+	print("%-28s %8.3f s" % ("lazy open + section index", t_open))
+	t_layers, layers = timed(drawing.table, 'layer')
+	print("%-28s %8.3f s  (%d entries)" % ("layer table only", t_layers, len(layers.data)))
+	t_entities, entities = timed(getattr, drawing, 'entities')
+	_report("entities section", t_entities, nbytes)
+	t_full, full = timed(dxfReader.readDXF, filename)
+	_report("full readDXF", t_full, nbytes)
+	drawing.close()
+	return dump(full.entities.data) == dump(entities.data)
+
+
+_RSS_CHILD = """
+import sys, resource, dxfReader
+drawing = dxfReader.readDXF(sys.argv[1], keep_data=sys.argv[2] == 'True')
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+def peak_rss(filename, keep_data):
+	"""Peak resident set size in MB of a fresh interpreter reading filename, None if unknown."""
+	try:
+		output = subprocess.check_output([sys.executable, '-c', _RSS_CHILD, filename, str(keep_data)],
+			cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL)
+	except (OSError, subprocess.CalledProcessError): # no resource module (windows)
+		return None
+	return int(output.split()[-1]) / 1024. # ru_maxrss is in KB on linux
+
+def bench_memory(filename):
+	"""Measures the peak memory of readDXF with and without the raw pair data kept by the wrappers."""
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	# ru_maxrss survives fork + exec, so the children run before this process grows
+	rss = dict((keep_data, peak_rss(filename, keep_data)) for keep_data in (True, False))
+	for keep_data in (True, False):
+		tracemalloc.start()
+		t_read, drawing = timed(dxfReader.readDXF, filename, keep_data=keep_data)
+		current, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		count = len(drawing.entities.data)
+		del drawing
+		print("keep_data=%-5s  %6.2f s  kept %7.1f MB  peak %7.1f MB  %5.0f bytes/entity  peak RSS %s"
+			  % (keep_data, t_read, current / 1e6, peak / 1e6, current / max(count, 1),
+				 '%.1f MB' % rss[keep_data] if rss[keep_data] else 'n/a'))
+
+
+def bench_batch(filenames):
+	"""Compares reading the files one after the other with the process pool of readDXFBatch."""
+	nbytes = sum(os.path.getsize(name) for name in filenames)
+	print("%d files: %.1f MB" % (len(filenames), nbytes / 1e6))
+	t_seq = timed(lambda: [dxfReader.read_payload(name) for name in filenames])[0]
+	_report("sequential", t_seq, nbytes)
+	t_batch, results = timed(dxfReader.readDXFBatch, filenames)
+	_report("process pool", t_batch, nbytes)
+	print("speedup: %.2fx on %d cores" % (t_seq / t_batch, os.cpu_count() or 1))
+	return all(result.error is None for result in results.values())
+
+
+def bench_parallel(filename):
+	"""Compares a sequential read with the entities section split between one worker per core."""
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	t_seq, seq = timed(dxfReader.readDXF, filename)
+	_report("sequential", t_seq, nbytes)
+	t_par, par = timed(dxfReader.readDXF, filename, workers=None)
+	_report("%d workers" % (os.cpu_count() or 1), t_par, nbytes)
+	print("speedup: %.2fx" % (t_seq / t_par))
+	same = dump(seq.entities.data) == dump(par.entities.data)
+	print("identical entities: %s" % same)
+	return same
+
+
+def bench_binary(filename):
+	"""Compares reading an ascii drawing with reading the same drawing saved as binary dxf."""
+	probe = dxfReader.LazyDrawing(filename)
+	encoding = probe.encoding
+	probe.close()
+	fd, binary_filename = tempfile.mkstemp(suffix='.dxf')
+	os.close(fd)
+	try:
+		write_binary_dxf(filename, binary_filename, encoding)
+		nbytes, nbinary = os.path.getsize(filename), os.path.getsize(binary_filename)
+		print("%s: %.1f MB ascii, %.1f MB binary" % (filename, nbytes / 1e6, nbinary / 1e6))
+		t_ascii, ascii = timed(dxfReader.readDXF, filename)
+		_report("ascii", t_ascii, nbytes)
+		t_binary, binary = timed(dxfReader.readDXF, binary_filename)
+		_report("binary", t_binary, nbinary)
+		print("speedup: %.2fx" % (t_ascii / t_binary))
+		same = dump(ascii.data) == dump(binary.data)
+		print("identical object tree: %s" % same)
+	finally:
+		os.remove(binary_filename)
+	return same
+
+
+def bench_cache(filename):
+	"""Times a parse that fills an empty drawing cache against a read served by the cache."""
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	cache = dxfReader.DrawingCache(tempfile.mkdtemp())
+	try:
+		t_key = timed(cache.key, filename)[0]
+		print("%-28s %8.3f s" % ("cache key (content hash)", t_key))
+		t_miss, parsed = timed(dxfReader.readDXF, filename, cache=cache)
+		_report("miss: parse + store", t_miss, nbytes)
+		t_hit, cached = timed(dxfReader.readDXF, filename, cache=cache)
+		_report("hit: load", t_hit, nbytes)
+		print("speedup: %.2fx, entry %.1f MB" % (t_miss / t_hit, cache.stats()['bytes'] / 1e6))
+		print(cache.stats())
+		same = dump(parsed.data) == dump(cached.data)
+		print("identical object tree: %s" % same)
+	finally:
+		cache.clear()
+		os.rmdir(cache.directory)
+	return same
+
+
+def bench_spatial(filename, queries=2000, distance=500.0):
+	"""Times 'entities within distance of a point' with the spatial index against a scan of all bboxes."""
+	from dxfSpatial import SpatialIndex, entity_bbox
+	from dxfBlocks import BlockExpander
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	drawing = dxfReader.readDXF(filename)
+	t_build, index = timed(SpatialIndex.from_drawing, drawing)
+	print("%-28s %8.3f s  (%r)" % ("build index", t_build, index))
+	rnd = random.Random(1)
+	xmin, ymin, xmax, ymax = index.bounds
+	points = [(rnd.uniform(xmin, xmax), rnd.uniform(ymin, ymax)) for i in range(queries)]
+	t_index, found = timed(lambda: [index.near(x, y, distance) for x, y in points])
+	print("%-28s %8.3f s  (%.0f us/query)" % ("index near()", t_index, t_index / queries * 1e6))
+	expander = BlockExpander(drawing.block_index)
+	boxes = [(entity, entity_bbox(entity, expander)) for entity in drawing.entities.data]
+	boxes = [(entity, box) for entity, box in boxes if box is not None]
+	def scan(x, y):
+		return [entity for entity, (x0, y0, x1, y1) in boxes
+				if x0 - distance <= x <= x1 + distance and y0 - distance <= y <= y1 + distance
+				and ((max(x0 - x, 0, x - x1))**2 + (max(y0 - y, 0, y - y1))**2) <= distance**2]
+	sample = points[:max(queries // 20, 1)]
+	t_scan, scanned = timed(lambda: [scan(x, y) for x, y in sample])
+	t_scan *= len(points) / float(len(sample))
+	print("%-28s %8.3f s  (%.0f us/query, extrapolated)" % ("linear scan", t_scan, t_scan / queries * 1e6))
+	print("speedup: %.0fx" % (t_scan / t_index))
+	same = all(list(map(id, a)) == list(map(id, b)) for a, b in zip(found, scanned))
+	print("same results: %s" % same)
+	t_nearest, closest = timed(lambda: [index.nearest(x, y, 5) for x, y in points])
+	print("%-28s %8.3f s  (%.0f us/query)" % ("index nearest(5)", t_nearest, t_nearest / queries * 1e6))
+	def scan_nearest(x, y):
+		return heapq.nsmallest(5, [(math.hypot(max(x0 - x, 0, x - x1), max(y0 - y, 0, y - y1)), i)
+								   for i, (entity, (x0, y0, x1, y1)) in enumerate(boxes)])
+	near_same = all([round(d, 9) for d, entity in a] == [round(d, 9) for d, i in scan_nearest(x, y)]
+					for (x, y), a in zip(sample, closest))
+	print("same nearest distances: %s" % near_same)
+	return same and near_same
+
+
+def bench_select(filename, layer='E-POWER'):
+	"""Times reading a single layer (and a single layer's INSERTs) against a full read."""
+	nbytes = os.path.getsize(filename)
+	print("%s: %.1f MB" % (filename, nbytes / 1e6))
+	t_full, full = timed(dxfReader.readDXF, filename)
+	_report("full read", t_full, nbytes)
+	print("%d entities on %d layers" % (len(full.entities.data), len(set(entity.layer for entity in full.entities.data))))
+	t_layer, selected = timed(dxfReader.readDXF, filename, layers=layer)
+	_report("layers=%s" % layer, t_layer, nbytes)
+	print("%d entities, %.1f%% of the full read time" % (len(selected.entities.data), 100.0 * t_layer / t_full))
+	t_insert, inserts = timed(dxfReader.readDXF, filename, layers=layer, types='INSERT')
+	_report("layers=%s, types=INSERT" % layer, t_insert, nbytes)
+	print("%d entities, %.1f%% of the full read time" % (len(inserts.entities.data), 100.0 * t_insert / t_full))
+	expected = [entity for entity in full.entities.data if entity.layer.upper() == layer.upper()]
+	same = dump(selected.entities.data) == dump(expected)
+	print("same entities as filtering the full read: %s" % same)
+	return same
+
+
+def library_drawing(count, seed=0):
+	"""Returns a dxfLibrary.Drawing with count entities of the common kinds."""
+	import dxfLibrary
+	rnd = random.Random(seed)
+	r = rnd.random
+	block = dxfLibrary.Block('toma')
+	block.append(dxfLibrary.Circle(center=(0, 0, 0), radius=75.0))
+	block.append(dxfLibrary.Line(points=[(-75.0, 0, 0), (75.0, 0, 0)]))
+	drawing = dxfLibrary.Drawing(blocks=[block])
+	for name in LAYERS[1:]:
+		drawing.layers.append(dxfLibrary.Layer(name))
+	for i in range(count):
+		layer = LAYERS[i % len(LAYERS)]
+		x, y = r() * 50000.0, r() * 30000.0
+		kind = i % 6
+		if kind == 0:
+			drawing.append(dxfLibrary.Line(points=[(x, y, 0.0), (x + r() * 1000, y + r() * 1000, 0.0)], layer=layer))
+		elif kind == 1:
+			drawing.append(dxfLibrary.Circle(center=(x, y, 0.0), radius=r() * 300, layer=layer))
+		elif kind == 2:
+			drawing.append(dxfLibrary.Arc(center=(x, y, 0.0), radius=r() * 300, startAngle=r() * 360, endAngle=r() * 360, layer=layer))
+		elif kind == 3:
+			points = [[(x + r() * 500, y + r() * 500, 0.0), 0, [None, None], r() - 0.5] for n in range(8)]
+			drawing.append(dxfLibrary.PolyLine(points, flag70=1, layer=layer))
+		elif kind == 4:
+			points = [[x + r() * 500, y + r() * 500, 0.0, None, None, 0] for n in range(8)]
+			drawing.append(dxfLibrary.LwPolyLine(points, flag=1, layer=layer))
+		else:
+			drawing.append(dxfLibrary.Insert('toma', point=(x, y, 0.0), rotation=int(r() * 4) * 90.0, layer=layer))
+	return drawing
+
+
+def bench_export(count=100000):
+	"""Times Drawing.export (streamed through write_to) against save (whole file built in memory)."""
+	drawing = library_drawing(count)
+	fd, filename = tempfile.mkstemp(suffix='.dxf')
+	os.close(fd)
+	try:
+		results = {}
+		for label, buffer in (("export (streamed)", 0), ("save (in memory)", 1)):
+			seconds = timed(drawing.saveas, filename, buffer)[0]
+			tracemalloc.start() # a second run, tracing slows python down a lot
+			drawing.saveas(filename, buffer)
+			peak = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+			nbytes = os.path.getsize(filename)
+			with open(filename) as infile:
+				results[buffer] = infile.read()
+			print("%-28s %8.3f s  %8.2f MB/s  peak %7.1f MB  (%d entities, %.1f MB)"
+				  % (label, seconds, nbytes / seconds / 1e6, peak / 1e6, count, nbytes / 1e6))
+		same = results[0] == results[1]
+		print("identical files: %s" % same)
+	finally:
+		os.remove(filename)
+	return same
+
+
+def bench_bulk(count=100000):
+	"""Times the array builders of dxfLibrary against one object per entity (or vertex)."""
+	import io
+	import dxfLibrary
+	rnd = random.Random(0)
+	coords = [rnd.random() * 50000.0 for i in range(count * 6)]
+	def write(*objects):
+		stream = io.StringIO()
+		for obj in objects:
+			obj.write_to(stream)
+		return stream.getvalue()
+	lines = [dxfLibrary.Line(points=[coords[i:i+3], coords[i+3:i+6]], layer='E-POWER') for i in range(0, len(coords), 6)]
+	t_lines, text = timed(write, *lines)
+	t_array, bulk = timed(write, dxfLibrary.LineArray(coords, layer='E-POWER'))
+	print("%-28s %8.3f s   LineArray %8.3f s  %5.1fx  same: %s" % ("%d Line" % count, t_lines, t_array, t_lines / t_array, text == bulk))
+	t_fixed, bulk = timed(write, dxfLibrary.LineArray(coords, precision=4, layer='E-POWER'))
+	print("%-28s %8.3f s  %5.1fx" % ("LineArray, precision=4", t_fixed, t_lines / t_fixed))
+	try:
+		import numpy
+		t_numpy, bulk = timed(write, dxfLibrary.LineArray(numpy.array(coords).reshape(-1, 2, 3), layer='E-POWER'))
+		print("%-28s %8.3f s" % ("LineArray from numpy", t_numpy))
+	except ImportError:
+		pass
+	points = [[coords[i], coords[i+1], 0, None, None, 0] for i in range(0, len(coords), 2)]
+	t_objects, text = timed(write, dxfLibrary.LwPolyLine(points, layer='E-POWER'))
+	t_array, bulk = timed(write, dxfLibrary.LwPolyLineArray(coords, layer='E-POWER'))
+	print("%-28s %8.3f s   LwPolyLineArray %8.3f s  %5.1fx  same: %s" % ("LwPolyLine of %d vertices" % len(points), t_objects, t_array, t_objects / t_array, text == bulk))
+
+
+def bench_binary_export(count=100000):
+	"""Times ascii against binary export of dxfLibrary, and reading both back.
+
+	Once for a drawing of one object per entity, once for the same number of
+	lines written by a LineArray.
+	"""
+	import dxfLibrary
+	rnd = random.Random(0)
+	lines = dxfLibrary.Drawing()
+	lines.append(dxfLibrary.LineArray([rnd.random() * 50000.0 for i in range(count * 6)], layer='E-POWER'))
+	fd, filename = tempfile.mkstemp(suffix='.dxf')
+	os.close(fd)
+	try:
+		for label, drawing in (("objects", library_drawing(count)), ("LineArray", lines)):
+			read = {}
+			for binary in (False, True):
+				name = "%s, %s" % (label, "binary" if binary else "ascii")
+				seconds = timed(drawing.saveas, filename, 0, binary)[0]
+				nbytes = os.path.getsize(filename)
+				print("%-28s %8.3f s  %7.1f MB" % (name + " export", seconds, nbytes / 1e6))
+				seconds, read[binary] = timed(dxfReader.readDXF, filename)
+				print("%-28s %8.3f s" % (name + " read", seconds))
+			same = [repr(e) for e in read[False].entities.data] == [repr(e) for e in read[True].entities.data]
+			print("%-28s %s" % ("same entities read back:", same))
+		text = dxfLibrary.Drawing()
+		text.layers.append(dxfLibrary.Layer('Iluminación'))
+		text.append(dxfLibrary.Text('Año, ½ m²', point=(0, 0, 0), layer='Iluminación'))
+		for binary in (False, True):
+			for buffer in (0, 1):
+				text.saveas(filename, buffer, binary)
+				entity = dxfReader.readDXF(filename).entities.data[0]
+				same = (entity.layer, entity.value) == ('Iluminación', 'Año, ½ m²')
+				print("%-28s %s" % ("non ascii %s%s round trip:" % ("binary" if binary else "ascii", ", buffered" if buffer else ""), same))
+	finally:
+		os.remove(filename)
+
+
+def outlet_symbol(x, y, angle):
+	"""Returns the dxfLibrary entities of an outlet symbol at x, y turned by angle degrees."""
+	import dxfLibrary
+	c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+	def point(u, v):
+		return (x + c*u - s*v, y + s*u + c*v, 0.0)
+	return [dxfLibrary.Circle(center=point(0, 0), radius=75.0, layer='E-POWER'),
+			dxfLibrary.Line(points=[point(-75.0, 0), point(75.0, 0)], layer='E-POWER'),
+			dxfLibrary.Line(points=[point(0, 75.0), point(0, 150.0)], layer='E-POWER'),
+			dxfLibrary.Arc(center=point(0, 0), radius=40.0, startAngle=10 + angle, endAngle=170 + angle, layer='E-POWER'),
+			dxfLibrary.PolyLine([[point(u, v), 0] for u, v in ((-50, 100), (50, 100), (50, 130), (-50, 130))], flag70=1, layer='E-POWER')]
+
+
+def bench_symbols(count=20000):
+	"""Times writing count outlets as full geometry against dxfLibrary.Symbols (one block, inserts)."""
+	import dxfLibrary
+	rnd = random.Random(0)
+	outlets = [outlet_symbol(rnd.random() * 50000.0, rnd.random() * 30000.0, rnd.choice((0, 90, 180, 270, rnd.random() * 360)))
+			   for i in range(count)]
+	fd, filename = tempfile.mkstemp(suffix='.dxf')
+	os.close(fd)
+	try:
+		full = dxfLibrary.Drawing()
+		for entities in outlets:
+			full.extend(entities)
+		seconds = timed(full.saveas, filename)[0]
+		print("%-28s %8.3f s  %7.1f MB" % ("full geometry", seconds, os.path.getsize(filename) / 1e6))
+		def build():
+			drawing = dxfLibrary.Drawing()
+			symbols = dxfLibrary.Symbols(drawing)
+			for entities in outlets:
+				symbols.add(entities, layer='E-POWER')
+			return drawing, symbols
+		t_build, (drawing, symbols) = timed(build)
+		seconds = timed(drawing.saveas, filename)[0]
+		print("%-28s %8.3f s  %7.1f MB  (+ %.3f s to find the symbols: %r)"
+			  % ("Symbols", seconds, os.path.getsize(filename) / 1e6, t_build, symbols))
+	finally:
+		os.remove(filename)
+
+
+def bench_colors(count=100000):
+	"""Times the dxfColorMap lookups: ACI -> rgb against the dict, rgb -> nearest ACI against a linear search."""
+	import dxfColorMap
+	rnd = random.Random(0)
+	indices = [rnd.randrange(1, 256) for i in range(count)]
+	t_dict = timed(lambda: [list(dxfColorMap.color_map[i]) for i in indices])[0]
+	t_array = timed(dxfColorMap.aci_to_rgb, indices)[0]
+	print("%-28s %8.3f s   aci_to_rgb %8.3f s  %5.1fx" % ("%d color_map lookups" % count, t_dict, t_array, t_dict / t_array))
+	colors = [(rnd.random(), rnd.random(), rnd.random()) for i in range(min(count, 2000))]
+	t_linear, exact = timed(lambda: [dxfColorMap._nearest_aci(*color) for color in colors])
+	t_first = timed(dxfColorMap.rgb_to_aci, colors[0])[0]
+	t_nearest, found = timed(lambda: [dxfColorMap.rgb_to_aci(color) for color in colors])
+	print("%-28s %8.3f s   rgb_to_aci %8.3f s  %5.0fx  (first call %.4f s, %.0f%% exact)"
+		  % ("%d linear searches" % len(colors), t_linear, t_nearest, t_linear / t_nearest, t_first,
+			 100.0 * sum(a == b for a, b in zip(exact, found)) / len(colors)))
+	t_small, small = timed(dxfColorMap.rgb_to_aci, colors[:dxfColorMap.CUBE_MIN - 1])
+	t_cube = timed(dxfColorMap.aci_cube)[0]
+	many = colors * max(count // len(colors), 1)
+	t_many, batch = timed(dxfColorMap.rgb_to_aci, many)
+	print("%-28s %8.3f s   %d colors %8.3f s  (cube built in %.3f s, %s exact)"
+		  % ("%d colors at once" % len(small), t_small, len(many), t_many, t_cube,
+			 "all" if list(small) == exact[:len(small)] and list(batch) == exact * (len(many) // len(colors)) else "NOT all"))
+	# every palette color must come back as itself, or as the lowest index of the same color
+	palette = [tuple(dxfColorMap.aci_to_rgb([i])[0]) for i in range(1, 256)]
+	wrong = [i for i, rgb in enumerate(palette, 1) if palette[int(dxfColorMap.rgb_to_aci(rgb)) - 1] != rgb
+			 or int(dxfColorMap.rgb_to_aci(rgb)) != palette.index(rgb) + 1]
+	print("%-28s %s" % ("palette round trip", "ok" if not wrong else "WRONG for %r" % wrong))
+
+
+def bench_diff(filename, fraction=0.01):
+	"""Times dxfDiff on a revision of filename changing a fraction of its entities, by handle and by geometry."""
+	import dxfDiff
+	t_read, drawing = timed(dxfReader.readDXF, filename)
+	print("%-28s %8.3f s  (%d entities)" % ("readDXF", t_read, len(drawing.entities.data)))
+	for label, handles in (("by handle", True), ("by geometry", False)):
+		old = dxfReader.readDXF(filename)
+		new = dxfReader.readDXF(filename)
+		for entities in (old.entities.data, new.entities.data):
+			for entity in entities:
+				if not handles and hasattr(entity, 'handle'):
+					entity.handle = None
+		t_snapshot, snapshot = timed(dxfDiff.Snapshot, old)
+		rnd = random.Random(0)
+		entities = new.entities.data
+		changed = rnd.sample(range(len(entities)), int(len(entities) * fraction))
+		for i in changed:
+			entities[i].layer = 'REVISED'
+		t_diff, changes = timed(dxfDiff.diff, snapshot, new)
+		print("%-28s %8.3f s   snapshot %8.3f s  (%d changed: %r)" % ("diff " + label, t_diff, t_snapshot, len(changed), changes))
+
+
+def bench_profile(filename, repeat=3):
+	"""Prints the dxfProfile report of filename and the cost of profiling (best of repeat reads)."""
+	import dxfProfile
+	profile = dxfProfile.ImportProfile(detail=True)
+	dxfReader.readDXF(filename, profile=profile)
+	print(profile.report.summary())
+	t_off = min(timed(dxfReader.readDXF, filename)[0] for i in range(repeat))
+	t_on = min(timed(dxfReader.readDXF, filename, profile=dxfProfile.ImportProfile())[0] for i in range(repeat))
+	print("%-28s %8.3f s   profiled %8.3f s  (%+.1f%%)" % ("readDXF", t_off, t_on, (t_on / t_off - 1) * 100))
+
+
+SAMPLE_DXF = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Lampara de emergencia.dxf')
+
+def _kind(code):
+	converter = dxfReader.CONVERTERS[code] if 0 <= code < dxfReader.MAX_CODE else None
+	return getattr(converter, '__name__', 'str').strip('_')
+
+def bench_convert(filename=SAMPLE_DXF, repeat=200):
+	"""Times convert against the range-check version over the (code, value) pairs of a real file.
+
+	The pairs keep the code distribution of the file; the time is also split by value type.
+	"""
+	with open(filename, encoding='utf-8', errors='replace') as infile:
+		pairs = [pair for pair in iter_pairs(infile) if pair[0]]
+	print("%s: %d pairs x %d" % (os.path.basename(filename), len(pairs), repeat))
+	groups = {'all': pairs}
+	for pair in pairs:
+		groups.setdefault(_kind(pair[0]), []).append(pair)
+	for label, group in sorted(groups.items(), key=lambda item: -len(item[1])):
+		def run(func, group=group):
+			for i in range(repeat):
+				for code, value in group:
+					func(code, value)
+		t_old = timed(run, legacy_convert)[0]
+		t_new = timed(run, convert)[0]
+		n = len(group) * repeat
+		print("%-8s %7d pairs  legacy %6.0f ns/pair  table %6.0f ns/pair  speedup %.2fx"
+			  % (label, len(group), t_old / n * 1e9, t_new / n * 1e9, t_old / t_new))
+	assert all(legacy_convert(c, v) == convert(c, v) for c, v in pairs)
+
+
+def _synthetic(args):
+	if args.file:
+		return args.file, False
+	fd, filename = tempfile.mkstemp(suffix='.dxf')
+	os.close(fd)
+	print("writing synthetic drawing...")
+	write_synthetic_dxf(filename, args.size, layers=layer_names(args.layers))
+	return filename, not args.keep
+
+
+def bench_batch_files(args):
+	if args.file:
+		bench_batch(dxfReader.batch_files(args.file))
+		return
+	print("writing %d synthetic drawings..." % args.count)
+	filenames = []
+	try:
+		for i in range(args.count):
+			fd, filename = tempfile.mkstemp(suffix='.dxf')
+			os.close(fd)
+			filenames.append(filename)
+			# one big floor and smaller ones, like the levels of a building
+			write_synthetic_dxf(filename, args.size if i == 0 else max(1, args.size // 2), seed=i)
+		bench_batch(filenames)
+	finally:
+		if not args.keep:
+			for filename in filenames:
+				os.remove(filename)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('benchmark', choices=['reader', 'lazy', 'convert', 'memory', 'batch', 'parallel', 'binary', 'cache', 'spatial', 'select', 'export', 'bulk', 'binexport', 'symbols', 'colors', 'diff', 'profile'])
+	parser.add_argument('--file', help="existing dxf file instead of a synthetic one (a glob for batch)")
+	parser.add_argument('--size', type=int, default=50, help="size of the synthetic drawing in MB")
+	parser.add_argument('--keep', action='store_true', help="keep the synthetic drawing")
+	parser.add_argument('--count', type=int, default=8, help="number of synthetic drawings for batch")
+	parser.add_argument('--layers', type=int, default=len(LAYERS), help="number of layers of the synthetic drawing")
+	parser.add_argument('--entities', type=int, default=100000, help="number of entities written by export")
+	args = parser.parse_args(argv)
+	if args.benchmark == 'convert':
+		bench_convert(args.file or SAMPLE_DXF)
+		return
+	if args.benchmark == 'batch':
+		bench_batch_files(args)
+		return
+	if args.benchmark == 'export':
+		bench_export(args.entities)
+		return
+	if args.benchmark == 'bulk':
+		bench_bulk(args.entities)
+		return
+	if args.benchmark == 'binexport':
+		bench_binary_export(args.entities)
+		return
+	if args.benchmark == 'symbols':
+		bench_symbols(args.entities)
+		return
+	if args.benchmark == 'colors':
+		bench_colors(args.entities)
+		return
+	filename, remove = _synthetic(args)
+	try:
+		if args.benchmark == 'reader':
+			bench_reader(filename)
+		elif args.benchmark == 'lazy':
+			bench_lazy(filename)
+		elif args.benchmark == 'memory':
+			bench_memory(filename)
+		elif args.benchmark == 'parallel':
+			bench_parallel(filename)
+		elif args.benchmark == 'binary':
+			bench_binary(filename)
+		elif args.benchmark == 'cache':
+			bench_cache(filename)
+		elif args.benchmark == 'spatial':
+			bench_spatial(filename)
+		elif args.benchmark == 'select':
+			bench_select(filename)
+		elif args.benchmark == 'diff':
+			bench_diff(filename)
+		elif args.benchmark == 'profile':
+			bench_profile(filename)
+	finally:
+		if remove:
+			os.remove(filename)
+
+
+if __name__ == "__main__":
+	main()
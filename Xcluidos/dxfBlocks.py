@@ -0,0 +1,263 @@
+"""This module expands the INSERTs of an imported dxf drawing into world geometry.
+
+	The geometry of each block is flattened once (nested inserts included) into a
+	single packed array of x, y, z coordinates; every INSERT is then resolved by
+	transforming that array with the affine matrices of the insert, one matrix per
+	copy of its rows x columns array.  numpy is used for the transform when it is
+	available (it ships with FreeCAD), plain python otherwise.
+
+	Typical use:
+		drawing = dxfReader.readDXF(filename)
+		expander = BlockExpander(drawing.block_index)
+		for insert in drawing.entities.get_type('insert'):
+			for entity, points in expander.expand(insert).iter_entities():
+				...
+"""
+
+from math import sin, cos, radians, sqrt
+from array import array
+
+try:
+	import numpy
+except ImportError: # the pure python transform is used
+	numpy = None
+
+from dxfImportObjects import (Line, LWpolyline, Polyline, Circle, Arc, Ellipse, Text, Mtext,
+	Face, Insert, Block, block_index, POLYLINE_3D, POLYGON_MESH, POLYFACE_MESH)
+
+
+IDENTITY = (1.0, 0.0, 0.0, 0.0,
+			0.0, 1.0, 0.0, 0.0,
+			0.0, 0.0, 1.0, 0.0)
+
+
+def ocs_matrix(extrusion):
+	"""Returns the 3x4 matrix (a flat 12-tuple, rows first) from the Object Coordinate System to world.
+
+	Uses the arbitrary axis algorithm of the dxf reference.
+	"""
+	nx, ny, nz = extrusion
+	length = sqrt(nx*nx + ny*ny + nz*nz)
+	if not length or (nx == 0 and ny == 0 and nz > 0):
+		return IDENTITY
+	nx, ny, nz = nx / length, ny / length, nz / length
+	if abs(nx) < 1 / 64. and abs(ny) < 1 / 64.:
+		ax, ay, az = nz, 0.0, -nx # world Y x N
+	else:
+		ax, ay, az = -ny, nx, 0.0 # world Z x N
+	length = sqrt(ax*ax + ay*ay + az*az)
+	ax, ay, az = ax / length, ay / length, az / length
+	bx, by, bz = ny*az - nz*ay, nz*ax - nx*az, nx*ay - ny*ax # N x Ax
+	return (ax, bx, nx, 0.0,
+			ay, by, ny, 0.0,
+			az, bz, nz, 0.0)
+
+
+def multiply(a, b):
+	"""Returns the 3x4 matrix a * b (b applied first)."""
+	return (a[0]*b[0] + a[1]*b[4] + a[2]*b[8], a[0]*b[1] + a[1]*b[5] + a[2]*b[9],
+			a[0]*b[2] + a[1]*b[6] + a[2]*b[10], a[0]*b[3] + a[1]*b[7] + a[2]*b[11] + a[3],
+			a[4]*b[0] + a[5]*b[4] + a[6]*b[8], a[4]*b[1] + a[5]*b[5] + a[6]*b[9],
+			a[4]*b[2] + a[5]*b[6] + a[6]*b[10], a[4]*b[3] + a[5]*b[7] + a[6]*b[11] + a[7],
+			a[8]*b[0] + a[9]*b[4] + a[10]*b[8], a[8]*b[1] + a[9]*b[5] + a[10]*b[9],
+			a[8]*b[2] + a[9]*b[6] + a[10]*b[10], a[8]*b[3] + a[9]*b[7] + a[10]*b[11] + a[11])
+
+
+def insert_matrices(insert):
+	"""Returns the block -> world matrices of an INSERT, one per copy of its rows x columns array.
+
+	A block point p (relative to the block base point) goes to
+		OCS(extrusion) * (loc + R(rotation) * (S(scale) * p + array offset))
+	"""
+	sx, sy, sz = insert.scale
+	angle = radians(insert.rotation)
+	c, s = cos(angle), sin(angle)
+	ocs = ocs_matrix(insert.extrusion)
+	(rows, rspace), (columns, cspace) = insert.rows, insert.columns
+	x, y, z = insert.loc
+	matrices = []
+	for row in range(max(int(rows), 1)):
+		for column in range(max(int(columns), 1)):
+			ox, oy = column * cspace, row * rspace
+			local = (c*sx, -s*sy, 0.0, x + c*ox - s*oy,
+					 s*sx, c*sy, 0.0, y + s*ox + c*oy,
+					 0.0, 0.0, sz, z)
+			matrices.append(multiply(ocs, local))
+	return matrices
+
+
+def transform(coords, matrices):
+	"""Applies each matrix to the packed x, y, z coords; returns the copies one after the other.
+
+	With numpy this is one vectorized operation and a numpy array is returned,
+	otherwise an array('d').
+	"""
+	if numpy is not None:
+		points = numpy.frombuffer(coords, dtype=float).reshape(-1, 3)
+		m = numpy.array(matrices, dtype=float).reshape(-1, 3, 4)
+		out = numpy.einsum('mij,nj->mni', m[:, :, :3], points) + m[:, None, :, 3]
+		return out.ravel()
+	out = array('d')
+	for a, b, c, d, e, f, g, h, i, j, k, l in matrices:
+		for n in range(0, len(coords), 3):
+			x, y, z = coords[n], coords[n+1], coords[n+2]
+			out.extend((a*x + b*y + c*z + d, e*x + f*y + g*z + h, i*x + j*y + k*z + l))
+	return out
+
+
+def entity_points(entity):
+	"""Returns the defining points of a wrapped entity in world (block) coordinates.
+
+	Lines, faces and polylines give their vertices, circles, arcs and texts their
+	location, ellipses their center and the end of their major axis.  None for
+	entities without geometry.
+	"""
+	if isinstance(entity, (Line, Face)):
+		return [tuple(point) for point in entity.points]
+	if isinstance(entity, LWpolyline):
+		xy, z = entity.coords, entity.elevation
+		points = [(xy[n], xy[n+1], z) for n in range(0, len(xy), 2)]
+	elif isinstance(entity, Polyline):
+		xyz = entity.coords
+		if entity.flags & (POLYLINE_3D | POLYGON_MESH | POLYFACE_MESH):
+			return [(xyz[n], xyz[n+1], xyz[n+2]) for n in range(0, len(xyz), 3)] # world coordinates
+		z = entity.elevation # 2d polylines are flat in their OCS
+		points = [(xyz[n], xyz[n+1], z) for n in range(0, len(xyz), 3)]
+	elif isinstance(entity, Ellipse):
+		x, y, z = entity.loc
+		mx, my, mz = entity.major
+		return [(x, y, z), (x + mx, y + my, z + mz)] # ellipses are defined in world coordinates
+	elif isinstance(entity, (Circle, Arc, Text, Mtext)):
+		points = [tuple(entity.loc)]
+	else:
+		return None
+	matrix = ocs_matrix(entity.extrusion)
+	if matrix is IDENTITY:
+		return points
+	a, b, c, d, e, f, g, h, i, j, k, l = matrix
+	return [(a*x + b*y + c*z + d, e*x + f*y + g*z + h, i*x + j*y + k*z + l) for x, y, z in points]
+
+
+class FlatBlock(object):
+	"""The geometry of a block flattened once.
+
+	coords holds the x, y, z of every point, base point subtracted; items is a list
+	of (entity, start, count) telling which points (start and count in points, not
+	in floats) belong to which entity.  Entities of nested blocks are included,
+	already placed by their inserts.
+	"""
+	__slots__ = ('name', 'coords', 'items')
+
+	def __init__(self, name):
+		self.name = name
+		self.coords = array('d')
+		self.items = []
+
+	def __len__(self):
+		return len(self.coords) // 3
+
+	def __repr__(self):
+		return "%s: name - %s, entities - %d, points - %d" %(self.__class__.__name__, self.name, len(self.items), len(self))
+
+
+class InsertGeometry(object):
+	"""The world geometry of one INSERT.
+
+	coords holds flat.coords transformed once per copy of the insert array (copies
+	of them), each copy laid out like flat.coords so flat.items index every copy.
+	Radii and angles are not in coords: scale them by insert.scale and turn them by
+	insert.rotation.
+	"""
+	__slots__ = ('insert', 'flat', 'coords', 'copies')
+
+	def __init__(self, insert, flat, coords, copies):
+		self.insert = insert
+		self.flat = flat
+		self.coords = coords
+		self.copies = copies
+
+	def iter_entities(self):
+		"""Yields (entity, points) for every entity of every copy, points as (x, y, z) tuples."""
+		coords = self.coords
+		size = len(self.flat)
+		for copy in range(self.copies):
+			for entity, start, count in self.flat.items:
+				first = 3 * (copy * size + start)
+				yield entity, [tuple(coords[n:n+3]) for n in range(first, first + 3 * count, 3)]
+
+	def __repr__(self):
+		return "%s: block - %s, copies - %d" %(self.__class__.__name__, self.flat.name, self.copies)
+
+
+class BlockExpander(object):
+	"""Expands INSERTs with memoized flattened blocks.
+
+	blocks is a dict of block name -> Block (drawing.block_index), or a list holding
+	Block objects (drawing.blocks.data).
+	"""
+
+	def __init__(self, blocks):
+		if not isinstance(blocks, dict):
+			blocks = block_index(blocks)
+		self.blocks = blocks
+		self._flat = {}
+		self._active = set() # blocks being flattened, to catch cycles
+
+	def flatten(self, name):
+		"""Returns the FlatBlock of the block called name (None for an unknown block)."""
+		flat = self._flat.get(name)
+		if flat is not None:
+			return flat
+		block = self.blocks.get(name)
+		if block is None:
+			print("Warning: block %s not found!" % name)
+			return None
+		self._active.add(name)
+		try:
+			flat = FlatBlock(name)
+			base = bx, by, bz = block.loc
+			for entity in block.entities.data:
+				if isinstance(entity, Insert):
+					if entity.block in self._active:
+						print("Warning: recursive insert of block %s in block %s skipped!" %(entity.block, name))
+						continue
+					nested = self.flatten(entity.block)
+					if nested is None or not len(nested):
+						continue
+					# nested points are relative to the nested base point already
+					coords = transform(nested.coords, insert_matrices(entity))
+					offset = len(flat)
+					for copy in range(len(coords) // len(nested.coords)):
+						for item, start, count in nested.items:
+							flat.items.append((item, offset + copy * len(nested) + start, count))
+					flat.coords.extend(float(coords[n]) - base[n % 3] for n in range(len(coords)))
+					continue
+				points = entity_points(entity)
+				if points:
+					flat.items.append((entity, len(flat), len(points)))
+					for x, y, z in points:
+						flat.coords.extend((x - bx, y - by, z - bz))
+		finally:
+			self._active.discard(name)
+		self._flat[name] = flat
+		return flat
+
+	def expand(self, insert):
+		"""Returns the InsertGeometry of insert, or None if its block is unknown."""
+		flat = self.flatten(insert.block)
+		if flat is None:
+			return None
+		matrices = insert_matrices(insert)
+		return InsertGeometry(insert, flat, transform(flat.coords, matrices), len(matrices))
+
+	def expand_all(self, entities):
+		"""Yields the InsertGeometry of each resolvable INSERT in entities (e.g. drawing.entities.data)."""
+		for entity in entities:
+			if isinstance(entity, Insert):
+				geometry = self.expand(entity)
+				if geometry is not None:
+					yield geometry
+
+
+if __name__ == "__main__":
+	print("No example yet!")
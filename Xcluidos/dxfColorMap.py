@@ -280,3 +280,140 @@ color_map = {
     254:[0.7421875, 0.7421875, 0.7421875],
     255:[0.99609375, 0.99609375, 0.99609375],
 }
+
+
+# --------------------------------------------------------------------------
+# lookup arrays
+# --------------------------------------------------------------------------
+
+try:
+    import numpy
+except ImportError: # plain tuples and a memoized linear search
+    numpy = None
+
+CUBE_SIZE = 32 # cells per channel of the nearest color cube
+
+if numpy is not None:
+    COLORS = numpy.ascontiguousarray([color_map[i] for i in range(256)], dtype=float) # 256 x 3
+else:
+    COLORS = tuple([tuple(color_map[i]) for i in range(256)])
+
+CUBE_NARROW = 8 # candidates kept in the narrow cube, most cells have fewer
+CUBE_MIN = 1000 # fewer colors are searched over the whole palette, the cube takes over a second to build
+
+_cube = None
+_narrow = None # first CUBE_NARROW candidates of each cell, and whether that is all of them
+_nearest = {} # rgb -> aci, without numpy
+
+
+def aci_to_rgb(indices):
+    """Returns the r, g, b colors (0.0 - 1.0) of an array or sequence of ACI indices, in one call.
+
+    Negative indices (layers turned off) give the color of their absolute value,
+    256 (BYLAYER) wraps to 0.  With numpy an n x 3 array is returned, a list of
+    tuples otherwise.
+    """
+    if numpy is not None:
+        return COLORS.take(numpy.abs(numpy.asarray(indices, dtype=int)) % 256, axis=0)
+    return [COLORS[abs(int(i)) % 256] for i in indices]
+
+
+def _nearest_aci(r, g, b):
+    """Returns the ACI index (1 - 255) of the color nearest to r, g, b by a linear search."""
+    best, nearest = None, 7
+    for i in range(1, 256):
+        cr, cg, cb = COLORS[i]
+        d = (cr - r)**2 + (cg - g)**2 + (cb - b)**2
+        if best is None or d < best:
+            best, nearest = d, i
+    return nearest
+
+
+def aci_cube():
+    """Returns the CUBE_SIZE**3 cube of candidate ACI indices of each cell, built on first use (needs numpy, ~1.5 s).
+
+    The cube is CUBE_SIZE x CUBE_SIZE x CUBE_SIZE x k: the colors that can be
+    the nearest to some point of the cell, in ascending order, padded by
+    repeating the last one.  A color qualifies when its distance to the cell
+    box is not more than the smallest distance to the farthest corner.
+    """
+    global _cube
+    if _cube is None:
+        side = 1.0 / CUBE_SIZE
+        lows = numpy.arange(CUBE_SIZE) * side
+        cells = numpy.stack(numpy.meshgrid(lows, lows, lows, indexing='ij'), axis=-1).reshape(-1, 3)
+        colors = COLORS[1:] # 0 is BYBLOCK, not a color
+        candidates = []
+        for start in range(0, len(cells), 4096):
+            low = cells[start:start + 4096, None, :]
+            high = low + side
+            near = ((numpy.clip(colors[None, :, :], low, high) - colors[None, :, :])**2).sum(axis=2)
+            far = (numpy.maximum(colors[None, :, :] - low, high - colors[None, :, :])**2).sum(axis=2)
+            bound = far.min(axis=1)
+            candidates.extend(numpy.nonzero(row)[0] + 1 for row in near <= bound[:, None] + 1e-12)
+        width = max(len(row) for row in candidates)
+        cube = numpy.empty((len(candidates), width), dtype=numpy.uint8)
+        for i, row in enumerate(candidates):
+            cube[i, :len(row)] = row
+            cube[i, len(row):] = row[-1]
+        _cube = cube.reshape(CUBE_SIZE, CUBE_SIZE, CUBE_SIZE, width)
+    return _cube
+
+
+def _narrow_cube():
+    """Returns (narrow, complete): the flat cube cut to CUBE_NARROW candidates and which cells it holds entirely."""
+    global _narrow
+    if _narrow is None:
+        cube = aci_cube().reshape(CUBE_SIZE**3, -1)
+        width = min(CUBE_NARROW, cube.shape[1])
+        _narrow = (numpy.ascontiguousarray(cube[:, :width]), (cube[:, width - 1:] == cube[:, -1:]).all(axis=1))
+    return _narrow
+
+
+def _nearest_of(found, rgb):
+    """Returns the nearest color to each row of rgb among the candidates of the same row of found."""
+    d = ((COLORS[found] - rgb[:, None, :])**2).sum(axis=2)
+    return found[numpy.arange(len(found)), d.argmin(axis=1)]
+
+
+def _nearest_all(rgb):
+    """Returns the nearest color to each row of rgb, searched over the whole palette."""
+    d = ((COLORS[None, 1:, :] - rgb[:, None, :])**2).sum(axis=2)
+    return d.argmin(axis=1) + 1
+
+
+def rgb_to_aci(colors):
+    """Returns the nearest ACI index of an r, g, b color (0.0 - 1.0, like a ShapeColor), or an array of them for n colors.
+
+    A 4th (alpha) component is ignored.  With numpy fewer than CUBE_MIN
+    colors are compared with the whole palette at once; for more the cell of
+    each color in aci_cube() gives a few candidates and the nearest of them to
+    the exact color is taken, the same answer as a linear search over the
+    palette.  Without numpy every new color is searched once.
+    """
+    single = not hasattr(colors[0], '__len__')
+    if numpy is not None:
+        if single:
+            return int(_nearest_all(numpy.asarray(colors[:3], dtype=float)[None, :])[0])
+        rgb = numpy.asarray(colors, dtype=float)[:, :3]
+        if len(rgb) < CUBE_MIN:
+            return _nearest_all(rgb)
+        cube = aci_cube()
+        cells = numpy.clip((rgb * CUBE_SIZE).astype(int), 0, CUBE_SIZE - 1)
+        cells = (cells[:, 0] * CUBE_SIZE + cells[:, 1]) * CUBE_SIZE + cells[:, 2]
+        narrow, complete = _narrow_cube()
+        result = _nearest_of(narrow[cells], rgb)
+        wide = numpy.nonzero(~complete[cells])[0] # the few cells with more candidates
+        if len(wide):
+            result[wide] = _nearest_of(cube.reshape(CUBE_SIZE**3, -1)[cells[wide]], rgb[wide])
+        return result
+    if single:
+        colors = [colors]
+    found = []
+    for color in colors:
+        key = tuple(color[:3])
+        aci = _nearest.get(key)
+        if aci is None:
+            aci = _nearest[key] = _nearest_aci(*key)
+        found.append(aci)
+    return found[0] if single else found
@@ -0,0 +1,175 @@
+"""This module compares an imported dxf drawing with a snapshot of a previous import.
+
+	A Snapshot keeps a key and a fingerprint for every entity of a drawing.  The
+	key is the entity handle (group 5); entities without a handle are keyed by
+	their fingerprint, so for them a modification shows as one removed and one
+	added entity.  The fingerprint is a hash of the wrapper values (geometry,
+	layer, color...), an INSERT also takes the fingerprint of its block so
+	editing a block modifies its inserts.  Only the FreeCAD objects of the
+	added, removed and modified entities need to be touched after a revision.
+
+	Typical use:
+		drawing = dxfReader.readDXF(filename)
+		changes = dxfDiff.diff(dxfDiff.Snapshot.load(snapshot_file), drawing)
+		for key, entity in changes.added + changes.modified:
+			...
+		for key in changes.removed:
+			...
+		changes.snapshot.save(snapshot_file)
+"""
+
+import os
+import pickle
+import hashlib
+
+from dxfImportObjects import Object, Insert
+
+
+SKIPPED_SLOTS = ('data', 'handle') # not part of the fingerprint
+
+
+def _digest(text):
+	return hashlib.blake2b(text.encode('utf-8', 'replace'), digest_size=12).digest()
+
+
+def fingerprint(entity, blocks=None):
+	"""Returns the hash (12 bytes) of the values of a wrapped entity.
+
+	blocks is a dict of block name -> block fingerprint (see block_fingerprints),
+	used for INSERTs.  repr is hashed rather than pickled: its output does not
+	depend on which equal strings are the same object.
+	"""
+	if isinstance(entity, Object):
+		return _digest(repr((entity.type, entity.data)))
+	values = [getattr(entity, name, None) for name in entity.__slots__ if name not in SKIPPED_SLOTS]
+	if blocks is not None and isinstance(entity, Insert):
+		values.append(blocks.get(entity.block))
+	return _digest(repr(values))
+
+
+def block_fingerprints(block_index):
+	"""Returns a dict of block name -> fingerprint of its entities, nested blocks included."""
+	prints = {}
+	def visit(name, active):
+		if name in prints:
+			return prints[name]
+		block = block_index.get(name)
+		if block is None or name in active: # unknown or recursive
+			return None
+		active.add(name)
+		for entity in block.entities.data:
+			if isinstance(entity, Insert):
+				visit(entity.block, active)
+		active.discard(name)
+		prints[name] = _digest(repr([fingerprint(entity, prints) for entity in block.entities.data if type(entity) != list]))
+		return prints[name]
+	for name in block_index:
+		visit(name, set())
+	return prints
+
+
+def iter_keys(drawing):
+	"""Yields (key, fingerprint, entity) for the entities of drawing (a drawing or a list of entities)."""
+	entities = getattr(drawing, 'entities', drawing)
+	entities = getattr(entities, 'data', entities)
+	blocks = block_fingerprints(getattr(drawing, 'block_index', None) or {})
+	seen = {}
+	for entity in entities:
+		if type(entity) == list:
+			continue
+		digest = fingerprint(entity, blocks)
+		handle = getattr(entity, 'handle', None)
+		if handle is None:
+			for item in entity.data if isinstance(entity, Object) else ():
+				if type(item) == list and item[0] == 5:
+					handle = item[1]
+					break
+		if handle is None:
+			count = seen.get(digest, 0) # identical entities without handles
+			seen[digest] = count + 1
+			yield (digest, count), digest, entity
+		else:
+			yield handle, digest, entity
+
+
+class Snapshot(object):
+	"""The keys and fingerprints of the entities of an imported drawing."""
+
+	def __init__(self, drawing=None):
+		self.prints = {} # key -> fingerprint
+		if drawing is not None:
+			for key, digest, entity in iter_keys(drawing):
+				self.prints[key] = digest
+
+	def __len__(self):
+		return len(self.prints)
+
+	def save(self, filename):
+		"""Pickles the snapshot to filename (written to a temporary file first)."""
+		temp = filename + '.tmp'
+		with open(temp, 'wb') as outfile:
+			pickle.dump(self.prints, outfile, pickle.HIGHEST_PROTOCOL)
+		os.replace(temp, filename)
+
+	@classmethod
+	def load(cls, filename):
+		"""Returns the snapshot saved to filename, an empty one if there is none."""
+		snapshot = cls()
+		try:
+			with open(filename, 'rb') as infile:
+				snapshot.prints = pickle.load(infile)
+		except (OSError, EOFError, pickle.UnpicklingError) as error:
+			if os.path.exists(filename):
+				print("Warning: snapshot %s could not be read, every entity is new! (%s)" % (filename, error))
+		return snapshot
+
+	def __repr__(self):
+		return "%s: entities - %d" %(self.__class__.__name__, len(self.prints))
+
+
+class DrawingDiff(object):
+	"""The changes of a drawing against a snapshot.
+
+	added and modified hold (key, entity) pairs of the new drawing, removed the
+	keys of the entities gone; snapshot is the snapshot of the new drawing.
+	"""
+	__slots__ = ('added', 'removed', 'modified', 'unchanged', 'snapshot')
+
+	def __init__(self):
+		self.added = []
+		self.removed = []
+		self.modified = []
+		self.unchanged = 0
+		self.snapshot = Snapshot()
+
+	def __len__(self):
+		return len(self.added) + len(self.removed) + len(self.modified)
+
+	def __repr__(self):
+		return "%s: added - %d, removed - %d, modified - %d, unchanged - %d" %(self.__class__.__name__,
+			len(self.added), len(self.removed), len(self.modified), self.unchanged)
+
+
+def diff(snapshot, drawing):
+	"""Compares drawing (a drawing or a list of entities) with snapshot, returns a DrawingDiff."""
+	changes = DrawingDiff()
+	old = snapshot.prints
+	new = changes.snapshot.prints
+	for key, digest, entity in iter_keys(drawing):
+		if key in new:
+			print("Warning: handle %s found twice, the second entity is taken as new!" % (key,))
+			key = (digest, key)
+		new[key] = digest
+		previous = old.get(key)
+		if previous is None:
+			changes.added.append((key, entity))
+		elif previous != digest:
+			changes.modified.append((key, entity))
+		else:
+			changes.unchanged += 1
+	changes.removed = [key for key in old if key not in new]
+	return changes
+
+
+if __name__ == "__main__":
+	print("No example yet!")
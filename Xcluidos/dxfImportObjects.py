@@ -30,6 +30,7 @@
 # ***** END GPL LICENCE BLOCK *****
 # --------------------------------------------------------------------------
 from math import *
+from array import array
 
 
 # from Stani's dxf writer v1.1 (c)www.stani.be (GPL)
@@ -91,11 +92,12 @@ TOP         = 3
 class Object:
     """Empty container class for dxf objects"""
     
-    def __init__(self, _type=''):
+    def __init__(self, _type='', block=False):
         """_type expects a string value."""
         self.type = _type
         self.name = ''
         self.data = []
+        self._index = None
     
     def __str__(self):
         if self.name:
@@ -106,27 +108,53 @@ class Object:
     def __repr__(self):
         return str(self.data)
     
+    def get_index(self):
+        """Returns a dict mapping each code (and sub-object type) of self.data to its values, in order.
+        
+        The index is built by a single pass on first use and rebuilt only if data was replaced or resized.
+        """
+        index = self.__dict__.get('_index')
+        if index is None or index[0] is not self.data or index[1] != len(self.data):
+            values = {}
+            for item in self.data:
+                if type(item) == list:
+                    key, value = item[0], item[1]
+                else:
+                    key, value = item.type, item
+                if key in values:
+                    values[key].append(value)
+                else:
+                    values[key] = [value]
+            index = self._index = (self.data, len(self.data), values)
+        return index[2]
+    
     def get_type(self, kind=''):
         """Despite the name, this method actually returns all objects of type 'kind' from self.data."""
-        if type:
-            objects = []
-            for item in self.data:
-                if type(item) != list and item.type == kind:
-                    # we want this type of object
-                    objects.append(item)
-                elif type(item) == list and item[0] == kind:
-                    # we want this type of data
-                    objects.append(item[1])
-            return objects
+        return list(self.get_index().get(kind, ()))
+    
+    def get_first(self, kind, default=None):
+        """Returns the first value of type 'kind' from self.data, or default."""
+        values = self.get_index().get(kind)
+        if values:
+            return values[0]
+        return default
+    
+    def get_last(self, kind, default=None):
+        """Returns the last value of type 'kind' from self.data, or default."""
+        values = self.get_index().get(kind)
+        if values:
+            return values[-1]
+        return default
     
 
 class Layer:
     """Class for objects representing dxf layers."""
+    __slots__ = ('type', 'data', 'name', 'color', 'flags', 'frozen')
     
     def __init__(self, obj):
         """Expects an entity object of type line as input."""
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
         
         self.name = obj.get_type(2)[0]
         try:
@@ -146,56 +174,36 @@ class Layer:
 
 class Line:
     """Class for objects representing dxf lines."""
+    __slots__ = ('type', 'data', 'handle', 'space', 'color_index', 'layer', 'points')
     
     def __init__(self, obj):
         """Expects an entity object of type line as input."""
         if not obj.type == 'line':
             raise TypeError("Wrong type %s for line object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5) # None in files without handles
         
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
         
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
         
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
+        self.layer = obj.get_first(8, '0')
         
-        self.points = self.get_points(obj.data)
+        self.points = self.get_points(obj)
     
     
     
     
-    def get_points(self, data):
+    def get_points(self, obj):
         """Gets start and end points for a line type object.
         
         Lines have a fixed number of points (two) and fixed codes for each value.
         """
         
         # start x, y, z and end x, y, z = 0
-        sx, sy, sz, ex, ey, ez = 0, 0, 0, 0, 0, 0
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                sx = item[1]
-            elif item[0] == 20: # 20 = y
-                sy = item[1]
-            elif item[0] == 30: # 30 = z
-                sz = item[1]
-            elif item[0] == 11: # 11 = x
-                ex = item[1]
-            elif item[0] == 21: # 21 = y
-                ey = item[1]
-            elif item[0] == 31: # 31 = z
-                ez = item[1]
-        return [[sx, sy, sz], [ex, ey, ez]]
+        get = obj.get_last
+        return [[get(10, 0), get(20, 0), get(30, 0)], [get(11, 0), get(21, 0), get(31, 0)]]
     
     
     
@@ -206,55 +214,41 @@ class Line:
 
 class LWpolyline:
     """Class for objects representing dxf LWpolylines."""
+    __slots__ = ('type', 'data', 'handle', 'num_points', 'space', 'color_index', 'elevation', 'flags',
+                 'closed', 'layer', 'coords', 'widths', 'bulges', 'extrusion')
     
     def __init__(self, obj):
         """Expects an entity object of type lwpolyline as input."""
         if not obj.type == 'lwpolyline':
             raise TypeError("Wrong type %s for polyline object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.num_points = obj.get_type(90)[0]
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        self.elevation = obj.get_type(38)
-        if self.elevation:
-            self.elevation = self.elevation[0]
-        else:
-            self.elevation = 0
+        self.elevation = obj.get_first(38, 0)
             
-        self.flags = obj.get_type(70)
-        if self.flags:
-            self.flags = self.flags[0]
-        else:
-            self.flags = 0
+        self.flags = obj.get_first(70, 0)
         
         self.closed = self.flags&1 # byte coded, 1 = closed, 128 = plinegen
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.points = self.get_points(obj.data)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.coords, self.widths, self.bulges = self.get_points(obj)
+        self.extrusion = self.get_extrusion(obj)
     
     
     
     
     
     
-    def get_points(self, data):
-        """Gets points for a polyline type object.
+    def get_points(self, obj):
+        """Gets packed vertex arrays for a polyline type object.
         
         Polylines have no fixed number of verts, and 
         each vert can have a number of properties.
@@ -265,42 +259,55 @@ class LWpolyline:
         41:endwidth or 0
         42:bulge or 0
         for each vert
+        
+        Returns (coords, widths, bulges): coords holds x, y pairs, widths holds 
+        start width, end width pairs and bulges one value per vert.
         """
-        num = self.num_points
-        point = None
+        coords = array('d')
+        widths = array('d')
+        bulges = array('d')
+        for item in obj.data:
+            code = item[0]
+            if code == 10:   # 10 = x
+                coords.append(item[1])
+                coords.append(0.0)
+                widths.append(0.0)
+                widths.append(0.0)
+                bulges.append(0.0)
+            elif not bulges:
+                continue
+            elif code == 20: # 20 = y
+                coords[-1] = item[1]
+            elif code == 40: # 40 = start width
+                widths[-2] = item[1]
+            elif code == 41: # 41 = end width
+                widths[-1] = item[1]
+            elif code == 42: # 42 = bulge
+                bulges[-1] = item[1]
+        return coords, widths, bulges
+    
+    
+    def get_vertices(self):
+        """Returns a list of Vertex objects built from the packed vertex arrays."""
+        coords, widths, bulges = self.coords, self.widths, self.bulges
         points = []
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                if point:
-                    points.append(point)
-                point = Vertex()
-                point.x = item[1]
-            elif item[0] == 20: # 20 = y
-                point.y = item[1]
-            elif item[0] == 40: # 40 = start width
-                point.swidth = item[1]
-            elif item[0] == 41: # 41 = end width
-                point.ewidth = item[1]
-            elif item[0] == 42: # 42 = bulge
-                point.bulge = item[1]
-        points.append(point)
+        for i in range(len(bulges)):
+            point = Vertex()
+            point.loc = [coords[2*i], coords[2*i+1], 0]
+            point.swidth, point.ewidth = widths[2*i], widths[2*i+1]
+            point.bulge = bulges[i]
+            points.append(point)
         return points
     
+    points = property(get_vertices)
+    
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -309,65 +316,97 @@ class LWpolyline:
 
 
 class Polyline:
-    """Class for objects representing dxf LWpolylines."""
+    """Class for objects representing dxf polylines.
+    
+    The vertices are kept in packed arrays filled by add_vertex: coords holds x, y, z 
+    triples, widths start width, end width pairs, bulges and vertex_flags one value per vert.
+    """
+    __slots__ = ('type', 'data', 'handle', 'space', 'color_index', 'elevation', 'flags', 'closed',
+                 'layer', 'extrusion', 'coords', 'widths', 'bulges', 'vertex_flags')
     
     def __init__(self, obj):
         """Expects an entity object of type polyline as input."""
         if not obj.type == 'polyline':
             raise TypeError("Wrong type %s for polyline object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
-        self.points = []
+        self.data = obj.data
+        self.handle = obj.get_first(5)
+        self.coords = array('d')
+        self.widths = array('d')
+        self.bulges = array('d')
+        self.vertex_flags = array('l')
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        self.elevation = obj.get_type(30)
-        if self.elevation:
-            self.elevation = self.elevation[0]
-        else:
-            self.elevation = 0
+        self.elevation = obj.get_first(30, 0)
             
-        self.flags = obj.get_type(70)
-        if self.flags:
-            self.flags = self.flags[0]
-        else:
-            self.flags = 0
+        self.flags = obj.get_first(70, 0)
         
         self.closed = self.flags&1 # byte coded, 1 = closed, 128 = plinegen
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.extrusion = self.get_extrusion(obj)
+    
+    
+    
     
     
+    def add_vertex(self, obj):
+        """Appends an entity object of type vertex to the packed vertex arrays.
+        
+        Same codes as Vertex.get_props, but no Vertex object is created.
+        """
+        if not obj.type == 'vertex':
+            raise TypeError("Wrong type %s for vertex object!" %obj.type)
+        x = y = z = swidth = ewidth = bulge = 0.0
+        flags = 0
+        for item in obj.data:
+            code = item[0]
+            if code == 10:   # 10 = x
+                x = item[1]
+            elif code == 20: # 20 = y
+                y = item[1]
+            elif code == 30: # 30 = z
+                z = item[1]
+            elif code == 40: # 40 = start width
+                swidth = item[1]
+            elif code == 41: # 41 = end width
+                ewidth = item[1]
+            elif code == 42: # 42 = bulge
+                bulge = item[1]
+            elif code == 70: # 70 = vert flags
+                flags = item[1]
+        self.coords.extend((x, y, z))
+        self.widths.extend((swidth, ewidth))
+        self.bulges.append(bulge)
+        self.vertex_flags.append(flags)
+    
+    
+    def get_vertices(self):
+        """Returns a list of Vertex objects built from the packed vertex arrays."""
+        coords, widths, bulges = self.coords, self.widths, self.bulges
+        points = []
+        for i in range(len(bulges)):
+            point = Vertex()
+            point.loc = [coords[3*i], coords[3*i+1], coords[3*i+2]]
+            point.swidth, point.ewidth = widths[2*i], widths[2*i+1]
+            point.bulge = bulges[i]
+            point.flags = self.vertex_flags[i]
+            points.append(point)
+        return points
     
+    points = property(get_vertices)
     
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -377,6 +416,7 @@ class Polyline:
 
 class Vertex(object):
     """Generic vertex object used by polylines (and maybe others)."""
+    __slots__ = ('type', 'data', 'loc', 'bulge', 'swidth', 'ewidth', 'flags')
     
     def __init__(self, obj=None):
         """Initializes vertex data.
@@ -393,12 +433,12 @@ class Vertex(object):
             if not obj.type == 'vertex':
                 raise TypeError("Wrong type %s for vertex object!" %obj.type)
             self.type = obj.type
-            self.data = obj.data[:]
+            self.data = obj.data
             
-            self.get_props(obj.data)
+            self.get_props(obj)
     
     
-    def get_props(self, data):
+    def get_props(self, obj):
         """Gets coords for a vertex type object.
         
         Each vert can have a number of properties.
@@ -409,7 +449,7 @@ class Vertex(object):
         41:endwidth or 0
         42:bulge or 0
         """
-        for item in data:
+        for item in obj.data:
             if item[0] == 10:   # 10 = x
                 self.x = item[1]
             elif item[0] == 20: # 20 = y
@@ -481,70 +521,44 @@ class Vertex(object):
 
 class Text:
     """Class for objects representing dxf Text."""
+    __slots__ = ('type', 'data', 'handle', 'height', 'value', 'space', 'color_index', 'rotation', 'width_factor',
+                 'oblique', 'halignment', 'valignment', 'layer', 'loc', 'extrusion')
     
     def __init__(self, obj):
         """Expects an entity object of type text as input."""
         if not obj.type == 'text':
             raise TypeError("Wrong type %s for text object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.height = obj.get_type(40)[0]
         self.value = obj.get_type(1)[0] # The text string value
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        self.rotation = obj.get_type(50) # radians?
-        if not self.rotation:
-            self.rotation = 0
-        else:
-            self.rotation = self.rotation[0]
+        self.rotation = obj.get_first(50, 0) # radians?
         
-        self.width_factor = obj.get_type(41) # Scaling factor along local x axis
-        if not self.width_factor:
-            self.width_factor = 1
-        else:
-            self.width_factor = self.width_factor[0]
+        self.width_factor = obj.get_first(41, 1) # Scaling factor along local x axis
         
-        self.oblique = obj.get_type(51) # skew in degrees -90 <= oblique <= 90
-        if not self.oblique:
-            self.oblique = 0
-        else:
-            self.oblique = self.oblique[0]
+        self.oblique = obj.get_first(51, 0) # skew in degrees -90 <= oblique <= 90
         
-        self.halignment = obj.get_type(72) # horiz. alignment
-        if not self.halignment:  # 0=left, 1=center, 2=right, 3=aligned, 4=middle, 5=fit
-            self.halignment = 0
-        else:
-            self.halignment = self.halignment[0]
+        self.halignment = obj.get_first(72, 0) # horiz. alignment 0=left, 1=center, 2=right, 3=aligned, 4=middle, 5=fit
             
-        self.valignment = obj.get_type(73) # vert. alignment
-        if not self.valignment:  # 0=baseline, 1=bottom, 2=middle, 3=top
-            self.valignment = 0
-        else:
-            self.valignment = self.valignment[0]
+        self.valignment = obj.get_first(73, 0) # vert. alignment 0=baseline, 1=bottom, 2=middle, 3=top
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data, self.halignment, self.valignment)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj, self.halignment, self.valignment)
+        self.extrusion = self.get_extrusion(obj)
     
     
     
     
-    def get_loc(self, data, halign, valign):
+    def get_loc(self, obj, halign, valign):
         """Gets adjusted location for text type objects.
         
         If group 72 and/or 73 values are nonzero then the first alignment point values
@@ -556,39 +570,20 @@ class Text:
         I don't know how to calc text size...
         """
         # bottom left x, y, z and justification x, y, z = 0
-        x, y, z, jx, jy, jz = 0, 0, 0, 0, 0, 0
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                x = item[1]
-            elif item[0] == 20: # 20 = y
-                y = item[1]
-            elif item[0] == 30: # 30 = z
-                z = item[1]
-            elif item[0] == 11: # 11 = x
-                jx = item[1]
-            elif item[0] == 21: # 21 = y
-                jy = item[1]
-            elif item[0] == 31: # 31 = z
-                jz = item[1]
+        get = obj.get_last
+        x, y, z = get(10, 0), get(20, 0), get(30, 0)
+        jx, jy, jz = get(11, 0), get(21, 0), get(31, 0)
                 
         if halign or valign:
             x, y, z = jx, jy, jz
         return [x, y, z]
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -598,69 +593,46 @@ class Text:
 
 class Mtext:
     """Class for objects representing dxf Mtext."""
+    __slots__ = ('type', 'data', 'handle', 'height', 'width', 'alignment', 'value', 'space', 'color_index',
+                 'rotation', 'width_factor', 'line_space', 'layer', 'loc', 'extrusion')
     
     def __init__(self, obj):
         """Expects an entity object of type mtext as input."""
         if not obj.type == 'mtext':
             raise TypeError("Wrong type %s for mtext object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.height = obj.get_type(40)[0]
         self.width = obj.get_type(41)[0]
         self.alignment = obj.get_type(71)[0] # alignment 1=TL, 2=TC, 3=TR, 4=ML, 5=MC, 6=MR, 7=BL, 8=BC, 9=BR
-        self.value = self.get_text(obj.data) # The text string value
+        self.value = self.get_text(obj) # The text string value
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        self.rotation = obj.get_type(50) # radians
-        if not self.rotation:
-            self.rotation = 0
-        else:
-            self.rotation = self.rotation[0]
+        self.rotation = obj.get_first(50, 0) # radians
         
-        self.width_factor = obj.get_type(42) # Scaling factor along local x axis
-        if not self.width_factor:
-            self.width_factor = 1
-        else:
-            self.width_factor = self.width_factor[0]
+        self.width_factor = obj.get_first(42, 1) # Scaling factor along local x axis
         
-        self.line_space = obj.get_type(44) # percentage of default
-        if not self.line_space:
-            self.line_space = 1
-        else:
-            self.line_space = self.line_space[0]
+        self.line_space = obj.get_first(44, 1) # percentage of default
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj)
+        self.extrusion = self.get_extrusion(obj)
     
     
     
     
     
-    def get_text(self, data):
+    def get_text(self, obj):
         """Reconstructs mtext data from dxf codes."""
-        primary = ''
-        secondary = []
-        for item in data:
-            if item[0] == 1: # There should be only one primary...
-                primary = item[1]
-            elif item[0] == 3: # There may be any number of extra strings (in order)
-                secondary.append(item[1])
+        primary = obj.get_last(1, '') # There should be only one primary...
+        secondary = obj.get_type(3) # There may be any number of extra strings (in order)
         if not primary:
             #raise ValueError("Empty Mtext Object!")
             string = "Empty Mtext Object!"
@@ -670,38 +642,22 @@ class Mtext:
             string = ''.join(secondary)+primary
             string = string.replace(r'\P', '\n')
         return string    
-    def get_loc(self, data):
+    def get_loc(self, obj):
         """Gets location for a mtext type objects.
         
         Mtext objects have only one point indicating location.
         """
-        loc = [0,0,0]
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                loc[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                loc[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(10, 0), obj.get_last(20, 0), obj.get_last(30, 0)]
     
     
     
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -711,70 +667,47 @@ class Mtext:
 
 class Circle:
     """Class for objects representing dxf Circles."""
+    __slots__ = ('type', 'data', 'handle', 'radius', 'space', 'color_index', 'layer', 'loc', 'extrusion')
     
     def __init__(self, obj):
         """Expects an entity object of type circle as input."""
         if not obj.type == 'circle':
             raise TypeError("Wrong type %s for circle object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.radius = obj.get_type(40)[0]
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj)
+        self.extrusion = self.get_extrusion(obj)
     
     
     
     
     
-    def get_loc(self, data):
+    def get_loc(self, obj):
         """Gets the center location for circle type objects.
         
         Circles have a single coord location.
         """
-        loc = [0, 0, 0]
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                loc[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                loc[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(10, 0), obj.get_last(20, 0), obj.get_last(30, 0)]
     
     
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -784,13 +717,16 @@ class Circle:
 
 class Arc:
     """Class for objects representing dxf arcs."""
+    __slots__ = ('type', 'data', 'handle', 'radius', 'start_angle', 'end_angle', 'space', 'color_index', 'layer',
+                 'loc', 'extrusion')
     
     def __init__(self, obj):
         """Expects an entity object of type arc as input."""
         if not obj.type == 'arc':
             raise TypeError("Wrong type %s for arc object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.radius = obj.get_type(40)[0]
@@ -798,58 +734,33 @@ class Arc:
         self.end_angle = obj.get_type(51)[0]
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj)
+        self.extrusion = self.get_extrusion(obj)
     
     
     
     
     
-    def get_loc(self, data):
+    def get_loc(self, obj):
         """Gets the center location for arc type objects.
         
         Arcs have a single coord location.
         """
-        loc = [0, 0, 0]
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                loc[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                loc[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(10, 0), obj.get_last(20, 0), obj.get_last(30, 0)]
     
     
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -859,29 +770,22 @@ class Arc:
 
 class BlockRecord:
     """Class for objects representing dxf block_records."""
+    __slots__ = ('type', 'data', 'name', 'insertion_units', 'insert_units')
     
     def __init__(self, obj):
         """Expects an entity object of type block_record as input."""
         if not obj.type == 'block_record':
             raise TypeError("Wrong type %s for block_record object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
         
         # required data
         self.name = obj.get_type(2)[0]
         
         # optional data (with defaults)
-        self.insertion_units = obj.get_type(70)
-        if not self.insertion_units:
-            self.insertion_units = None
-        else:
-            self.insertion_units = self.insertion_units[0]
+        self.insertion_units = obj.get_first(70, None)
             
-        self.insert_units = obj.get_type(1070)
-        if not self.insert_units:
-            self.insert_units = None
-        else:
-            self.insert_units = self.insert_units[0]
+        self.insert_units = obj.get_first(1070, None)
         
     
     
@@ -896,66 +800,37 @@ class BlockRecord:
 
 class Block:
     """Class for objects representing dxf blocks."""
+    __slots__ = ('type', 'data', 'flags', 'entities', 'name', 'path', 'discription', 'layer', 'loc')
     
     def __init__(self, obj):
         """Expects an entity object of type block as input."""
         if not obj.type == 'block':
             raise TypeError("Wrong type %s for block object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
         
         # required data
-        if obj.get_type(70):
-            self.flags = obj.get_type(70)[0]
-        else:
-            self.flags = 0
+        self.flags = obj.get_first(70, 0)
         self.entities = Object('block_contents')
         self.entities.data = objectify([ent for ent in obj.data if type(ent) != list])
         
         # optional data (with defaults)
-        self.name = obj.get_type(3)
-        if self.name:
-            self.name = self.name[0]
-        else:
-            self.name = obj.get_type(2)
-            if self.name:
-                self.name = self.name[0]
-            else:
-                self.name = 'blank'
+        self.name = obj.get_first(3, obj.get_first(2, 'blank'))
             
-        self.path = obj.get_type(1)
-        if self.path:
-            self.path = self.path[0]
-        else:
-            self.path = ''
+        self.path = obj.get_first(1, '')
             
-        self.discription = obj.get_type(4)
-        if self.discription:
-            self.discription = self.discription[0]
-        else:
-            self.discription = ''
+        self.discription = obj.get_first(4, '')
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj)
     
     
     
     
     
-    def get_loc(self, data):
+    def get_loc(self, obj):
         """Gets the insert point of the block."""
-        loc = [0, 0, 0]
-        for item in data:
-            if type(item) != list:
-                continue
-            if item[0] == 10:   # 10 = x
-                loc[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                loc[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(10, 0), obj.get_last(20, 0), obj.get_last(30, 0)]
     
     
     
@@ -967,112 +842,70 @@ class Block:
 
 class Insert:
     """Class for objects representing dxf inserts."""
+    __slots__ = ('type', 'data', 'handle', 'block', 'rotation', 'space', 'color_index', 'layer', 'loc', 'scale',
+                 'rows', 'columns', 'extrusion')
     
     def __init__(self, obj):
         """Expects an entity object of type insert as input."""
         if not obj.type == 'insert':
             raise TypeError("Wrong type %s for insert object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.block = obj.get_type(2)[0]
         
         # optional data (with defaults)
-        self.rotation = obj.get_type(50)
-        if self.rotation:
-            self.rotation = self.rotation[0]
-        else:
-            self.rotation = 0
+        self.rotation = obj.get_first(50, 0)
         
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
         
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data)
-        self.scale = self.get_scale(obj.data)
-        self.rows, self.columns = self.get_array(obj.data)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj)
+        self.scale = self.get_scale(obj)
+        self.rows, self.columns = self.get_array(obj)
+        self.extrusion = self.get_extrusion(obj)
     
     
     
     
     
-    def get_loc(self, data):
+    def get_loc(self, obj):
         """Gets the center location for circle type objects.
         
         Circles have a single coord location.
         """
-        loc = [0, 0, 0]
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                loc[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                loc[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(10, 0), obj.get_last(20, 0), obj.get_last(30, 0)]
     
     
     
-    def get_scale(self, data):
+    def get_scale(self, obj):
         """Gets the x/y/z scale factor for the block.
         """
-        scale = [1, 1, 1]
-        for item in data:
-            if item[0] == 41:   # 41 = x scale
-                scale[0] = item[1]
-            elif item[0] == 42: # 42 = y scale
-                scale[1] = item[1]
-            elif item[0] == 43: # 43 = z scale
-                scale[2] = item[1]
-        return scale
+        # 41 = x scale, 42 = y scale, 43 = z scale
+        return [obj.get_last(41, 1), obj.get_last(42, 1), obj.get_last(43, 1)]
     
     
     
-    def get_array(self, data):
+    def get_array(self, obj):
         """Returns the pair (row number, row spacing), (column number, column spacing)."""
-        columns = 1
-        rows = 1
-        cspace = 0
-        rspace = 0
-        for item in data:
-            if item[0] == 70:   # 70 = columns
-                columns = item[1]
-            elif item[0] == 71: # 71 = rows
-                rows = item[1]
-            if item[0] == 44:   # 44 = columns
-                cspace = item[1]
-            elif item[0] == 45: # 45 = rows
-                rspace = item[1]
+        columns = obj.get_last(70, 1) # 70 = columns
+        rows = obj.get_last(71, 1)    # 71 = rows
+        cspace = obj.get_last(44, 0)  # 44 = column spacing
+        rspace = obj.get_last(45, 0)  # 45 = row spacing
         return (rows, rspace), (columns, cspace)
     
     
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -1083,13 +916,16 @@ class Insert:
 
 class Ellipse:
     """Class for objects representing dxf ellipses."""
+    __slots__ = ('type', 'data', 'handle', 'ratio', 'start_angle', 'end_angle', 'space', 'color_index', 'layer',
+                 'loc', 'major', 'extrusion', 'radius')
     
     def __init__(self, obj):
         """Expects an entity object of type ellipse as input."""
         if not obj.type == 'ellipse':
             raise TypeError("Wrong type %s for ellipse object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # required data
         self.ratio = obj.get_type(40)[0]
@@ -1097,76 +933,43 @@ class Ellipse:
         self.end_angle = obj.get_type(42)[0]
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
             
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
             
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.loc = self.get_loc(obj.data)
-        self.major = self.get_major(obj.data)
-        self.extrusion = self.get_extrusion(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.loc = self.get_loc(obj)
+        self.major = self.get_major(obj)
+        self.extrusion = self.get_extrusion(obj)
         self.radius = sqrt(self.major[0]**2 + self.major[0]**2 + self.major[0]**2)
     
     
     
     
-    def get_loc(self, data):
+    def get_loc(self, obj):
         """Gets the center location for arc type objects.
         
         Arcs have a single coord location.
         """
-        loc = [0, 0, 0]
-        for item in data:
-            if item[0] == 10:   # 10 = x
-                loc[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                loc[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(10, 0), obj.get_last(20, 0), obj.get_last(30, 0)]
     
     
     
-    def get_major(self, data):
+    def get_major(self, obj):
         """Gets the major axis for ellipse type objects.
         
         The ellipse major axis defines the rotation of the ellipse and its radius.
         """
-        loc = [0, 0, 0]
-        for item in data:
-            if item[0] == 11:   # 11 = x
-                loc[0] = item[1]
-            elif item[0] == 21: # 21 = y
-                loc[1] = item[1]
-            elif item[0] == 31: # 31 = z
-                loc[2] = item[1]
-        return loc
+        return [obj.get_last(11, 0), obj.get_last(21, 0), obj.get_last(31, 0)]
     
     
     
-    def get_extrusion(self, data):
+    def get_extrusion(self, obj):
         """Find the axis of extrusion.
         
         Used to get the objects Object Coordinate System (ocs).
         """
-        vec = [0,0,1]
-        for item in data:
-            if item[0] == 210:   # 210 = x
-                vec[0] = item[1]
-            elif item[0] == 220: # 220 = y
-                vec[1] = item[1]
-            elif item[0] == 230: # 230 = z
-                vec[2] = item[1]
-        return vec
+        return [obj.get_last(210, 0), obj.get_last(220, 0), obj.get_last(230, 1)]
     
     
     def __repr__(self):
@@ -1176,74 +979,40 @@ class Ellipse:
 
 class Face:
     """Class for objects representing dxf 3d faces."""
+    __slots__ = ('type', 'data', 'handle', 'space', 'color_index', 'layer', 'points')
     
     def __init__(self, obj):
         """Expects an entity object of type 3dfaceplot as input."""
         if not obj.type == '3dface':
             raise TypeError("Wrong type %s for 3dface object!" %obj.type)
         self.type = obj.type
-        self.data = obj.data[:]
+        self.data = obj.data
+        self.handle = obj.get_first(5)
         
         # optional data (with defaults)
-        self.space = obj.get_type(67)
-        if self.space:
-            self.space = self.space[0]
-        else:
-            self.space = 0
+        self.space = obj.get_first(67, 0)
         
-        self.color_index = obj.get_type(62)
-        if self.color_index:
-            self.color_index = self.color_index[0]
-        else:
-            self.color_index = BYLAYER
+        self.color_index = obj.get_first(62, BYLAYER)
         
-        discard, self.layer, discard_index = get_layer(obj.data)
-        del obj.data[discard_index]
-        self.points = self.get_points(obj.data)
+        self.layer = obj.get_first(8, '0')
+        self.points = self.get_points(obj)
     
     
     
     
-    def get_points(self, data):
+    def get_points(self, obj):
         """Gets 3-4 points for a 3d face type object.
         
         Faces have three or optionally four verts.
         """
         
-        a = [0, 0, 0]
-        b = [0, 0, 0]
-        c = [0, 0, 0]
+        get = obj.get_last
+        a = [get(10, 0), get(20, 0), get(30, 0)]
+        b = [get(11, 0), get(21, 0), get(31, 0)]
+        c = [get(12, 0), get(22, 0), get(32, 0)]
         d = False
-        for item in data:
-            # ----------- a -------------
-            if item[0] == 10:   # 10 = x
-                a[0] = item[1]
-            elif item[0] == 20: # 20 = y
-                a[1] = item[1]
-            elif item[0] == 30: # 30 = z
-                a[2] = item[1]
-            # ----------- b -------------
-            elif item[0] == 11: # 11 = x
-                b[0] = item[1]
-            elif item[0] == 21: # 21 = y
-                b[1] = item[1]
-            elif item[0] == 31: # 31 = z
-                b[2] = item[1]
-            # ----------- c -------------
-            elif item[0] == 12: # 12 = x
-                c[0] = item[1]
-            elif item[0] == 22: # 22 = y
-                c[1] = item[1]
-            elif item[0] == 32: # 32 = z
-                c[2] = item[1]
-            # ----------- d -------------
-            elif item[0] == 13: # 13 = x
-                d = [0, 0, 0]
-                d[0] = item[1]
-            elif item[0] == 23: # 23 = y
-                d[1] = item[1]
-            elif item[0] == 33: # 33 = z
-                d[2] = item[1]
+        if 13 in obj.get_index():
+            d = [get(13, 0), get(23, 0), get(33, 0)]
         out = [a,b,c]
         if d:
             out.append(d)
@@ -1300,21 +1069,55 @@ type_map = {
     '3dface':Face
 }
 
-def objectify(data):
+def drop_data(objects):
+    """Releases the raw [code, value] data kept by the wrapper objects in objects.
+    
+    Blocks are handled recursively, objects of unknown type keep their data 
+    since it is all there is of them.
+    """
+    for obj in objects:
+        if type(obj) == list or isinstance(obj, Object):
+            continue
+        obj.data = None
+        if obj.type == 'block':
+            drop_data(obj.entities.data)
+
+
+def block_index(objects):
+    """Returns a dict mapping block names to the Block objects found in objects (a blocks section's data)."""
+    index = {}
+    for obj in objects:
+        if isinstance(obj, Block) and obj.name not in index:
+            index[obj.name] = obj
+    return index
+
+
+def objectify(data, keep_data=True, clock=None):
     """Expects a section type object's data as input.
     
-    Maps object data to the correct object type.
+    Maps object data to the correct object type.  With keep_data False the wrappers 
+    do not keep the raw pair data, and the items of data are released as they are 
+    consumed so the raw tree and the wrappers are not both held in memory.
+    clock, if given, is called with the type of every object once it is done 
+    (and with None first), see dxfProfile.ImportProfile.clock.
     """
     objects = [] # colector for finished objects
     known_types = type_map.keys() # so we don't have to call foo.keys() every iteration
     index = 0
+    if clock is not None:
+        clock(None)
     while index < len(data):
         item = data[index]
+        if not keep_data:
+            data[index] = None
         if type(item) != list and item.type in known_types:
             # proccess the object and append the resulting object
-            objects.append(type_map[item.type](item))
+            entity = type_map[item.type](item)
+            if not keep_data:
+                drop_data((entity,))
+            objects.append(entity)
         elif type(item) != list and item.type == 'table':
-            item.data = objectify(item.data) # tables have sub-objects
+            item.data = objectify(item.data, keep_data) # tables have sub-objects
             objects.append(item)
         elif type(item) != list and item.type == 'polyline':
             pline = Polyline(item)
@@ -1322,18 +1125,23 @@ def objectify(data):
                 index += 1
                 item = data[index]
                 if item.type == 'vertex':
-                    v = Vertex(item)
-                    pline.points.append(v)
+                    pline.add_vertex(item)
                 elif item.type == 'seqend':
                     break
                 else:
                     print("Error: non-vertex found before seqend!")
                     index -= 1
                     break
+                if not keep_data:
+                    data[index] = None
+            if not keep_data:
+                pline.data = None
             objects.append(pline)
         else:
             # we will just let the data pass un-harrased
             objects.append(item)
+        if clock is not None and type(objects[-1]) != list:
+            clock(objects[-1].type)
         index += 1
     return objects    
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 #dxfLibrary.py : provides functions for generating DXF files
 # --------------------------------------------------------------------------
-__version__ = "v1.42 - 2023.12.04"
+__version__ = "v1.43 - 2026.10.18"
 __author__ = "Stani Michiels(Stani), Remigiusz Fiedler(migius), Yorik van Havre"
 __license__ = "GPL"
 __url__ = "http://github.com/yorikvanhavre/Draft-dxf-importer"
@@ -16,6 +16,14 @@ See the blender wiki for documentation.
 Dedicated thread on BlenderArtists: http://blenderartists.org/forum/showthread.php?t=136439
 
 History
+v1.43 - 2026.10.18
+ - objects write themselves to a stream with write_to(stream), str() and export() share it
+ - export() streams the drawing through a buffered writer, preformatted point group codes
+ - fix Rectangle and LineList output, LwPolyLine points without widths
+ - calling an object copies it on write instead of deepcopy, no method binding in Drawing and Block
+ - LineArray, PointArray, FaceArray and LwPolyLineArray: many entities formatted in bulk from one coordinate array
+ - saveas(fileName,binary=True) writes binary dxf, the array builders pack their coordinates directly
+ - Symbols: repeated symbols written once as a block, every occurrence as an insert
 v1.42 - 2023.12.04 by various
  - Fixed acadVersion and DXFcodePage issues
 v1.41 - 2023.07.12 by Yorik and others
@@ -103,30 +111,143 @@ except:
 	copy = None
 
 import math
+import io
+import operator
+import struct
+
+try:
+	import numpy
+except ImportError: # the array builders pack binary dxf with struct
+	numpy = None
 
 ####1) Private (only for developpers)
 _HEADER_POINTS=['insbase','extmin','extmax']
+_POINT_FORMATS={} # (index, dimension) -> preformatted group codes of a point, e.g. ' 10\n%s\n 20\n%s'
+_STREAM_PARTS=1<<14 # pieces kept by a _Stream before they are written to the file
+_BULK=4096 # entities (or vertices) formatted at once by the array builders
+_BINARY_SENTINEL=b'AutoCAD Binary DXF\r\n\x1a\x00'
+_BINARY_GROUPS={} # group code line, e.g. ' 10' -> (packed code, value type)
+_BINARY_POINTS={} # (index, coordinates) -> packer of a point, see _binary_point
+_SIGNATURES={} # (class, attributes, geometric attributes) -> getter of the others, see _signature
+_INT16=struct.Struct('<h')
+_INT32=struct.Struct('<i')
+_DOUBLE=struct.Struct('<d')
 
 #---helper functions-----------------------------------
+def _point_format(index,count):
+	"""Returns the format string of a point of count coordinates."""
+	format=_POINT_FORMATS[index,count]='\n'.join([' %s\n%%s'%((i+1)*10+index) for i in range(count)])
+	return format
+
 def _point(x,index=0):
 	"""Convert tuple to a dxf point"""
 	#print 'deb: _point=', x #-------------
-	return '\n'.join([' %s\n%s'%((i+1)*10+index,float(x[i])) for i in range(len(x))])
+	try: format=_POINT_FORMATS[index,len(x)]
+	except KeyError: format=_point_format(index,len(x))
+	return format%tuple(map(float,x))
+
+def _floats(coords):
+	"""Returns the coordinates of a numpy array, array('d') or (nested) sequence as a flat list of floats."""
+	if hasattr(coords,'ravel'): coords=coords.ravel() # numpy
+	if hasattr(coords,'tolist'):
+		values=coords.tolist()
+		if values and type(values[0]) is not float: values=[float(v) for v in values]
+		return values
+	values=[]
+	for v in coords:
+		if hasattr(v,'__len__'): values.extend(_floats(v))
+		else: values.append(float(v))
+	return values
 
 def _points(plist):
 	"""Convert a list of tuples to dxf points"""
 	out = '\n'.join([_point(plist[i],i)for i in range(len(plist))])
 	return out
 
+def _binary_kind(code):
+	"""Returns the binary dxf value type of a group code: 'h' int16, 'l' int32, 'd' double or 's' string."""
+	for kind,ranges in (('h',((60,79),(170,179),(270,289),(370,389),(400,409),(1060,1070))),
+			('l',((90,99),(420,429),(440,459),(1071,1071))),
+			('d',((10,59),(110,149),(210,239),(460,469),(1010,1059)))):
+		for first,last in ranges:
+			if first<=code<=last: return kind
+	return 's'
+
+def _binary_code(code):
+	"""Packs a group code the R12 way: one byte, or 255 and an int16."""
+	if code<255: return bytes((code,))
+	return b'\xff'+_INT16.pack(code)
+
+def _binary_group(line):
+	"""Returns (packed code, value type) of a group code line, cached."""
+	code=int(line)
+	group=_BINARY_GROUPS[line]=(_binary_code(code),_binary_kind(code))
+	return group
+
+def _binary_point_format(index,count):
+	"""Returns the packer of a point of count coordinates."""
+	codes=[(i+1)*10+index for i in range(count)]
+	if codes[-1]<255:
+		packer=struct.Struct('<'+'Bd'*count).pack
+		template=[v for c in codes for v in (c,0.0)] # the codes at even places, the coordinates at odd ones
+		def pack(x):
+			values=template[:]
+			values[1::2]=[float(v) for v in x]
+			return packer(*values)
+	else:
+		def pack(x):
+			return b''.join([_binary_code(c)+_DOUBLE.pack(float(v)) for c,v in zip(codes,x)])
+	_BINARY_POINTS[index,count]=pack
+	return pack
+
+def _binary_point(x,index=0):
+	"""Packs a point like _point writes it, for a binary dxf."""
+	try: pack=_BINARY_POINTS[index,len(x)]
+	except KeyError: pack=_binary_point_format(index,len(x))
+	return pack(x)
+
+def _binary_string(code,value):
+	"""Packs a group with a string value (converted with %s like in ascii)."""
+	return _binary_code(code)+('%s'%value).encode("iso-8859-1")+b'\x00' # dxf R12 files are expected to be in that encoding
+
+def _binary_double(code,value):
+	return _binary_code(code)+_DOUBLE.pack(float(value))
+
+def _binary_int16(code,value):
+	try: number=int(value)
+	except ValueError: number=int(float(value))
+	return _binary_code(code)+_INT16.pack(number)
+
 #---base classes----------------------------------------
 class _Call:
-	"""Makes a callable class."""
+	"""Makes a callable class.
+
+	Calling an object returns a copy with some attributes changed, so one object
+	can be the template of many:
+		toma=Insert('toma',layer='E-POWER')
+		drawing.extend([toma(point=p) for p in points])
+	Subclasses write their dxf code with write_to(stream), str() collects it.
+	"""
+	def write_to(self,stream):
+		"""Writes the dxf code of the object to stream (anything with a write method)."""
+		raise NotImplementedError
+
+	def __str__(self):
+		stream=io.StringIO()
+		self.write_to(stream)
+		return stream.getvalue()
+
 	def copy(self):
-		"""Returns a copy."""
-		return copy.deepcopy(self)
+		"""Returns a copy, its lists (points, entities,...) are copied one level deep."""
+		copied=self.__class__.__new__(self.__class__)
+		state=copied.__dict__
+		state.update(self.__dict__)
+		for attr,value in state.items():
+			if isinstance(value,list): state[attr]=list(value)
+		return copied
 
 	def __call__(self,**attrs):
-		"""Returns a copy with modified attributes."""
+		"""Returns a copy with modified attributes, see copy()."""
 		copied=self.copy()
 		for attr in attrs:setattr(copied,attr,attrs[attr])
 		return copied
@@ -168,26 +289,134 @@ class _Entity(_Call):
 		if parent.extrusion!=None: result+='%s\n'%_point(parent.extrusion,200)
 		return result
 
+	def _binary_common(self):
+		"""Return common group codes packed for a binary dxf, like _common."""
+		if self.parent:parent=self.parent
+		else:parent=self
+		result=b''
+		if parent.paperspace==1: result+=_binary_int16(67,1)
+		if parent.layer!=None: result+=_binary_string(8,parent.layer)
+		if parent.color!=None: result+=_binary_int16(62,parent.color)
+		if parent.lineType!=None: result+=_binary_string(6,parent.lineType)
+		if parent.lineTypeScale!=None: result+=_binary_double(48,parent.lineTypeScale)
+		if parent.elevation!=None: result+=_binary_double(38,parent.elevation)
+		if parent.thickness!=None: result+=_binary_double(39,parent.thickness)
+		if parent.extrusion!=None: result+=_binary_point(parent.extrusion,200)
+		return result
+
 #--------------------------
 class _Entities:
 	"""Base class to deal with composed objects."""
 	def __dxf__(self):
 		return []
 
+	def write_to(self,stream):
+		for x in self.__dxf__():
+			_write(stream,x)
+
 	def __str__(self):
 		return ''.join([str(x) for x in self.__dxf__()])
 
+#--------------------------
+def _write(stream,x):
+	"""Writes an entity, table entry or plain dxf string to stream."""
+	if isinstance(x,str): stream.write(x)
+	else: x.write_to(stream)
+
+class _Stream:
+	"""Buffered text stream the objects of a drawing write into while it is exported.
+
+	Writes are collected in a list and go to the file in large chunks, each
+	checked for the iso-8859-1 encoding expected by dxf R12.
+	"""
+	def __init__(self,file,parts=_STREAM_PARTS):
+		self.file=file
+		self.parts=[]
+		self.write=self.parts.append
+		self.max_parts=parts
+
+	def check(self):
+		"""Flushes if enough pieces are pending, call it between objects now and then."""
+		if len(self.parts)>=self.max_parts: self.flush()
+
+	def flush(self):
+		data=''.join(self.parts)
+		del self.parts[:]
+		self.file.write(data.encode("iso-8859-1").decode("iso-8859-1")) # dxf R12 files are expected to be in that encoding
+
+class _BinaryStream(_Stream):
+	"""Buffered stream writing binary dxf to a file opened 'wb'.
+
+	Objects write their dxf code as text like for a _Stream, the pending group
+	codes and values are packed with struct before packed groups are queued
+	and on every flush.  Writers that can produce packed groups themselves
+	(Line, Point, Circle, Arc, Insert and the array builders) check binary and
+	call write_groups instead, skipping the text formatting of their numbers.
+	"""
+	binary=True
+
+	def __init__(self,file,parts=_STREAM_PARTS):
+		_Stream.__init__(self,file,parts)
+		self.packed=[]
+		file.write(_BINARY_SENTINEL)
+
+	def check(self):
+		if len(self.parts)+len(self.packed)>=self.max_parts: self.flush()
+
+	def groups(self,text):
+		"""Returns the binary dxf of text, a string of whole group code/value line pairs."""
+		lines=text.split('\n')
+		if lines[-1]=='': del lines[-1]
+		if len(lines)&1:
+			raise ValueError('binary dxf: group code %r without a value'%lines[-1])
+		out=bytearray()
+		groups=_BINARY_GROUPS
+		double,int16,int32=_DOUBLE.pack,_INT16.pack,_INT32.pack
+		for line,value in zip(lines[0::2],lines[1::2]):
+			try: code,kind=groups[line]
+			except KeyError: code,kind=_binary_group(line)
+			out+=code
+			if kind=='d': out+=double(float(value))
+			elif kind=='s': out+=value.encode("iso-8859-1")+b'\x00' # dxf R12 files are expected to be in that encoding
+			else:
+				try: number=int(value)
+				except ValueError: number=int(float(value))
+				out+=int16(number) if kind=='h' else int32(number)
+		return bytes(out)
+
+	def write_groups(self,data):
+		"""Writes packed groups, after the pending text."""
+		if self.parts: self._pack_text()
+		self.packed.append(data)
+		if len(data)>=_BULK: self.flush() # a chunk of an array builder
+
+	def _pack_text(self):
+		data=''.join(self.parts)
+		del self.parts[:]
+		if data: self.packed.append(self.groups(data))
+
+	def flush(self):
+		self._pack_text()
+		self.file.write(b''.join(self.packed))
+		del self.packed[:]
+
 #--------------------------
 class _Collection(_Call):
 	"""Base class to expose entities methods to main object."""
 	def __init__(self,entities=[]):
 		self.entities=copy.copy(entities)
-		#link entities methods to drawing
-		for attr in dir(self.entities):
-			if attr[0]!='_':
-				attrObject=getattr(self.entities,attr)
-				if callable(attrObject):
-					setattr(self,attr,attrObject)
+
+	#list methods of the entities
+	def append(self,entity): self.entities.append(entity)
+	def extend(self,entities): self.entities.extend(entities)
+	def insert(self,index,entity): self.entities.insert(index,entity)
+	def remove(self,entity): self.entities.remove(entity)
+	def pop(self,index=-1): return self.entities.pop(index)
+	def index(self,entity,*args): return self.entities.index(entity,*args)
+	def count(self,entity): return self.entities.count(entity)
+	def sort(self,**options): self.entities.sort(**options)
+	def reverse(self): self.entities.reverse()
+	def clear(self): self.entities.clear()
 
 ####2) Constants
 #---color values
@@ -267,11 +496,11 @@ class Ellipse(_Entity):
 		self.minorAxisRatio=minorAxisRatio
 		self.startParameter=startParameter
 		self.endParameter=endParameter
-	def __str__(self):
-		return '  0\nELLIPSE\n%s%s\n%s\n%s\n 40\n%s\n 41\n%s\n 42\n%s\n'%\
+	def write_to(self,stream):
+		stream.write('  0\nELLIPSE\n%s%s\n%s\n%s\n 40\n%s\n 41\n%s\n 42\n%s\n'%\
 			   (self._common(),_point(self.center),_point(self.majorAxis,1),
 				_point(self.normalAxis,200),self.minorAxisRatio,
-				self.startParameter,self.endParameter)
+				self.startParameter,self.endParameter))
 
 #--------------------------
 class Arc(_Entity):
@@ -284,10 +513,14 @@ class Arc(_Entity):
 		self.radius=radius
 		self.startAngle=startAngle
 		self.endAngle=endAngle
-	def __str__(self):
-		return '  0\nARC\n%s%s\n 40\n%s\n 50\n%s\n 51\n%s\n'%\
+	def write_to(self,stream):
+		if getattr(stream,'binary',False):
+			stream.write_groups(b''.join((b'\x00ARC\x00',self._binary_common(),_binary_point(self.center),
+				_binary_double(40,self.radius),_binary_double(50,self.startAngle),_binary_double(51,self.endAngle))))
+			return
+		stream.write('  0\nARC\n%s%s\n 40\n%s\n 50\n%s\n 51\n%s\n'%\
 			   (self._common(),_point(self.center),
-				self.radius,self.startAngle,self.endAngle)
+				self.radius,self.startAngle,self.endAngle))
 
 #-----------------------------------------------
 class Circle(_Entity):
@@ -296,9 +529,13 @@ class Circle(_Entity):
 		_Entity.__init__(self,**common)
 		self.center=center
 		self.radius=radius
-	def __str__(self):
-		return '  0\nCIRCLE\n%s%s\n 40\n%s\n'%\
-			   (self._common(),_point(self.center),self.radius)
+	def write_to(self,stream):
+		if getattr(stream,'binary',False):
+			stream.write_groups(b''.join((b'\x00CIRCLE\x00',self._binary_common(),_binary_point(self.center),
+				_binary_double(40,self.radius))))
+			return
+		stream.write('  0\nCIRCLE\n%s%s\n 40\n%s\n'%\
+			   (self._common(),_point(self.center),self.radius))
 
 #-----------------------------------------------
 class Face(_Entity):
@@ -309,10 +546,8 @@ class Face(_Entity):
 			points.append(points[-1])
 		self.points=points
 
-	def __str__(self):
-		out = '  0\n3DFACE\n%s%s\n' %(self._common(),_points(self.points))
-		#print 'deb:out=', out #-------------------
-		return out
+	def write_to(self,stream):
+		stream.write('  0\n3DFACE\n%s%s\n' %(self._common(),_points(self.points)))
 
 #-----------------------------------------------
 class Insert(_Entity):
@@ -334,18 +569,34 @@ class Insert(_Entity):
 		self.rowspacing=rowspacing
 		self.rotation=rotation
 
-	def __str__(self):
-		result='  0\nINSERT\n  2\n%s\n%s%s\n'%\
-				(self.name,self._common(),_point(self.point))
-		if self.xscale!=None:result+=' 41\n%s\n'%self.xscale
-		if self.yscale!=None:result+=' 42\n%s\n'%self.yscale
-		if self.zscale!=None:result+=' 43\n%s\n'%self.zscale
-		if self.rotation:result+=' 50\n%s\n'%self.rotation
-		if self.cols!=None:result+=' 70\n%s\n'%self.cols
-		if self.colspacing!=None:result+=' 44\n%s\n'%self.colspacing
-		if self.rows!=None:result+=' 71\n%s\n'%self.rows
-		if self.rowspacing!=None:result+=' 45\n%s\n'%self.rowspacing
-		return result
+	def write_to(self,stream):
+		if getattr(stream,'binary',False):
+			stream.write_groups(self._binary())
+			return
+		write=stream.write
+		write('  0\nINSERT\n  2\n%s\n%s%s\n'%\
+				(self.name,self._common(),_point(self.point)))
+		if self.xscale!=None:write(' 41\n%s\n'%self.xscale)
+		if self.yscale!=None:write(' 42\n%s\n'%self.yscale)
+		if self.zscale!=None:write(' 43\n%s\n'%self.zscale)
+		if self.rotation:write(' 50\n%s\n'%self.rotation)
+		if self.cols!=None:write(' 70\n%s\n'%self.cols)
+		if self.colspacing!=None:write(' 44\n%s\n'%self.colspacing)
+		if self.rows!=None:write(' 71\n%s\n'%self.rows)
+		if self.rowspacing!=None:write(' 45\n%s\n'%self.rowspacing)
+
+	def _binary(self):
+		"""Returns the groups of write_to packed for a binary dxf."""
+		result=[b'\x00INSERT\x00',_binary_string(2,self.name),self._binary_common(),_binary_point(self.point)]
+		if self.xscale!=None:result.append(_binary_double(41,self.xscale))
+		if self.yscale!=None:result.append(_binary_double(42,self.yscale))
+		if self.zscale!=None:result.append(_binary_double(43,self.zscale))
+		if self.rotation:result.append(_binary_double(50,self.rotation))
+		if self.cols!=None:result.append(_binary_int16(70,self.cols))
+		if self.colspacing!=None:result.append(_binary_double(44,self.colspacing))
+		if self.rows!=None:result.append(_binary_int16(71,self.rows))
+		if self.rowspacing!=None:result.append(_binary_double(45,self.rowspacing))
+		return b''.join(result)
 
 #-----------------------------------------------
 class Line(_Entity):
@@ -353,9 +604,14 @@ class Line(_Entity):
 	def __init__(self,points,**common):
 		_Entity.__init__(self,**common)
 		self.points=points
-	def __str__(self):
-		return '  0\nLINE\n%s%s\n' %(
-				self._common(), _points(self.points))
+	def write_to(self,stream):
+		if getattr(stream,'binary',False):
+			points=self.points
+			stream.write_groups(b''.join([b'\x00LINE\x00',self._binary_common()]+
+				[_binary_point(points[i],i) for i in range(len(points))]))
+			return
+		stream.write('  0\nLINE\n%s%s\n' %(
+				self._common(), _points(self.points)))
 
 
 #-----------------------------------------------
@@ -386,52 +642,94 @@ class PolyLine(_Entity):
 				if type(width)!='list':  width=[width,width]
 				self.width=width
 
-	def __str__(self):
-		result= '  0\nPOLYLINE\n%s 70\n%s\n' %(self._common(),self.pflag70)
-		result+=' 66\n1\n'
-		result+='%s\n' %_point(self.org_point)
+	def write_to(self,stream):
+		if getattr(stream,'binary',False):
+			stream.write_groups(self._binary())
+			return
+		write=stream.write
+		write('  0\nPOLYLINE\n%s 70\n%s\n' %(self._common(),self.pflag70))
+		write(' 66\n1\n')
+		write('%s\n' %_point(self.org_point))
 		if self.polyface:
-			result+=' 71\n%s\n' %self.p_count
-			result+=' 72\n%s\n' %self.f_count
+			write(' 71\n%s\n' %self.p_count)
+			write(' 72\n%s\n' %self.f_count)
 		elif self.polyline2d:
-			if self.width!=None: result+=' 40\n%s\n 41\n%s\n' %(self.width[0],self.width[1])
+			if self.width!=None: write(' 40\n%s\n 41\n%s\n' %(self.width[0],self.width[1]))
 		if self.pflag75:
-			result+=' 75\n%s\n' %self.pflag75
+			write(' 75\n%s\n' %self.pflag75)
+		vertex='  0\nVERTEX\n  8\n%s\n' %self.layer # the same prefix for every vertex
 		for point in self.points:
-			result+='  0\nVERTEX\n'
-			result+='  8\n%s\n' %self.layer
+			write(vertex)
 			if self.polyface:
-				result+='%s\n' %_point(point)
-				result+=' 70\n192\n'
+				write('%s\n 70\n192\n' %_point(point))
 			elif self.polyline2d:
-				result+='%s\n' %_point(point[0])
+				write('%s\n' %_point(point[0]))
 				flag = point[1]
 				if len(point)>2:
 					[width1, width2] = point[2]
-					if width1!=None: result+=' 40\n%s\n' %width1
-					if width2!=None: result+=' 41\n%s\n' %width2
+					if width1!=None: write(' 40\n%s\n' %width1)
+					if width2!=None: write(' 41\n%s\n' %width2)
 				if len(point)==4:
 					bulge = point[3]
-					if bulge: result+=' 42\n%s\n' %bulge
+					if bulge: write(' 42\n%s\n' %bulge)
 				if flag:
-					result+=' 70\n%s\n' %flag
+					write(' 70\n%s\n' %flag)
 			else:
-				result+='%s\n' %_point(point[0])
+				write('%s\n' %_point(point[0]))
 				flag = point[1]
 				if flag:
-					result+=' 70\n%s\n' %flag
+					write(' 70\n%s\n' %flag)
+		if self.faces:
+			face_vertex='%s%s\n 70\n128\n' %(vertex,_point(self.org_point))
 		for face in self.faces:
-			result+='  0\nVERTEX\n'
-			result+='  8\n%s\n' %self.layer
-			result+='%s\n' %_point(self.org_point)
-			result+=' 70\n128\n'
-			result+=' 71\n%s\n' %face[0]
-			result+=' 72\n%s\n' %face[1]
-			result+=' 73\n%s\n' %face[2]
-			if len(face)==4: result+=' 74\n%s\n' %face[3]
-		result+='  0\nSEQEND\n'
-		result+='  8\n%s\n' %self.layer
-		return result
+			write(face_vertex)
+			write(' 71\n%s\n 72\n%s\n 73\n%s\n' %(face[0],face[1],face[2]))
+			if len(face)==4: write(' 74\n%s\n' %face[3])
+		write('  0\nSEQEND\n')
+		write('  8\n%s\n' %self.layer)
+
+	def _binary(self):
+		"""Returns the groups of write_to packed for a binary dxf."""
+		result=[b'\x00POLYLINE\x00',self._binary_common(),_binary_int16(70,self.pflag70),
+			_binary_int16(66,1),_binary_point(self.org_point)]
+		write=result.append
+		if self.polyface:
+			write(_binary_int16(71,self.p_count))
+			write(_binary_int16(72,self.f_count))
+		elif self.polyline2d:
+			if self.width!=None: write(_binary_double(40,self.width[0])+_binary_double(41,self.width[1]))
+		if self.pflag75:
+			write(_binary_int16(75,self.pflag75))
+		vertex=b'\x00VERTEX\x00'+_binary_string(8,self.layer)
+		for point in self.points:
+			write(vertex)
+			if self.polyface:
+				write(_binary_point(point)+_binary_int16(70,192))
+			elif self.polyline2d:
+				write(_binary_point(point[0]))
+				flag = point[1]
+				if len(point)>2:
+					[width1, width2] = point[2]
+					if width1!=None: write(_binary_double(40,width1))
+					if width2!=None: write(_binary_double(41,width2))
+				if len(point)==4:
+					bulge = point[3]
+					if bulge: write(_binary_double(42,bulge))
+				if flag:
+					write(_binary_int16(70,flag))
+			else:
+				write(_binary_point(point[0]))
+				flag = point[1]
+				if flag:
+					write(_binary_int16(70,flag))
+		if self.faces:
+			face_vertex=vertex+_binary_point(self.org_point)+_binary_int16(70,128)
+		for face in self.faces:
+			write(face_vertex)
+			write(_binary_int16(71,face[0])+_binary_int16(72,face[1])+_binary_int16(73,face[2]))
+			if len(face)==4: write(_binary_int16(74,face[3]))
+		write(b'\x00SEQEND\x00'+_binary_string(8,self.layer))
+		return b''.join(result)
 
 class LwPolyLine(_Entity):
 	def __init__(self,points,org_point=[0,0],flag=0,width=None,**common):
@@ -443,26 +741,51 @@ class LwPolyLine(_Entity):
 		self.flag=flag
 		self.width= None # dummy value
 
-	def __str__(self):
-		result= '  0\nLWPOLYLINE\n%s ' %(self._common())
-		result+='  8\n%s\n' %self.layer
-		result+='100\nAcDbPolyline\n'
-		result+=' 90\n%s\n' % len(self.points)
-		result+=' 70\n%s\n' %(self.flag)
-		result+='%s\n' %_point(self.org_point)
+	def write_to(self,stream):
+		if getattr(stream,'binary',False):
+			stream.write_groups(self._binary())
+			return
+		write=stream.write
+		write('  0\nLWPOLYLINE\n%s ' %(self._common()))
+		write('  8\n%s\n' %self.layer)
+		write('100\nAcDbPolyline\n')
+		write(' 90\n%s\n' % len(self.points))
+		write(' 70\n%s\n' %(self.flag))
+		write('%s\n' %_point(self.org_point))
 		if self.width!=None:
-			result+=' 40\n%s\n 41\n%s\n' %(self.width[0],self.width[1])
+			write(' 40\n%s\n 41\n%s\n' %(self.width[0],self.width[1]))
+		width1 = width2 = None
 		for point in self.points:
-			result+='%s\n' %_point(point[0:2])
+			write('%s\n' %_point(point[0:2]))
 			if len(point)>4:
 				width1, width2 = point[3], point[4]
-			if width1!=None: result+=' 40\n%s\n' %width1
-			if width2!=None: result+=' 41\n%s\n' %width2
+			if width1!=None: write(' 40\n%s\n' %width1)
+			if width2!=None: write(' 41\n%s\n' %width2)
 			if len(point)==6:
 				bulge = point[5]
 				if bulge:
-					result+=' 42\n%s\n' %bulge
-		return result
+					write(' 42\n%s\n' %bulge)
+
+	def _binary(self):
+		"""Returns the groups of write_to packed for a binary dxf."""
+		result=[b'\x00LWPOLYLINE\x00',self._binary_common(),_binary_string(8,self.layer),
+			_binary_string(100,'AcDbPolyline'),_binary_code(90)+_INT32.pack(len(self.points)),
+			_binary_int16(70,self.flag),_binary_point(self.org_point)]
+		write=result.append
+		if self.width!=None:
+			write(_binary_double(40,self.width[0])+_binary_double(41,self.width[1]))
+		width1 = width2 = None
+		for point in self.points:
+			write(_binary_point(point[0:2]))
+			if len(point)>4:
+				width1, width2 = point[3], point[4]
+			if width1!=None: write(_binary_double(40,width1))
+			if width2!=None: write(_binary_double(41,width2))
+			if len(point)==6:
+				bulge = point[5]
+				if bulge:
+					write(_binary_double(42,bulge))
+		return b''.join(result)
 
 
 
@@ -472,10 +795,15 @@ class Point(_Entity):
 	def __init__(self,points=None,**common):
 		_Entity.__init__(self,**common)
 		self.points=points
-	def __str__(self): # TODO:
-		return '  0\nPOINT\n%s%s\n' %(self._common(),
+	def write_to(self,stream): # TODO:
+		if getattr(stream,'binary',False):
+			points=self.points
+			stream.write_groups(b''.join([b'\x00POINT\x00',self._binary_common()]+
+				[_binary_point(points[i],i) for i in range(len(points))]))
+			return
+		stream.write('  0\nPOINT\n%s%s\n' %(self._common(),
 			 _points(self.points)
-			)
+			))
 
 #-----------------------------------------------
 class Solid(_Entity):
@@ -483,10 +811,10 @@ class Solid(_Entity):
 	def __init__(self,points=None,**common):
 		_Entity.__init__(self,**common)
 		self.points=points
-	def __str__(self):
-		return '  0\nSOLID\n%s%s\n' %(self._common(),
+	def write_to(self,stream):
+		stream.write('  0\nSOLID\n%s%s\n' %(self._common(),
 			 _points(self.points[:2]+[self.points[3],self.points[2]])
-			)
+			))
 
 
 #-----------------------------------------------
@@ -495,15 +823,9 @@ class Dimension(_Entity):
 	def __init__(self,point,start,end,**common):
 		_Entity.__init__(self,**common)
 		self.points=[point,start,end]
-	def __str__(self):
-		result = '  0\nDIMENSION\n%s' %(self._common())
-		result+=' 3\nStandard\n'
-		result+=' 70\n1\n'
-		result+='%s\n' %_point(self.points[0])
-		result+='%s\n' %_point(self.points[1],3)
-		result+='%s\n' %_point(self.points[2],4)
-		#print result
-		return result
+	def write_to(self,stream):
+		stream.write('  0\nDIMENSION\n%s 3\nStandard\n 70\n1\n%s\n%s\n%s\n' %(self._common(),
+			_point(self.points[0]),_point(self.points[1],3),_point(self.points[2],4)))
 
 #-----------------------------------------------
 class Text(_Entity):
@@ -523,18 +845,18 @@ class Text(_Entity):
 		self.obliqueAngle=obliqueAngle
 		self.style=style
 		self.xscale=xscale
-	def __str__(self):
-		result= '  0\nTEXT\n%s%s\n 40\n%s\n  1\n%s\n'%\
-				(self._common(),_point(self.point),self.height,self.text)
-		if self.rotation: result+=' 50\n%s\n'%self.rotation
-		if self.xscale: result+=' 41\n%s\n'%self.xscale
-		if self.obliqueAngle: result+=' 51\n%s\n'%self.obliqueAngle
-		if self.style: result+='  7\n%s\n'%self.style
-		if self.flag: result+=' 71\n%s\n'%self.flag
-		if self.justifyhor: result+=' 72\n%s\n'%self.justifyhor
-		if self.alignment: result+='%s\n'%_point(self.alignment,1)
-		if self.justifyver: result+=' 73\n%s\n'%self.justifyver
-		return result
+	def write_to(self,stream):
+		write=stream.write
+		write('  0\nTEXT\n%s%s\n 40\n%s\n  1\n%s\n'%\
+				(self._common(),_point(self.point),self.height,self.text))
+		if self.rotation: write(' 50\n%s\n'%self.rotation)
+		if self.xscale: write(' 41\n%s\n'%self.xscale)
+		if self.obliqueAngle: write(' 51\n%s\n'%self.obliqueAngle)
+		if self.style: write('  7\n%s\n'%self.style)
+		if self.flag: write(' 71\n%s\n'%self.flag)
+		if self.justifyhor: write(' 72\n%s\n'%self.justifyhor)
+		if self.alignment: write('%s\n'%_point(self.alignment,1))
+		if self.justifyver: write(' 73\n%s\n'%self.justifyver)
 
 #-----------------------------------------------
 class Mtext(Text):
@@ -546,16 +868,15 @@ class Mtext(Text):
 		self.spacingWidth=spacingWidth
 		self.width=width
 		self.down=down
-	def __str__(self):
+	def write_to(self,stream):
 		texts=self.text.replace('\r\n','\n').split('\n')
 		if not self.down:texts.reverse()
-		result=''
 		x=y=0
 		if self.spacingWidth:spacingWidth=self.spacingWidth
 		else:spacingWidth=self.height*self.spacingFactor
 		for text in texts:
 			while text:
-				result+='%s' %Text(text[:self.width],
+				Text(text[:self.width],
 					point=(self.point[0]+x*spacingWidth,
 						   self.point[1]+y*spacingWidth,
 						   self.point[2]),
@@ -563,11 +884,10 @@ class Mtext(Text):
 					justifyhor=self.justifyhor,justifyver=self.justifyver,
 					rotation=self.rotation,obliqueAngle=self.obliqueAngle,
 					style=self.style,xscale=self.xscale,parent=self
-				)
+				).write_to(stream)
 				text=text[self.width:]
 				if self.rotation:x+=1
 				else:y+=1
-		return result[1:]
 
 #-----------------------------------------------
 class _Mtext(_Entity):
@@ -590,24 +910,24 @@ class _Mtext(_Entity):
 		self.style=style
 		self.width=width
 		self.xdirection=xdirection
-	def __str__(self):
+	def write_to(self,stream):
 		input=self.text
-		text=''
+		text=[]
 		while len(input)>250:
-			text+='3\n%s\n'%input[:250]
+			text.append('3\n%s\n'%input[:250])
 			input=input[250:]
-		text+='1\n%s\n'%input
-		result= '0\nMTEXT\n%s\n%s\n40\n%s\n41\n%s\n71\n%s\n72\n%s%s\n43\n%s\n50\n%s\n'%\
+		text.append('1\n%s\n'%input)
+		write=stream.write
+		write('0\nMTEXT\n%s\n%s\n40\n%s\n41\n%s\n71\n%s\n72\n%s%s\n43\n%s\n50\n%s\n'%\
 				(self._common(),_point(self.point),self.charHeight,self.width,
-				 self.attachment,self.direction,text,
+				 self.attachment,self.direction,''.join(text),
 				 self.height,
-				 self.rotation)
-		if self.style:result+='7\n%s\n'%self.style
-		if self.xdirection:result+='%s\n'%_point(self.xdirection,1)
-		if self.charWidth:result+='42\n%s\n'%self.charWidth
-		if self.spacingStyle:result+='73\n%s\n'%self.spacingStyle
-		if self.spacingFactor:result+='44\n%s\n'%self.spacingFactor
-		return result
+				 self.rotation))
+		if self.style:write('7\n%s\n'%self.style)
+		if self.xdirection:write('%s\n'%_point(self.xdirection,1))
+		if self.charWidth:write('42\n%s\n'%self.charWidth)
+		if self.spacingStyle:write('73\n%s\n'%self.spacingStyle)
+		if self.spacingFactor:write('44\n%s\n'%self.spacingFactor)
 
 
 
@@ -623,10 +943,12 @@ class Block(_Collection):
 		self.name=name
 		self.flag=0
 		self.base=base
-	def __str__(self): # TODO:
-		e=''.join([str(x)for x in self.entities])
-		return '  0\nBLOCK\n  8\n%s\n  2\n%s\n 70\n%s\n%s\n  3\n%s\n%s  0\nENDBLK\n'%\
-			   (self.layer,self.name.upper(),self.flag,_point(self.base),self.name.upper(),e)
+	def write_to(self,stream): # TODO:
+		stream.write('  0\nBLOCK\n  8\n%s\n  2\n%s\n 70\n%s\n%s\n  3\n%s\n'%\
+			   (self.layer,self.name.upper(),self.flag,_point(self.base),self.name.upper()))
+		for x in self.entities:
+			_write(stream,x)
+		stream.write('  0\nENDBLK\n')
 
 #-----------------------------------------------
 class Layer(_Call):
@@ -636,9 +958,9 @@ class Layer(_Call):
 		self.color=color
 		self.lineType=lineType
 		self.flag=flag
-	def __str__(self):
-		return '  0\nLAYER\n  2\n%s\n 70\n%s\n 62\n%s\n  6\n%s\n'%\
-			   (self.name.upper(),self.flag,self.color,self.lineType)
+	def write_to(self,stream):
+		stream.write('  0\nLAYER\n  2\n%s\n 70\n%s\n 62\n%s\n  6\n%s\n'%\
+			   (self.name.upper(),self.flag,self.color,self.lineType))
 
 #-----------------------------------------------
 class LineType(_Call):
@@ -648,16 +970,15 @@ class LineType(_Call):
 		self.description=description
 		self.elements=copy.copy(elements)
 		self.flag=flag
-	def __str__(self):
-		result = '  0\nLTYPE\n  2\n%s\n 70\n%s\n  3\n%s\n 72\n65\n'%\
-			(self.name.upper(),self.flag,self.description)
+	def write_to(self,stream):
+		write=stream.write
+		write('  0\nLTYPE\n  2\n%s\n 70\n%s\n  3\n%s\n 72\n65\n'%\
+			(self.name.upper(),self.flag,self.description))
 		if self.elements:
-			elements = ' 73\n%s\n' %(len(self.elements)-1)
-			elements += ' 40\n%s\n' %(self.elements[0])
+			write(' 73\n%s\n' %(len(self.elements)-1))
+			write(' 40\n%s\n' %(self.elements[0]))
 			for e in self.elements[1:]:
-				elements += ' 49\n%s\n' %e
-			result += elements
-		return result
+				write(' 49\n%s\n' %e)
 
 
 #-----------------------------------------------
@@ -674,11 +995,11 @@ class Style(_Call):
 		self.lastHeight=lastHeight
 		self.font=font
 		self.bigFont=bigFont
-	def __str__(self):
-		return '  0\nSTYLE\n  2\n%s\n 70\n%s\n 40\n%s\n 41\n%s\n 50\n%s\n 71\n%s\n 42\n%s\n 3\n%s\n 4\n%s\n'%\
+	def write_to(self,stream):
+		stream.write('  0\nSTYLE\n  2\n%s\n 70\n%s\n 40\n%s\n 41\n%s\n 50\n%s\n 71\n%s\n 42\n%s\n 3\n%s\n 4\n%s\n'%\
 			   (self.name.upper(),self.flag,self.flag,self.widthFactor,
 				self.obliqueAngle,self.mirror,self.lastHeight,
-				self.font.upper(),self.bigFont.upper())
+				self.font.upper(),self.bigFont.upper()))
 
 #-----------------------------------------------
 class VPort(_Call):
@@ -732,7 +1053,7 @@ class VPort(_Call):
 		self.grid_on=grid_on
 		self.snap_style=snap_style
 		self.snap_isopair=snap_isopair
-	def __str__(self):
+	def write_to(self,stream):
 		output = ['  0', 'VPORT',
 			'  2', self.name,
 			' 70', self.flag,
@@ -761,10 +1082,7 @@ class VPort(_Call):
 			' 78', self.snap_isopair
 			]
 
-		output_str = ''
-		for s in output:
-			output_str += '%s\n' %s
-		return output_str
+		stream.write(''.join(['%s\n' %s for s in output]))
 
 
 
@@ -793,7 +1111,7 @@ class View(_Call):
 		self.backClipping=float(backClipping)
 		self.twist=float(twist)
 		self.mode=mode
-	def __str__(self):
+	def write_to(self,stream):
 		output = ['  0', 'VIEW',
 			'  2', self.name,
 			' 70', self.flag,
@@ -808,10 +1126,7 @@ class View(_Call):
 			' 50', self.twist,
 			' 71', self.mode
 			]
-		output_str = ''
-		for s in output:
-			output_str += '%s\n' %s
-		return output_str
+		stream.write(''.join(['%s\n' %s for s in output]))
 
 #-----------------------------------------------
 def ViewByWindow(name,leftBottom=(0,0),rightTop=(1,1),**options):
@@ -877,62 +1192,72 @@ class Drawing(_Collection):
 		else: xstr=''
 		return '  0\nTABLE\n  2\n%s\n 70\n%s\n%s  0\nENDTAB\n'%(name.upper(),len(x),xstr)
 
-	def __str__(self):
-		"""Returns drawing as dxf string."""
-		header=[self.acadver]+[self._point(attr,getattr(self,attr))+'\n' for attr in _HEADER_POINTS]
-		header=self._section('header',header)
-
-		tables=[self._table('vport',[str(x) for x in self.vports]),
-				self._table('ltype',[str(x) for x in self.linetypes]),
-				self._table('layer',[str(x) for x in self.layers]),
-				self._table('style',[str(x) for x in self.styles]),
-				self._table('view',[str(x) for x in self.views]),
-		]
-		tables=self._section('tables',tables)
-
-		blocks=self._section('blocks',[str(x) for x in self.blocks])
-
-		entities=self._section('entities',[str(x) for x in self.entities])
-
-		all=''.join([header,tables,blocks,entities,'  0\nEOF\n'])
-		return all
-
-
-	def _write_section(self,file,name,data):
-		file.write('  0\nSECTION\n  2\n%s\n'%name.upper())
+	def _write_section(self,stream,name,data):
+		"""Writes a section like tables,blocks,entities,... object by object."""
+		stream.write('  0\nSECTION\n  2\n%s\n'%name.upper())
+		write=stream.write
+		check=getattr(stream,'check',None)
+		for i,x in enumerate(data):
+			if isinstance(x,str): write(x)
+			else: x.write_to(stream)
+			if check and not i&1023: check() # now and then is enough
+		stream.write('  0\nENDSEC\n')
+
+	def _write_table(self,stream,name,data):
+		"""Writes a table like ltype,layer,style,..."""
+		stream.write('  0\nTABLE\n  2\n%s\n 70\n%s\n'%(name.upper(),len(data)))
 		for x in data:
-			if not isinstance(x,str):
-				x = x.__str__()
-			file.write(x.encode("iso-8859-1").decode("iso-8859-1")) # dxf R12 files are expected to be in that encoding
-		file.write('  0\nENDSEC\n')
+			_write(stream,x)
+		stream.write('  0\nENDTAB\n')
 
-	def saveas(self,fileName,buffer=0):
+	def write_to(self,stream):
+		"""Writes the whole drawing to stream."""
+		header=[self.acadver]+[self._point(attr,getattr(self,attr))+'\n' for attr in _HEADER_POINTS]
+		if getattr(stream,'binary',False): # its strings are packed as iso-8859-1, ascii files are written in the locale encoding
+			header.insert(1,'  9\n$DWGCODEPAGE\n  3\nANSI_1252\n')
+		self._write_section(stream,'header',header)
+		stream.write('  0\nSECTION\n  2\nTABLES\n')
+		self._write_table(stream,'vport',self.vports)
+		self._write_table(stream,'ltype',self.linetypes)
+		self._write_table(stream,'layer',self.layers)
+		self._write_table(stream,'style',self.styles)
+		self._write_table(stream,'view',self.views)
+		stream.write('  0\nENDSEC\n')
+		self._write_section(stream,'blocks',self.blocks)
+		self._write_section(stream,'entities',self.entities)
+		stream.write('  0\nEOF\n')
+
+	def saveas(self,fileName,buffer=0,binary=False):
 		"""Writes DXF file. Needs target file name. If optional parameter buffer>0, then switch to old behavior: store entire output string in RAM.
+		With binary=True a binary dxf file is written: smaller, and faster to write and to read back.
 		"""
 		self.fileName=fileName
-		if buffer: self.save()
-		else: self.export()
-
-	def save(self):
-		outfile=open(self.fileName,'w')
-		outfile.write(str(self))
+		if buffer: self.save(binary)
+		else: self.export(binary)
+
+	def save(self,binary=False):
+		if binary:
+			data=io.BytesIO()
+			stream=_BinaryStream(data) # the whole file is built in memory
+			self.write_to(stream)
+			stream.flush()
+			outfile=open(self.fileName,'wb')
+			outfile.write(data.getvalue())
+		else:
+			outfile=open(self.fileName,'w')
+			outfile.write(str(self))
 		outfile.close()
 
-	def export(self):
-		outfile=open(self.fileName,'w')
-		header=[self.acadver]+[self._point(attr,getattr(self,attr))+'\n' for attr in _HEADER_POINTS]
-		self._write_section(outfile,'header',header)
-		tables=[self._table('vport',[str(x) for x in self.vports]),
-			self._table('ltype',[str(x) for x in self.linetypes]),
-			self._table('layer',[str(x) for x in self.layers]),
-			self._table('style',[str(x) for x in self.styles]),
-			self._table('view',[str(x) for x in self.views]),
-			]
-		self._write_section(outfile,'tables',tables)
-		self._write_section(outfile,'blocks',self.blocks)
-		self._write_section(outfile,'entities',self.entities)
-		outfile.write('  0\nEOF\n')
-		outfile.close()
+	def export(self,binary=False):
+		"""Writes the drawing to self.fileName through a buffered _Stream, without building it in memory."""
+		outfile=open(self.fileName,'wb' if binary else 'w')
+		try:
+			if binary: stream=_BinaryStream(outfile)
+			else: stream=_Stream(outfile)
+			self.write_to(stream)
+			stream.flush()
+		finally:
+			outfile.close()
 
 
 
@@ -947,17 +1272,15 @@ class Rectangle(_Entity):
 		self.height=height
 		self.solid=solid
 		self.line=line
-	def __str__(self):
-		result=''
+	def write_to(self,stream):
 		points=[self.point,(self.point[0]+self.width,self.point[1],self.point[2]),
 			(self.point[0]+self.width,self.point[1]+self.height,self.point[2]),
 			(self.point[0],self.point[1]+self.height,self.point[2]),self.point]
 		if self.solid:
-			result+= Solid(points=points[:-1],parent=self.solid)
+			Solid(points=points[:-1],parent=self.solid).write_to(stream)
 		if self.line:
 			for i in range(4):
-				result+= Line(points=[points[i],points[i+1]],parent=self)
-		return result[1:]
+				Line(points=[points[i],points[i+1]],parent=self).write_to(stream)
 
 #-----------------------------------------------
 class LineList(_Entity):
@@ -966,14 +1289,331 @@ class LineList(_Entity):
 		_Entity.__init__(self,**common)
 		self.closed=closed
 		self.points=copy.copy(points)
-	def __str__(self):
+	def write_to(self,stream):
 		if self.closed:
 			points=self.points+[self.points[0]]
 		else: points=self.points
-		result=''
 		for i in range(len(points)-1):
-				result+= Line(points=[points[i][0],points[i+1][0]],parent=self)
-		return result[1:]
+				Line(points=[points[i][0],points[i+1][0]],parent=self).write_to(stream)
+
+#---array builders
+#-----------------------------------------------
+class _EntityArray(_Entity):
+	"""Base class for many entities of one kind built from one coordinate array.
+
+	coords is a numpy array, an array('d') or a sequence of points, read as
+	consecutive points of dimension coordinates.  The dxf code of all the
+	entities is formatted in bulk with a template holding the group codes, the
+	common group codes are the same for every entity.
+	Coordinates are written like _point does, unless precision gives a number
+	of decimals: that is much faster (and shorter) than the exact float repr.
+	To a binary stream the coordinates are packed as doubles, with numpy
+	records when it is available.
+	"""
+	points_per_entity=1
+
+	def __init__(self,coords,dimension=3,precision=None,**common):
+		_Entity.__init__(self,**common)
+		self.coords=coords
+		self.dimension=dimension
+		self.precision=precision
+
+	def _number(self,format):
+		"""Applies the precision to the %s of a coordinates format."""
+		if self.precision is None: return format
+		return format.replace('%s','%%.%df'%self.precision)
+
+	def _values(self):
+		values=_floats(self.coords)
+		size=self.points_per_entity*self.dimension
+		if len(values)%size:
+			raise ValueError('%s: %d coordinates is not a whole number of %d point entities of dimension %d'\
+				%(self.__class__.__name__,len(values),self.points_per_entity,self.dimension))
+		return values
+
+	def _template(self,name):
+		"""Returns the format string of one entity."""
+		points=[_POINT_FORMATS.get((i,self.dimension)) or _point_format(i,self.dimension)
+			for i in range(self.points_per_entity)]
+		return '  0\n%s\n%s%s\n'%(name,self._common().replace('%','%%'),self._number('\n'.join(points)))
+
+	def _write_all(self,stream,template,values):
+		size=self.points_per_entity*self.dimension
+		step=size*_BULK
+		for i in range(0,len(values),step):
+			chunk=values[i:i+step]
+			stream.write((template*(len(chunk)//size))%tuple(chunk))
+
+	def _write_packed(self,stream,name,values):
+		"""Writes the entities to a binary stream."""
+		header=stream.groups('  0\n%s\n%s'%(name,self._common()))
+		codes=[(j+1)*10+i for i in range(self.points_per_entity) for j in range(self.dimension)]
+		for data in _packed_records(header,codes,values): stream.write_groups(data)
+
+def _packed_records(header,codes,values):
+	"""Yields binary dxf records of the packed header and one double per group code, _BULK records at a time.
+
+	values is flat, len(codes) of them per record.
+	"""
+	codes=[_binary_code(code) for code in codes]
+	size=len(codes)
+	if numpy is not None:
+		fields=[('header','V%d'%len(header))] if header else []
+		for i,code in enumerate(codes): fields+=[('c%d'%i,'V%d'%len(code)),('v%d'%i,'<f8')]
+		records=numpy.empty(_BULK,numpy.dtype(fields))
+		if header: records['header']=numpy.void(header)
+		for i,code in enumerate(codes): records['c%d'%i]=numpy.void(code)
+		values=numpy.asarray(values,dtype=float).reshape(-1,size)
+		for i in range(0,len(values),_BULK):
+			chunk=values[i:i+_BULK]
+			if len(chunk)<_BULK: records=records[:len(chunk)]
+			for j in range(size): records['v%d'%j]=chunk[:,j]
+			yield records.tobytes()
+	else:
+		pack=struct.Struct('<'+('%ds'%len(header) if header else '')+''.join(['%dsd'%len(code) for code in codes])).pack
+		prefix=[header] if header else []
+		for i in range(0,len(values),size*_BULK):
+			chunk=values[i:i+size*_BULK]
+			yield b''.join([pack(*(prefix+[x for pair in zip(codes,chunk[j:j+size]) for x in pair]))
+				for j in range(0,len(chunk),size)])
+
+#-----------------------------------------------
+class LineArray(_EntityArray):
+	"""Lines, two points per line: coords of shape (n,2,dimension)."""
+	points_per_entity=2
+	def write_to(self,stream):
+		if getattr(stream,'binary',False): self._write_packed(stream,'LINE',self._values())
+		else: self._write_all(stream,self._template('LINE'),self._values())
+
+#-----------------------------------------------
+class PointArray(_EntityArray):
+	"""Points: coords of shape (n,dimension)."""
+	def write_to(self,stream):
+		if getattr(stream,'binary',False): self._write_packed(stream,'POINT',self._values())
+		else: self._write_all(stream,self._template('POINT'),self._values())
+
+#-----------------------------------------------
+class FaceArray(_EntityArray):
+	"""3dfaces: coords of shape (n,corners,dimension), triangles get their last corner repeated."""
+	points_per_entity=4
+	def __init__(self,coords,corners=4,dimension=3,precision=None,**common):
+		_EntityArray.__init__(self,coords,dimension,precision,**common)
+		self.corners=corners
+
+	def _values(self):
+		values=_floats(self.coords)
+		if self.corners==3: #fix for r12 format, like Face
+			size=3*self.dimension
+			last=slice(2*self.dimension,size)
+			padded=[]
+			for i in range(0,len(values),size):
+				face=values[i:i+size]
+				padded.extend(face)
+				padded.extend(face[last])
+			values=padded
+		size=4*self.dimension
+		if len(values)%size:
+			raise ValueError('FaceArray: %d coordinates is not a whole number of faces'%len(values))
+		return values
+
+	def write_to(self,stream):
+		if getattr(stream,'binary',False): self._write_packed(stream,'3DFACE',self._values())
+		else: self._write_all(stream,self._template('3DFACE'),self._values())
+
+#-----------------------------------------------
+class LwPolyLineArray(_EntityArray):
+	"""Lightweight polylines sharing one array of x, y vertices.
+
+	counts gives the number of vertices of each polyline in turn (None for a
+	single polyline with all of them); bulges, if given, holds one bulge per
+	vertex (a 42 group is then written for every vertex).
+	"""
+	def __init__(self,coords,counts=None,bulges=None,flag=0,org_point=[0,0],precision=None,**common):
+		_EntityArray.__init__(self,coords,2,precision,**common)
+		self.counts=counts
+		self.bulges=bulges
+		self.flag=flag
+		self.org_point=org_point
+
+	def write_to(self,stream):
+		values=self._values()
+		bulges=None
+		if self.bulges is not None:
+			bulges=_floats(self.bulges)
+			merged=[0.0]*(len(values)//2*3) # x, y, bulge per vertex
+			merged[0::3]=values[0::2]
+			merged[1::3]=values[1::2]
+			merged[2::3]=bulges
+			values=merged
+			vertex=self._number(' 10\n%s\n 20\n%s\n')+' 42\n%s\n'
+			size=3
+		else:
+			vertex=self._number(' 10\n%s\n 20\n%s\n')
+			size=2
+		counts=self.counts
+		if counts is None: counts=[len(values)//size]
+		header='  0\nLWPOLYLINE\n%s   8\n%s\n100\nAcDbPolyline\n 90\n%%s\n 70\n%s\n%s\n'%\
+			(self._common().replace('%','%%'),str(self.layer).replace('%','%%'),self.flag,_point(self.org_point))
+		if getattr(stream,'binary',False):
+			vertices=memoryview(b''.join(_packed_records(b'',[10,20,42][:size],values)))
+			vertex=len(vertices)//(len(values)//size) if values else 0 # bytes per vertex
+			start=0
+			for count in counts:
+				stream.write_groups(stream.groups(header%count))
+				stream.write_groups(vertices[start*vertex:(start+count)*vertex])
+				start+=count
+			return
+		write=stream.write
+		start=0
+		for count in counts:
+			write(header%count)
+			for i in range(start*size,(start+count)*size,size*_BULK):
+				chunk=values[i:min(i+size*_BULK,(start+count)*size)]
+				write((vertex*(len(chunk)//size))%tuple(chunk))
+			start+=count
+
+#---symbols
+#-----------------------------------------------
+def _geometry(entity,point,vector,angle):
+	"""Returns the geometric attributes of entity mapped by point(p), its direction vectors by vector(v) and its angles by angle(a), as a dict."""
+	if isinstance(entity,(Line,Face,Solid,Point)):
+		return {'points':[point(p) for p in entity.points]}
+	if isinstance(entity,Arc):
+		return {'center':point(entity.center),'startAngle':angle(entity.startAngle),'endAngle':angle(entity.endAngle)}
+	if isinstance(entity,Circle):
+		return {'center':point(entity.center)}
+	if isinstance(entity,Ellipse):
+		return {'center':point(entity.center),'majorAxis':vector(entity.majorAxis)}
+	if isinstance(entity,(Text,Insert)):
+		attrs={'point':point(entity.point),'rotation':angle(entity.rotation or 0)}
+		if getattr(entity,'alignment',None): attrs['alignment']=point(entity.alignment)
+		return attrs
+	if isinstance(entity,LwPolyLine):
+		return {'points':[list(point(p[0:2]))+list(p[2:]) for p in entity.points]}
+	if isinstance(entity,PolyLine):
+		if entity.polyface: return {'points':[point(p) for p in entity.points]}
+		return {'points':[[point(p[0])]+list(p[1:]) for p in entity.points]}
+	raise ValueError('Symbols: %s entities cannot be written to a block'%entity.__class__.__name__)
+
+def _frozen(value):
+	"""Returns value with its lists and dicts turned into (nested) tuples, to be hashed."""
+	if isinstance(value,(list,tuple)): return tuple([_frozen(x) for x in value])
+	if isinstance(value,dict): return tuple([_frozen(x) for x in value.items()])
+	try:
+		hash(value)
+		return value
+	except TypeError:
+		return tuple([_frozen(x) for x in value])
+
+def _signature(entity,geometry):
+	"""Returns the class and the other attributes than geometry (a dict from _geometry) of entity, to be hashed.
+
+	The names of the other attributes are found once per class (and number of
+	attributes), their values are frozen only if they cannot be hashed.
+	"""
+	state=entity.__dict__
+	kind=(entity.__class__,len(state),len(geometry))
+	try: values=_SIGNATURES[kind](state)
+	except KeyError: # first of its kind, or other attribute names than the first
+		getter=_SIGNATURES[kind]=operator.itemgetter(*[name for name in state if name not in geometry])
+		values=getter(state)
+	try: hash(values)
+	except TypeError: values=tuple([_frozen(v) if isinstance(v,(list,dict)) else v for v in values])
+	if isinstance(entity,LwPolyLine): # widths and bulges of the vertices
+		tails=tuple([tuple(p[2:]) for p in entity.points])
+	elif isinstance(entity,PolyLine) and not entity.polyface: # flags, widths and bulges
+		tails=tuple([tuple(p[1:]) for p in entity.points])
+	else:
+		return entity.__class__,values
+	try: hash(tails)
+	except TypeError: tails=_frozen(tails)
+	return entity.__class__,values,tails
+
+class Symbols:
+	"""Writes the repeated symbols of a drawing once, as blocks, and inserts them.
+
+	add(entities) takes the entities of one occurrence of a symbol (an outlet,
+	a switch, a luminaire) in drawing coordinates.  They are moved from point
+	(by default the centroid of their vertices) to the origin and turned back
+	by rotation, in degrees about Z (by default the direction of the first of
+	their vertices farthest from point).  The normalized entities, coordinates
+	rounded to precision decimals, are the key of the symbol: its first
+	occurrence becomes a Block, every occurrence an Insert.
+		symbols=Symbols(drawing)
+		for outlet in outlets:
+			symbols.add(outlet_entities(outlet),layer='E-POWER')
+	"""
+	def __init__(self,drawing,prefix='SYMBOL',precision=6):
+		self.drawing=drawing
+		self.prefix=prefix
+		self.precision=precision
+		self.names={} # normalized entities -> block name
+		self.inserts=0
+		self._used=set([block.name.upper() for block in drawing.blocks])
+
+	def _name(self):
+		number=len(self.names)+1
+		while '%s%d'%(self.prefix.upper(),number) in self._used: number+=1
+		name='%s%d'%(self.prefix,number)
+		self._used.add(name.upper())
+		return name
+
+	def add(self,entities,point=None,rotation=None,**common):
+		"""Adds one occurrence of a symbol to the drawing, returns its Insert; common goes to the Insert."""
+		vertices=[]
+		def record(p):
+			vertices.append(p)
+			return p
+		for entity in entities: _geometry(entity,record,tuple,float)
+		if point is None:
+			if vertices: point=[sum([p[i] for p in vertices if len(p)>i])/len(vertices) for i in range(3)]
+			else: point=(0,0,0)
+		bx,by=point[0],point[1]
+		bz=len(point)>2 and point[2] or 0
+		if rotation is None:
+			farthest=0
+			rotation=0
+			for p in vertices:
+				d=round((p[0]-bx)**2+(p[1]-by)**2,self.precision)
+				if d>farthest: farthest,rotation=d,math.degrees(math.atan2(p[1]-by,p[0]-bx))
+		rotation%=360
+		c,s=math.cos(math.radians(rotation)),math.sin(math.radians(rotation))
+		digits=self.precision
+		shape=[] # the rounded local points, vectors and angles of an entity in turn
+		def local(p):
+			x,y=p[0]-bx,p[1]-by
+			if len(p)<3: q=(round(c*x+s*y,digits)+0.0,round(c*y-s*x,digits)+0.0)
+			else: q=(round(c*x+s*y,digits)+0.0,round(c*y-s*x,digits)+0.0,round(p[2]-bz,digits)+0.0)
+			shape.append(q)
+			return q
+		def turned(v):
+			q=(round(c*v[0]+s*v[1],digits)+0.0,round(c*v[1]-s*v[0],digits)+0.0)+tuple(v[2:])
+			shape.append(q)
+			return q
+		def turn(a):
+			a=round(a-rotation,digits)%360+0.0
+			shape.append(a)
+			return a
+		geometry=[]
+		key=[]
+		for entity in entities:
+			attrs=_geometry(entity,local,turned,turn)
+			geometry.append(attrs)
+			key.append((_signature(entity,attrs),tuple(shape)))
+			del shape[:]
+		key=tuple(key)
+		name=self.names.get(key)
+		if name is None:
+			name=self.names[key]=self._name()
+			placed=[entity(**attrs) for entity,attrs in zip(entities,geometry)]
+			self.drawing.blocks.append(Block(name,entities=placed))
+		insert=Insert(name,point=(bx,by,bz),rotation=rotation or None,**common)
+		self.drawing.append(insert)
+		self.inserts+=1
+		return insert
+
+	def __repr__(self):
+		return '%s: blocks - %d, inserts - %d'%(self.__class__.__name__,len(self.names),self.inserts)
 
 #-----------------------------------------------------
 def test():
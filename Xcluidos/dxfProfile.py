@@ -0,0 +1,227 @@
+"""This module records where the time of a dxf import goes.
+
+	An ImportProfile given to dxfReader.readDXF (or set as dxfReader.PROFILE, for
+	importers that call readDXF(filename) themselves) times each phase of the
+	read: parse (tokenizing, converting and handleObject) and objectify, or cache,
+	sections and spatial for the other ways of reading.  objectify is also timed
+	per entity type.  Without a profile readDXF only checks for None, so the hooks
+	cost nothing when they are off.
+
+	With detail=True the parse phase is split into tokenize, convert and
+	handleObject by reading the file again: once only tokenized, once tokenized
+	and converted.  With memory=True the peak of the python allocations is traced
+	with tracemalloc, which slows the import down; otherwise the peak resident
+	size of the process is reported where the platform tells it.
+
+	The FreeCAD side of an import is timed with the same profile:
+		profile = dxfProfile.ImportProfile(detail=True)
+		drawing = dxfReader.readDXF(filename, profile=profile)
+		with profile.phase('freecad'):
+			for entity in drawing.entities.data:
+				...
+				profile.created(entity.type)
+		print(profile.report.summary())
+		profile.report.save_json('import_profile.jsonl') # one line per import
+"""
+
+import os
+import sys
+import time
+import json
+import contextlib
+import tracemalloc
+
+try:
+	import resource
+except ImportError: # not on Windows
+	resource = None
+
+
+PARSE_PARTS = ('tokenize', 'convert', 'handleObject') # the split of parse measured with detail=True
+
+
+class ImportReport(object):
+	"""What an ImportProfile recorded for one readDXF.
+
+	phases maps each phase name to its seconds, in the order they ran; counts
+	and type_seconds give the number of entities of each type and the seconds
+	spent wrapping them; created counts the FreeCAD objects reported by the
+	importer.  peak_memory is in bytes, memory_source tells how it was measured.
+	"""
+	__slots__ = ('filename', 'size', 'timestamp', 'seconds', 'phases', 'counts', 'type_seconds',
+				 'created', 'peak_memory', 'memory_source')
+
+	def __init__(self, filename=None):
+		self.filename = filename
+		self.size = 0
+		self.timestamp = time.time()
+		self.seconds = 0.0
+		self.phases = {}
+		self.counts = {}
+		self.type_seconds = {}
+		self.created = {}
+		self.peak_memory = None
+		self.memory_source = None
+
+	def bytes_per_second(self):
+		"""Returns the size of the file read per second of readDXF (0.0 before it is done)."""
+		if not self.seconds:
+			return 0.0
+		return self.size / self.seconds
+
+	def slowest(self, count=5):
+		"""Returns [(type, seconds, entities, microseconds per entity)] of the count slowest types to objectify."""
+		rows = []
+		for kind, seconds in self.type_seconds.items():
+			number = self.counts.get(kind, 0) or 1
+			rows.append((kind, seconds, self.counts.get(kind, 0), seconds / number * 1e6))
+		rows.sort(key=lambda row: -row[1])
+		return rows[:count]
+
+	def to_dict(self):
+		"""Returns the report as a dict of plain values (see to_json)."""
+		data = dict((name, getattr(self, name)) for name in self.__slots__)
+		data['bytes_per_second'] = self.bytes_per_second()
+		data['slowest'] = [list(row) for row in self.slowest()]
+		data['python'] = sys.version.split()[0]
+		return data
+
+	def to_json(self, indent=None):
+		return json.dumps(self.to_dict(), indent=indent, sort_keys=True)
+
+	def save_json(self, filename, append=True):
+		"""Writes the report as one json line, appended to filename to keep the history of the imports."""
+		with open(filename, 'a' if append else 'w', encoding='utf-8') as outfile:
+			outfile.write(self.to_json() + '\n')
+
+	def summary(self):
+		"""Returns the report as readable text."""
+		lines = ["%s: %.1f MB in %.3f s, %.2f MB/s" % (os.path.basename(self.filename or '?'), self.size / 1e6,
+				 self.seconds, self.bytes_per_second() / 1e6)]
+		for name, seconds in self.phases.items():
+			indent = '    ' if name in PARSE_PARTS else '  '
+			lines.append("%s%-20s %8.3f s" % (indent, name, seconds))
+		if self.counts:
+			lines.append("  entities: " + ", ".join("%s %d" % item for item in sorted(self.counts.items(), key=lambda item: -item[1])))
+		for kind, seconds, number, micro in self.slowest():
+			lines.append("  %-20s %8.3f s  %7.1f us each" % (kind, seconds, micro))
+		if self.created:
+			lines.append("  created: " + ", ".join("%s %d" % item for item in sorted(self.created.items())))
+		if self.peak_memory is not None:
+			lines.append("  peak memory %.1f MB (%s)" % (self.peak_memory / 1e6, self.memory_source))
+		return '\n'.join(lines)
+
+	def __repr__(self):
+		return "%s: file - %s, seconds - %.3f, entities - %d" %(self.__class__.__name__, self.filename,
+			self.seconds, sum(self.counts.values()))
+
+
+class ImportProfile(object):
+	"""Records an ImportReport for every readDXF it is given to (reports, the last one is report)."""
+
+	def __init__(self, detail=False, memory=False):
+		self.detail = detail
+		self.memory = memory
+		self.report = None
+		self.reports = []
+		self._started = None
+		self._last = 0.0
+		self._tracing = False
+
+	def start(self, filename):
+		"""Called by readDXF before reading filename."""
+		self.report = ImportReport(filename)
+		self.reports.append(self.report)
+		try:
+			self.report.size = os.path.getsize(filename)
+		except OSError:
+			pass
+		if self.memory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self._tracing = True
+		self._started = time.perf_counter()
+
+	def stop(self, drawing):
+		"""Called by readDXF when it is done, drawing is what it returns (None on failure)."""
+		report = self.report
+		report.seconds = time.perf_counter() - self._started
+		if self.memory and tracemalloc.is_tracing():
+			report.peak_memory = tracemalloc.get_traced_memory()[1]
+			report.memory_source = 'tracemalloc'
+			if self._tracing:
+				tracemalloc.stop()
+				self._tracing = False
+		elif resource is not None:
+			peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+			report.peak_memory = peak if sys.platform == 'darwin' else peak * 1024
+			report.memory_source = 'process peak'
+		entities = getattr(drawing, '__dict__', {}).get('entities') # a LazyDrawing is not parsed for it
+		for entity in getattr(entities, 'data', ()):
+			if type(entity) != list:
+				report.counts[entity.type] = report.counts.get(entity.type, 0) + 1
+
+	@contextlib.contextmanager
+	def phase(self, name):
+		"""Context adding its wall time to the phase name of the current report."""
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			phases = self.report.phases
+			phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+	def clock(self, kind):
+		"""Adds the time since the previous call to kind (None only restarts), see dxfImportObjects.objectify."""
+		now = time.perf_counter()
+		if kind is not None:
+			seconds = self.report.type_seconds
+			seconds[kind] = seconds.get(kind, 0.0) + now - self._last
+		self._last = now
+
+	def created(self, kind, count=1):
+		"""Counts FreeCAD objects made by the importer for entities of type kind."""
+		created = self.report.created
+		created[kind] = created.get(kind, 0) + count
+
+	def split_parse(self, filename):
+		"""Splits the parse phase in tokenize, convert and handleObject by reading filename twice more.
+
+		Called by readDXF after stop, only reads that had a parse phase are split.
+		"""
+		import dxfReader
+		if 'parse' not in self.report.phases:
+			return
+		with dxfReader.gc_paused():
+			if dxfReader.is_binary_dxf(filename):
+				with open(filename, 'rb') as infile:
+					buf = infile.read()
+				start = time.perf_counter()
+				for pair in dxfReader.iter_binary_pairs(buf, 'latin-1'):
+					pass
+				tokenize = time.perf_counter() - start
+				start = time.perf_counter()
+				for event in dxfReader.iter_events(dxfReader.iter_binary_pairs(buf, 'latin-1'), dxfReader.BINARY_CONVERTERS):
+					pass
+			else:
+				start = time.perf_counter()
+				with open(filename, encoding='latin-1') as infile:
+					for pair in dxfReader.iter_pairs(infile):
+						pass
+				tokenize = time.perf_counter() - start
+				start = time.perf_counter()
+				with open(filename, encoding='latin-1') as infile:
+					for event in dxfReader.iter_events(dxfReader.iter_pairs(infile)):
+						pass
+			events = time.perf_counter() - start
+		phases = {}
+		for name, seconds in self.report.phases.items():
+			phases[name] = seconds
+			if name == 'parse':
+				phases['tokenize'] = tokenize
+				phases['convert'] = max(events - tokenize, 0.0)
+				phases['handleObject'] = max(seconds - events, 0.0)
+		self.report.phases = phases
+
+
+if __name__ == "__main__":
+	print("No example yet!")
@@ -2,6 +2,13 @@
 
 	The convert function is called by the readDXF fuction to convert dxf strings into the correct data based
 	on their type code.  readDXF expects a (full path) file name as input.
+
+	The file is read by a chunked tokenizer (iter_pairs) whose (code, value) pairs are turned into
+	section/entity/group events (iter_events); the states of the State Machine consume those events.
+
+	Binary dxf files are decoded with struct by iter_binary_pairs and go through the same events.
+
+	readDXFBatch (and iter_batch) read a list or glob of files in a pool of processes.
 """
 
 # --------------------------------------------------------------------------
@@ -28,41 +35,24 @@
 # --------------------------------------------------------------------------
 
 
+import os
 import sys
 import re
-from dxfImportObjects import *
-
-class Object:
-	"""Empty container class for dxf objects"""
-
-	def __init__(self, _type='', block=False):
-		"""_type expects a string value."""
-		self.type = _type
-		self.name = ''
-		self.data = []
-
-	def __str__(self):
-		if self.name:
-			return self.name
-		else:
-			return self.type
-
-	def __repr__(self):
-		return str(self.data)
-
-	def get_type(self, kind=''):
-		"""Despite the name, this method actually returns all objects of type 'kind' from self.data."""
-		if type:
-			objects = []
-			for item in self.data:
-				if type(item) != list and item.type == kind:
-					# we want this type of object
-					objects.append(item)
-				elif type(item) == list and item[0] == kind:
-					# we want this type of data
-					objects.append(item[1])
-			return objects
-
+import gc
+import io
+import contextlib
+import mmap
+import struct
+import codecs
+import locale
+import time
+import glob
+import concurrent.futures
+import pickle
+import hashlib
+import fnmatch
+from dxfImportObjects import * # Object, objectify and the entity wrappers
+from dxfSpatial import SpatialIndex
 
 class InitializationError(Exception): pass
 
@@ -131,81 +121,480 @@ def get_layer(data):
 	return item, value
 
 
-def convert(code, value):
-	"""Convert a string to the correct Python type based on its dxf code.
+def _to_int(value):
+	"""Integer strings take the fast path, things like '1.0' go through float."""
+	try:
+		return int(value)
+	except ValueError:
+		return int(float(value))
+
+def _to_hex(value):
+	try:
+		return int(value, 16) # should be left as string?
+	except (ValueError, TypeError):
+		return value
+
+def _converters():
+	"""Builds the group code -> converter table used by convert.
 	code types:
 		ints = 60-79, 170-179, 270-289, 370-389, 400-409, 1060-1070
 		longs = 90-99, 420-429, 440-459, 1071
 		floats = 10-39, 40-59, 110-139, 140-149, 210-239, 460-469, 1010-1059
 		hex = 105, 310-379, 390-399
 		strings = 0-9, 100, 102, 300-309, 410-419, 430-439, 470-479, 999, 1000-1009
+	Strings are mapped to None (nothing to convert).
 	"""
-	import sys
-	if 59 < code < 80 or 169 < code < 180 or 269 < code < 290 or 369 < code < 390 or 399 < code < 410 or 1059 < code < 1071:
-		value = int(float(value))
-	elif 89 < code < 100 or 419 < code < 430 or 439 < code < 460 or code == 1071:
-		value = int(float(value))
-	elif 9 < code < 60 or 109 < code < 150 or 209 < code < 240 or 459 < code < 470 or 1009 < code < 1060:
-		value = float(value)
-	elif code == 105 or 309 < code < 380 or 389 < code < 400:
-		try:
-			value = int(value, 16) # should be left as string?
-		except:
-			pass
-	else: # it's already a string so do nothing
-		pass
+	table = [None] * 1072
+	def fill(converter, *ranges):
+		for first, last in ranges:
+			for code in range(first, last + 1):
+				table[code] = converter
+	fill(_to_int, (60, 79), (170, 179), (270, 289), (370, 389), (400, 409), (1060, 1070))
+	fill(_to_int, (90, 99), (420, 429), (440, 459), (1071, 1071))
+	fill(float, (10, 59), (110, 149), (210, 239), (460, 469), (1010, 1059))
+	fill(_to_hex, (105, 105), (310, 369), (390, 399))
+	return tuple(table)
+
+CONVERTERS = _converters()
+MAX_CODE = len(CONVERTERS)
+
+def convert(code, value):
+	"""Convert a string to the correct Python type based on its dxf code.
+
+	The type of each code is looked up in the precomputed CONVERTERS table.
+	"""
+	if 0 <= code < MAX_CODE:
+		converter = CONVERTERS[code]
+		if converter is not None:
+			return converter(value)
 	return value
 
 
-def findObject(infile, kind=''):
-	"""Finds the next occurance of an object."""
-	obj = False
+# the tokenizer starts with small reads (so that the encoding restart triggered
+# by the HEADER section does not decode far ahead) and doubles up to CHUNK_SIZE
+FIRST_CHUNK_SIZE = 8192
+CHUNK_SIZE = 1 << 20
+PARTITION_SIZE = 4 << 20 # smallest part of a section worth a worker process
+
+# kinds of events produced by iter_events
+SECTION_START, SECTION_END, ENTITY_START, ENTITY_END, GROUP = range(5)
+
+
+def iter_pairs(infile, chunk_size=CHUNK_SIZE):
+	"""Yields the (code, value) pairs of a dxf file.
+
+	The file is read in large chunks which are split into lines in bulk, so the
+	per-line work is reduced to one int() for codes and one strip() for values.
+	Values are returned unconverted.
+	"""
+	size = min(FIRST_CHUNK_SIZE, chunk_size)
+	rest = ''
 	while 1:
-		line = infile.readline()
-		if not line: # readline returns '' at eof
-			return False
-		if not obj: # We're still looking for our object code
-			if line.lower().strip() == '0':
-				obj = True # found it
-		else: # we are in an object definition
-			if kind: # if we're looking for a particular kind
-				if line.lower().strip() == kind:
-					obj = Object(line.lower().strip())
-					break
-			else: # otherwise take anything non-numeric
-				if line.lower().strip() not in string.digits:
-					obj = Object(line.lower().strip())
-					break
-			obj = False # whether we found one or not it's time to start over
-	return obj
+		chunk = infile.read(size)
+		if not chunk:
+			break
+		if size < chunk_size:
+			size = min(size * 2, chunk_size)
+		lines = (rest + chunk).split('\n')
+		rest = lines.pop() # the last line may be incomplete
+		if len(lines) & 1: # the value of the last code is in the next chunk
+			rest = lines.pop() + '\n' + rest
+		yield from zip(map(int, lines[0::2]), map(str.strip, lines[1::2]))
+	if rest.strip(): # last pair without a trailing newline
+		lines = rest.split('\n')
+		yield from zip(map(int, lines[0::2]), map(str.strip, lines[1::2]))
+
+
+def iter_events(pairs, converters=CONVERTERS):
+	"""Turns a stream of (code, value) pairs into parsing events.
+
+	Every event is a (kind, code, value) tuple:
+		SECTION_START, 0, 'section'  a new section starts
+		SECTION_END, 0, 'endsec'     the current section is closed
+		ENTITY_START, 0, type        a new object of the given (lowercase) type starts
+		GROUP, code, value           a data pair, value converted to its python type
+		ENTITY_END, 0, type          the current object (or section header) has no more data
+
+	converters is the code -> converter table applied to the values (see BINARY_CONVERTERS).
+	"""
+	current = None
+	for code, value in pairs:
+		if code:
+			if 0 < code < MAX_CODE: # convert() inlined, this is the innermost loop
+				converter = converters[code]
+				if converter is not None:
+					value = converter(value)
+			yield GROUP, code, value
+			continue
+		if current is not None:
+			yield ENTITY_END, 0, current
+		kind = value.lower()
+		if kind == 'section':
+			current = kind
+			yield SECTION_START, 0, kind
+		elif kind == 'endsec':
+			current = None
+			yield SECTION_END, 0, kind
+		else:
+			current = kind
+			yield ENTITY_START, 0, kind
+	if current is not None:
+		yield ENTITY_END, 0, current
+
+
+RUN_PARTS = ('VERTEX', 'SEQEND', 'ATTRIB') # follow their POLYLINE or INSERT
+# only the newline before a 0 (or 8) line is consumed, so a 0 value cannot hide the next line
+_CODE0_LINE = re.compile(r'\n(?=[ \t]*0[ \t]*\r?\n[ \t]*([^\r\n]*?)[ \t]*\r?$)', re.M)
+_LAYER_LINE = re.compile(r'\n(?=[ \t]*8[ \t]*\r?\n[ \t]*([^\r\n]*?)[ \t]*\r?$)', re.M)
+
+class EntityFilter(object):
+	"""Selects the entities of the ENTITIES section by layer and by type.
+
+	layers and types keep only the named ones, exclude_layers and exclude_types
+	drop the named ones; each is a name or a list of names, compared case
+	insensitively, and may use the * and ? wildcards (e.g. 'E-*').  None means
+	no restriction.
+
+	filter_text(text) drops the rejected entities from the text of an ENTITIES
+	section before it is tokenized, using its 0 and first 8 code lines only.
+	filter(pairs) does the same on raw (code, value) pairs (binary files): an
+	entity of a rejected type is skipped from its 0 code on, the other ones are
+	held back until their 8 code gives the layer.  In both VERTEX, SEQEND and
+	ATTRIB go with the POLYLINE or INSERT they belong to.
+	"""
+
+	def __init__(self, layers=None, exclude_layers=None, types=None, exclude_types=None):
+		self.layers = self._matcher(layers)
+		self.exclude_layers = self._matcher(exclude_layers)
+		self.types = self._matcher(types)
+		self.exclude_types = self._matcher(exclude_types)
+		self._layer_cache = {}
+		self._type_cache = {}
+
+	@staticmethod
+	def _matcher(names):
+		"""Returns (names, regex of the wildcard names) or None."""
+		if names is None:
+			return None
+		if isinstance(names, str):
+			names = [names]
+		names = [name.upper() for name in names]
+		patterns = [fnmatch.translate(name) for name in names if '*' in name or '?' in name]
+		regex = re.compile('|'.join(patterns)) if patterns else None
+		return frozenset(names), regex
+
+	@staticmethod
+	def _match(matcher, name):
+		names, regex = matcher
+		return name in names or (regex is not None and regex.match(name) is not None)
+
+	def _accepts(self, name, keep, drop, cache):
+		accepted = cache.get(name)
+		if accepted is None:
+			upper = name.upper()
+			accepted = ((keep is None or self._match(keep, upper))
+						and (drop is None or not self._match(drop, upper)))
+			cache[name] = accepted
+		return accepted
+
+	def accepts_layer(self, name):
+		return self._accepts(name, self.layers, self.exclude_layers, self._layer_cache)
+
+	def accepts_type(self, name):
+		return self._accepts(name, self.types, self.exclude_types, self._type_cache)
+
+	def filter_text(self, text):
+		"""Returns the text of an ENTITIES section without its rejected entities."""
+		by_layer = self.layers is not None or self.exclude_layers is not None
+		accepts_layer, accepts_type = self.accepts_layer, self.accepts_type
+		layer_cache, type_cache = self._layer_cache, self._type_cache # saves the calls once a name is known
+		find_layer = _LAYER_LINE.search
+		parts = []
+		keep = True
+		kept = 0 # start of the text kept so far but not yet in parts
+		bounds = [(m.end(), m.group(1)) for m in _CODE0_LINE.finditer(text)
+				  if m.group(1) and not m.group(1).lstrip('-').isdigit()] # skips 0 values
+		bounds.append((len(text), ''))
+		for (start, name), (stop, ignored) in zip(bounds, bounds[1:]):
+			kind = name.upper()
+			if kind == 'SECTION' or kind == 'ENDSEC':
+				accepted = True
+			elif kind in RUN_PARTS:
+				accepted = keep
+			else:
+				accepted = type_cache.get(name)
+				if accepted is None:
+					accepted = accepts_type(name)
+				keep = accepted
+				if accepted and by_layer:
+					layer, pos = '0', start
+					while 1:
+						match = find_layer(text, pos, stop)
+						if match is None:
+							break
+						if not text.count('\n', start, match.end()) & 1: # a code line, not an 8 value
+							layer = match.group(1)
+							break
+						pos = match.end()
+					accepted = layer_cache.get(layer)
+					if accepted is None:
+						accepted = accepts_layer(layer)
+					keep = accepted
+			if not accepted:
+				if kept < start:
+					parts.append(text[kept:start])
+				kept = stop
+		parts.append(text[kept:])
+		return ''.join(parts)
+
+	def filter(self, pairs):
+		"""Yields pairs without the rejected entities of the ENTITIES section."""
+		pairs = iter(pairs)
+		by_layer = self.layers is not None or self.exclude_layers is not None
+		accepts_layer, accepts_type = self.accepts_layer, self.accepts_type
+		section = False
+		for code, value in pairs:
+			yield code, value
+			if code == 0:
+				section = value.upper() == 'SECTION'
+				continue
+			if not (section and code == 2 and value.upper() == 'ENTITIES'):
+				section = False
+				continue
+			section = False
+			keep = True
+			held = None # pairs of an entity waiting for its layer
+			for code, value in pairs:
+				if code == 0:
+					if held is not None: # no 8 code, the entity is on layer 0
+						keep = accepts_layer('0')
+						if keep:
+							yield from held
+						held = None
+					kind = value.upper()
+					if kind == 'ENDSEC':
+						yield code, value
+						break
+					if kind in RUN_PARTS:
+						if keep:
+							yield code, value
+						continue
+					keep = accepts_type(value)
+					if keep and by_layer:
+						held = [(code, value)]
+					elif keep:
+						yield code, value
+				elif held is not None:
+					held.append((code, value))
+					if code == 8:
+						keep = accepts_layer(value)
+						if keep:
+							yield from held
+						held = None
+				elif keep:
+					yield code, value
+			else:
+				if held is not None and accepts_layer('0'):
+					yield from held
+
+	def __repr__(self):
+		def names(matcher):
+			return matcher and sorted(matcher[0])
+		return "%s: layers - %s, exclude_layers - %s, types - %s, exclude_types - %s" %(self.__class__.__name__,
+			names(self.layers), names(self.exclude_layers), names(self.types), names(self.exclude_types))
+
+def entity_filter(layers=None, exclude_layers=None, types=None, exclude_types=None):
+	"""Returns the EntityFilter for these arguments, None if they select everything."""
+	if layers is None and exclude_layers is None and types is None and exclude_types is None:
+		return None
+	return EntityFilter(layers, exclude_layers, types, exclude_types)
 
-def handleObject(infile):
+
+# binary dxf files start with this sentinel, then come (code, value) pairs with
+# 1 byte codes (255 announces a 2 byte code) up to R12 and 2 byte codes after
+BINARY_SENTINEL = b'AutoCAD Binary DXF\r\n\x1a\x00'
+
+def _binary_types():
+	"""Builds the group code -> binary value type table used by iter_binary_pairs.
+	value types:
+		'h' int16 = 60-79, 170-179, 270-289, 370-389, 400-409, 1060-1070
+		'l' int32 = 90-99, 420-429, 440-459, 1071
+		'q' int64 = 160-169
+		'd' double = 10-59, 110-149, 210-239, 460-469, 1010-1059
+		'b' 1 byte boolean = 290-299
+		'x' binary chunk (1 byte length + data) = 310-319, 1004
+		's' zero terminated string = everything else
+	The table covers every 2 byte code, so no range check is needed.
+	"""
+	table = ['s'] * 65536
+	def fill(kind, *ranges):
+		for first, last in ranges:
+			for code in range(first, last + 1):
+				table[code] = kind
+	fill('h', (60, 79), (170, 179), (270, 289), (370, 389), (400, 409), (1060, 1070))
+	fill('l', (90, 99), (420, 429), (440, 459), (1071, 1071))
+	fill('q', (160, 169))
+	fill('d', (10, 59), (110, 149), (210, 239), (460, 469), (1010, 1059))
+	fill('b', (290, 299))
+	fill('x', (310, 319), (1004, 1004))
+	return tuple(table)
+
+BINARY_TYPES = _binary_types()
+# binary numbers come decoded, only the hex strings are left to convert
+BINARY_CONVERTERS = tuple(converter if converter is _to_hex else None for converter in CONVERTERS)
+
+_INT16 = struct.Struct('<h')
+_INT32 = struct.Struct('<i')
+_INT64 = struct.Struct('<q')
+_DOUBLE = struct.Struct('<d')
+# three doubles in a row (a point: 10, 20, 30) with the codes between them
+_POINT_WIDE = struct.Struct('<dHdHd')
+_POINT_NARROW = struct.Struct('<dBdBd')
+
+def is_binary_dxf(filename):
+	"""Returns True if filename starts with the binary dxf sentinel."""
+	with open(filename, 'rb') as infile:
+		return infile.read(len(BINARY_SENTINEL)) == BINARY_SENTINEL
+
+def iter_binary_pairs(buf, encoding='cp1252'):
+	"""Yields the (code, value) pairs of a binary dxf buffer (sentinel included).
+
+	Numbers are decoded with precompiled structs, a run of three doubles (a
+	point) with a single unpack.  The buffer is decoded once as latin-1 (one
+	char per byte) so strings are found and sliced without a decode each;
+	only the non ascii ones are decoded again with encoding.  int64 and
+	boolean values and binary chunks (as hex) are returned as the strings an
+	ascii file would hold for them.
+	"""
+	types = BINARY_TYPES
+	double, int16, int32 = _DOUBLE.unpack_from, _INT16.unpack_from, _INT32.unpack_from
+	text = buf.decode('latin-1')
+	find = text.find
+	size = len(buf)
+	pos = len(BINARY_SENTINEL)
+	first = buf[pos:pos + 2]
+	# R12 files start with a 1 byte code: 0 followed by the SECTION string, or 255 and a 2 byte code
+	wide = not (len(first) == 2 and first[0] in (0, 255) and first[1] != 0)
+	if wide:
+		point, point_size = _POINT_WIDE.unpack_from, 28
+	else: # a code 255 escape is never taken for a double, its type is 's'
+		point, point_size = _POINT_NARROW.unpack_from, 26
+	last_point = size - point_size
+	while pos < size:
+		if wide:
+			code = buf[pos] | buf[pos + 1] << 8
+			pos += 2
+		else:
+			code = buf[pos]
+			pos += 1
+			if code == 255:
+				code = buf[pos] | buf[pos + 1] << 8
+				pos += 2
+		kind = types[code]
+		if kind == 'd':
+			if pos <= last_point:
+				x, code_y, y, code_z, z = point(buf, pos)
+				if types[code_y] == 'd' and types[code_z] == 'd':
+					pos += point_size
+					yield code, x
+					yield code_y, y
+					yield code_z, z
+					continue
+			value = double(buf, pos)[0]
+			pos += 8
+		elif kind == 's':
+			end = find('\x00', pos)
+			if end == -1:
+				end = size
+			value = text[pos:end]
+			if not value.isascii():
+				value = value.encode('latin-1').decode(encoding, 'replace')
+			pos = end + 1
+		elif kind == 'h':
+			value = int16(buf, pos)[0]
+			pos += 2
+		elif kind == 'l':
+			value = int32(buf, pos)[0]
+			pos += 4
+		elif kind == 'q':
+			value = str(_INT64.unpack_from(buf, pos)[0])
+			pos += 8
+		elif kind == 'b':
+			value = str(buf[pos])
+			pos += 1
+		else: # 'x'
+			length = buf[pos]
+			value = bytes(buf[pos + 1:pos + 1 + length]).hex().upper()
+			pos += 1 + length
+		yield code, value
+
+def read_binary(filename, select=None):
+	"""Reads a binary dxf file into a drawing of raw (not yet objectified) sections.
+
+	The HEADER section is read first to find the code page of the strings.
+	select is an EntityFilter or None.
+	"""
+	with open(filename, 'rb') as infile:
+		buf = infile.read()
+	drawing = Object('drawing')
+	events = iter_events(iter_binary_pairs(buf, 'latin-1'), BINARY_CONVERTERS)
+	section = findObject(events, 'section')
+	if not section:
+		print("There has been an error:")
+		print("Failed to find any sections!")
+		return None
+	encoding = None
+	read_section(events, section)
+	if get_name(section.data)[1] == 'HEADER':
+		encoding = header_encoding(section)[1]
+	try:
+		codecs.lookup(encoding)
+	except (LookupError, TypeError): # DXFcodePage can be invalid
+		encoding = locale.getpreferredencoding(False)
+	pairs = iter_binary_pairs(buf, encoding)
+	if select is not None:
+		pairs = select.filter(pairs)
+	events = iter_events(pairs, BINARY_CONVERTERS)
+	section = findObject(events, 'section')
+	while section:
+		if read_section(events, section) == 'section': # shouldn't happen
+			print("Warning: failed to close previous section!")
+		else:
+			drawing.data.append(section)
+		section = findObject(events, 'section')
+	return drawing
+
+
+def findObject(events, kind=''):
+	"""Finds the next occurance of an object."""
+	for event, code, value in events:
+		if event != GROUP and event != ENTITY_END:
+			if not kind or value == kind:
+				return Object(value)
+	return False
+
+def handleObject(events):
 	"""Add data to an object until end of object is found."""
-	line = infile.readline()
-	if line.lower().strip() == 'section':
+	for event, code, kind in events:
+		break
+	else:
+		print("Warning: unexpected end of file!")
+		return 'endsec'
+	if event == SECTION_START:
 		return 'section' # this would be a problem
-	elif line.lower().strip() == 'endsec':
+	elif event == SECTION_END:
 		return 'endsec' # this means we are done with a section
 	else: # add data to the object until we find a new object
-		obj = Object(line.lower().strip())
-		obj.name = obj.type
-		done = False
-		data = []
-		while not done:
-			line = infile.readline()
-			if not data:
-				if line.lower().strip() == '0':
-					#we've found an object, time to return
-					return obj
-				else:
-					# first part is always an int
-					data.append(int(line.lower().strip()))
-			else:
-				data.append(convert(data[0], line.strip()))
-				obj.data.append(data)
-				data = []
+		obj = Object(kind)
+		obj.name = kind
+		data = obj.data
+		for event, code, value in events:
+			if event != GROUP:
+				break # we've found the end of the object
+			data.append([code, value])
+		return obj
 
-def handleTable(table, infile):
+def handleTable(table, events):
 	"""Special handler for dealing with nested table objects."""
 	item, name = get_name(table.data)
 	if name: # We should always find a name
@@ -214,7 +603,7 @@ def handleTable(table, infile):
 	# This next bit is from handleObject
 	# handleObject should be generalized to work with any section like object
 	while 1:
-		obj = handleObject(infile)
+		obj = handleObject(events)
 		if obj.type == 'table':
 			print("Warning: previous table not closed!")
 			return table
@@ -226,7 +615,7 @@ def handleTable(table, infile):
 
 
 
-def handleBlock(block, infile):
+def handleBlock(block, events):
 	"""Special handler for dealing with nested table objects."""
 	item, name = get_name(block.data)
 	if name: # We should always find a name
@@ -235,7 +624,7 @@ def handleBlock(block, infile):
 	# This next bit is from handleObject
 	# handleObject should be generalized to work with any section like object
 	while 1:
-		obj = handleObject(infile)
+		obj = handleObject(events)
 		if obj.type == 'block':
 			print("Warning: previous block not closed!")
 			return block
@@ -247,6 +636,98 @@ def handleBlock(block, infile):
 
 
 
+def read_section(events, section):
+	"""Adds the header data and the objects of a section to it.
+
+	Returns 'endsec' when the section was properly closed, 'section' when a new
+	section started before that.
+	"""
+	# add the [index, data] pairs of the section header to the sections data,
+	# then read each object of the section.
+	data = section.data
+	for event, code, value in events:
+		if event != GROUP:
+			break # end of the section header
+		data.append([code, value])
+	while 1: # no way out unless we find an end section or a new section
+		obj = handleObject(events)
+		if obj == 'section' or obj == 'endsec':
+			return obj
+		elif obj.type == 'table': # tables are collections of data
+			obj = handleTable(obj, events) # we need to find all there contents
+			section.data.append(obj) # before moving on
+		elif obj.type == 'block': # the same is true of blocks
+			obj = handleBlock(obj, events) # we need to find all there contents
+			section.data.append(obj) # before moving on
+		else: # found another sub-object
+			section.data.append(obj)
+
+def objectify_section(section, keep_data=True, clock=None):
+	"""Names a parsed section after its 2 code and casts its raw objects into the right types of object.
+
+	Returns the section name, or None for a section without name.  keep_data and clock are passed to objectify.
+	"""
+	item, name = get_name(section.data)
+	if name:
+		section.data.remove(item)
+		section.name = name.lower()
+		section.data = objectify(section.data, keep_data, clock)
+		return section.name
+	return None
+
+def objectify_drawing(drawing, keep_data=True, clock=None):
+	"""Objectifies the raw sections of a drawing and makes them drawing attributes (drawing.entities, ...).
+
+	drawing.block_index maps the block names to their Block objects.
+	"""
+	drawing.block_index = {}
+	for obj in drawing.data:
+		# Call the objectify function to cast
+		# raw objects into the right types of object
+		name = objectify_section(obj, keep_data, clock)
+		if name:
+			setattr(drawing, name, obj)
+		if name == 'blocks':
+			drawing.block_index = block_index(obj.data)
+
+def header_encoding(headerSection):
+	"""Reads $ACADVER and $DWGCODEPAGE from a parsed HEADER section.
+
+	Returns (acadVersion, encoding) where encoding is a python code page name or None.
+	"""
+	acadVersion='AC1021' # a sane pre-initialization for DXF files missing $ACADVER (pde)
+	DXFcodePage, varName = None, None
+	for item in headerSection.data:
+		if item[0] == 9:
+			if item[1] == '$ACADVER' or item[1] == '$DWGCODEPAGE':
+				varName = item[1]
+			else:
+				varName = None
+		elif varName and (item[0] == 1 or item[0] == 3):
+			varValue = convert(item[0], item[1])
+			if varName == '$ACADVER':
+				acadVersion = varValue
+			else:
+				DXFcodePage = varValue
+			varName = None
+		if acadVersion and DXFcodePage:
+			break
+	if not acadVersion:
+		return acadVersion, None
+	if acadVersion > 'AC1018':
+		DXFcodePage = 'utf-8'
+	elif DXFcodePage:
+		# The codepage name in the DXF file does not use the same convention as the python code page names
+		if DXFcodePage.casefold() == 'ansi_936':  # Case insensitive check (pde)
+			DXFcodePage = 'gbk'
+		else:
+			match = re.match('(?i)\\Aansi_([0-9]+)\\Z', DXFcodePage)
+			if match:
+				DXFcodePage = 'cp'+match.group(1)
+	return acadVersion, DXFcodePage
+
+
+
 """These are the states/functions used in the State Machine.
 states:
  start - find first section
@@ -260,83 +741,32 @@ def start(infile, acadVersion):
 	"""Initializes the drawing."""
 	#print "Entering start state!"
 	drawing = Object('drawing')
-	section = findObject(infile, 'section')
+	events = iter_events(iter_pairs(infile))
+	section = findObject(events, 'section')
 	if section:
-		return start_section, (infile, drawing, section, acadVersion)
+		return start_section, (infile, events, drawing, section, acadVersion)
 	else:
 		return error, (infile, "Failed to find any sections!")
 
-def start_section(infile, drawing, section, acadVersion):
+def start_section(infile, events, drawing, section, acadVersion):
 	"""Builds a nested section object."""
 	#print "Entering start_section state!"
-	# read each line, if it is an object declaration go to object mode
-	# otherwise create a [index, data] pair and add it to the sections data.
-	done = False
-	data = []
-	while not done:
-		line = infile.readline()
-
-		if not data: # if we haven't found a dxf code yet
-			if line.lower().strip() == '0':
-				# we've found an object
-				while 1: # no way out unless we find an end section or a new section
-					obj = handleObject(infile)
-					if obj == 'section': # shouldn't happen
-						print("Warning: failed to close previous section!")
-						return end_section, (infile, drawing, acadVersion)
-					elif obj == 'endsec': # This section is over, look for the next
-						drawing.data.append(section)
-						return end_section, (infile, drawing, acadVersion)
-					elif obj.type == 'table': # tables are collections of data
-						obj = handleTable(obj, infile) # we need to find all there contents
-						section.data.append(obj) # before moving on
-					elif obj.type == 'block': # the same is true of blocks
-						obj = handleBlock(obj, infile) # we need to find all there contents
-						section.data.append(obj) # before moving on
-					else: # found another sub-object
-						section.data.append(obj)
-			else:
-				data.append(int(line.lower().strip()))
-		else: # we have our code, now we just need to convert the data and add it to our list.
-			data.append(convert(data[0], line.strip()))
-			section.data.append(data)
-			data = []
-def end_section(infile, drawing, acadVersion):
+	if read_section(events, section) == 'section': # shouldn't happen
+		print("Warning: failed to close previous section!")
+	else: # This section is over, look for the next
+		drawing.data.append(section)
+	return end_section, (infile, events, drawing, acadVersion)
+
+def end_section(infile, events, drawing, acadVersion):
 	"""Verifies if we have version info, searches for next section."""
 	#print("Entering end_section state!")
 	if not acadVersion:
-		acadVersion='AC1021' # a sane pre-initialization for DXF files missing $ACADVER (pde)
 		headerSection = drawing.data[0]
 		if get_name(headerSection.data)[1] != 'HEADER':
 			return error, (infile, "First section is not HEADER")
-		DXFcodePage, varName = None, None
-		for item in headerSection.data:
-			if item[0] == 9:
-				if item[1] == '$ACADVER' or item[1] == '$DWGCODEPAGE':
-					varName = item[1]
-				else:
-					varName = None
-			elif varName and (item[0] == 1 or item[0] == 3):
-				varValue = convert(item[0], item[1])
-				if varName == '$ACADVER':
-					acadVersion = varValue
-				else:
-					DXFcodePage = varValue
-				varName = None
-			if acadVersion and DXFcodePage:
-				break
+		acadVersion, DXFcodePage = header_encoding(headerSection)
 		if not acadVersion:
 			return error, (infile, "Unable to identify DXF file version, missing $ACADVER in file!")  # Verbose error message (pde)
-		if acadVersion > 'AC1018':
-			DXFcodePage = 'utf-8'
-		elif DXFcodePage:
-			# The codepage name in the DXF file does not use the same convention as the python code page names
-			if DXFcodePage.casefold() == 'ansi_936':  # Case insensitive check (pde)
-				DXFcodePage = 'gbk'
-			else:
-				match = re.match('(?i)\\Aansi_([0-9]+)\\Z', DXFcodePage)
-				if match:
-					DXFcodePage = 'cp'+match.group(1)
 		if DXFcodePage:
 			try:  # DXFcodePage can be invalid
 				# Restart with infile changed to the correct encoding. There is no way of changing existing infile
@@ -351,9 +781,9 @@ def end_section(infile, drawing, acadVersion):
 			except:
 				pass
 
-	section = findObject(infile, 'section')
+	section = findObject(events, 'section')
 	if section:
-		return start_section, (infile, drawing, section, acadVersion)
+		return start_section, (infile, events, drawing, section, acadVersion)
 	else:
 		return end, (infile, drawing)
 
@@ -370,7 +800,431 @@ def error(infile, err):
 	print(err)
 	return False
 
-def readDXF(filename):
+@contextlib.contextmanager
+def gc_paused():
+	"""Pauses the cyclic garbage collector.
+
+	The parsed trees are made of a huge number of small lists without reference cycles,
+	running the collector while they grow only slows the import down.
+	"""
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+
+#---memory mapped section scanner, used for lazy loading
+def _find_code0(buf, word, start, end):
+	"""Yields the offsets of the '0' code lines followed by a line holding only word (bytes).
+
+	A match can not be a value line: the line following a value is a numeric code.
+	"""
+	size = len(word)
+	pos = buf.find(word, start, end)
+	while pos != -1:
+		after = pos + size
+		if (after == len(buf) or buf[after] in b'\r\n \t') and pos > 1 and buf[pos - 1] == 10:
+			line = buf.rfind(b'\n', 0, pos - 1) + 1
+			if buf[line:pos - 1].strip() == b'0' and buf[after:buf.find(b'\n', after, after + 64)].strip() == b'':
+				yield line
+		pos = buf.find(word, after, end)
+
+def _line_end(buf, pos):
+	"""Returns the offset following the line starting at pos."""
+	end = buf.find(b'\n', pos)
+	return len(buf) if end == -1 else end + 1
+
+def _group_name(buf, pos):
+	"""Returns the lowercase 2 code value that follows the 0 code pair starting at pos."""
+	lines = bytes(buf[pos:pos + 512]).decode('latin-1').split('\n')
+	if len(lines) > 3 and lines[2].strip() == '2':
+		return lines[3].strip().lower()
+	return ''
+
+def _scan(buf, start, end, opening, closing):
+	"""Returns (name, start, end) for each opening...closing block between start and end."""
+	index = []
+	for begin in _find_code0(buf, opening, start, end):
+		if index and begin < index[-1][2]:
+			continue
+		close = next(_find_code0(buf, closing, begin, end), None)
+		if close is None:
+			stop = end # not closed, parse up to the end
+		else:
+			stop = _line_end(buf, _line_end(buf, close))
+		index.append((_group_name(buf, begin), begin, stop))
+	return index
+
+def scan_sections(buf):
+	"""Returns (name, start, end) byte offsets of each SECTION...ENDSEC of a dxf buffer."""
+	return _scan(buf, 0, len(buf), b'SECTION', b'ENDSEC')
+
+def scan_tables(buf, start, end):
+	"""Returns (name, start, end) byte offsets of each TABLE...ENDTAB between start and end."""
+	return _scan(buf, start, end, b'TABLE', b'ENDTAB')
+
+_CODE0 = re.compile(br'\n[ \t]*0[ \t]*\r?\n[ \t]*([^\r\n]*)')
+_RUN_PARTS = (b'VERTEX', b'SEQEND', b'ATTRIB') # never the first entity of a partition
+
+def _entity_boundary(buf, pos, end):
+	"""Returns the offset of the first 0 code line after pos that starts an independent entity, or None.
+
+	A 0 code line is a '0' line followed by a name; a '0' value line is followed by a numeric code.
+	"""
+	match = _CODE0.search(buf, pos, end)
+	while match:
+		name = match.group(1).strip()
+		if name and not name.lstrip(b'-').isdigit() and name not in _RUN_PARTS:
+			return match.start() + 1
+		match = _CODE0.search(buf, match.start() + 1, end)
+	return None
+
+def split_entities(buf, start, end, parts):
+	"""Splits the entities of the section between start and end in about parts byte ranges.
+
+	Returns a list of (start, end) offsets in file order.  Each range starts with a 0 code
+	line and the POLYLINE/VERTEX/SEQEND and INSERT/ATTRIB/SEQEND runs are never cut.
+	"""
+	first = _entity_boundary(buf, start, end)
+	stop = next(_find_code0(buf, b'ENDSEC', start, end), end)
+	if first is None or first >= stop:
+		return []
+	bounds = [first]
+	step = (stop - first) // max(parts, 1)
+	for i in range(1, parts):
+		pos = _entity_boundary(buf, max(first + i * step, bounds[-1]), end)
+		if pos is None or pos >= stop:
+			break
+		if pos > bounds[-1]:
+			bounds.append(pos)
+	bounds.append(stop)
+	return list(zip(bounds[:-1], bounds[1:]))
+
+def read_partition(filename, start, end, encoding, keep_data=True, select=None):
+	"""Parses and objectifies the entities found between start and end of filename.
+
+	This is the worker of LazyDrawing.section(name, workers), the result is packed by pack_wrappers.
+	"""
+	with open(filename, 'rb') as infile:
+		infile.seek(start)
+		chunk = infile.read(end - start)
+	text = '  0\nSECTION\n  2\nENTITIES\n' + str(chunk, encoding) + '  0\nENDSEC\n'
+	if select is not None:
+		text = select.filter_text(text)
+	with gc_paused():
+		events = iter_events(iter_pairs(io.StringIO(text)))
+		section = findObject(events, 'section')
+		read_section(events, section)
+		objectify_section(section, keep_data)
+		return pack_wrappers(section.data)
+
+
+class LazyDrawing(Object):
+	"""A drawing whose sections are parsed on first access.
+
+	The file is memory mapped and only the offsets of its sections (and of the
+	tables of the TABLES section) are indexed when it is opened.  Accessing
+	drawing.entities, drawing.tables, ... parses and objectifies that section
+	only; drawing.data parses all of them.  table(name) parses a single table.
+	drawing.block_index parses the blocks section.
+	keep_data is passed to objectify for every section, select (an EntityFilter
+	or None) filters the entities section.
+
+	section('entities', workers) splits the ENTITIES section at entity boundaries
+	and parses the parts in a pool of processes.
+	"""
+
+	def __init__(self, filename, keep_data=True, select=None):
+		self.type = 'drawing'
+		self.name = filename
+		self.keep_data = keep_data
+		self.select = select
+		self._file = open(filename, 'rb')
+		if os.fstat(self._file.fileno()).st_size:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		else:
+			self._map = b''
+		self.section_index = scan_sections(self._map)
+		self.table_index = []
+		for name, start, end in self.section_index:
+			if name == 'tables':
+				self.table_index = scan_tables(self._map, start, end)
+		self._sections = {}
+		self._tables = {}
+		self.acadVersion, self.encoding = None, None
+		header = self._parse('header', 'latin-1') # header vars are plain ascii
+		if header is not None:
+			self.acadVersion, self.encoding = header_encoding(header)
+		try:
+			codecs.lookup(self.encoding)
+		except (LookupError, TypeError): # DXFcodePage can be invalid
+			self.encoding = locale.getpreferredencoding(False)
+
+	def _events(self, start, end, encoding=None):
+		text = str(memoryview(self._map)[start:end], encoding or self.encoding)
+		return iter_events(iter_pairs(io.StringIO(text)))
+
+	def _parse(self, name, encoding=None):
+		"""Returns the raw (not yet objectified) section called name or None."""
+		for section_name, start, end in self.section_index:
+			if section_name == name:
+				if name == 'entities' and self.select is not None:
+					text = self.select.filter_text(str(memoryview(self._map)[start:end], encoding or self.encoding))
+					events = iter_events(iter_pairs(io.StringIO(text)))
+				else:
+					events = self._events(start, end, encoding)
+				section = findObject(events, 'section')
+				read_section(events, section)
+				return section
+		return None
+
+	def __getattr__(self, name):
+		for section_name, start, end in self.__dict__.get('section_index', ()):
+			if section_name == name:
+				return self.section(name)
+		if name == 'block_index' and 'section_index' in self.__dict__:
+			if 'blocks' in self.section_names():
+				self.section('blocks')
+				return self.block_index
+			return {}
+		raise AttributeError(name)
+
+	def section_names(self):
+		"""Returns the names of the sections of the file, in file order."""
+		return [name for name, start, end in self.section_index]
+
+	def _parse_parallel(self, name, workers):
+		"""Returns the objectified section called name read by a pool of workers, None if too small to split."""
+		for section_name, start, end in self.section_index:
+			if section_name == name:
+				parts = min(workers * 2, (end - start) // PARTITION_SIZE)
+				ranges = split_entities(self._map, start, end, parts) if parts > 1 else []
+				if len(ranges) < 2:
+					return None
+				section = Object('section')
+				section.name = name
+				with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+					futures = [pool.submit(read_partition, self.name, begin, stop, self.encoding, self.keep_data, self.select)
+							   for begin, stop in ranges]
+					for future in futures: # in file order
+						section.data.extend(unpack_wrappers(future.result()))
+				return section
+		raise KeyError(name)
+
+	def section(self, name, workers=1):
+		"""Returns the objectified section called name, parsing it if needed.
+
+		With workers > 1 the entities section of a big file is read by that many processes.
+		"""
+		if name not in self._sections:
+			section = None
+			if workers > 1 and name == 'entities':
+				section = self._parse_parallel(name, workers)
+			if section is None:
+				with gc_paused():
+					section = self._parse(name)
+					if section is None:
+						raise KeyError(name)
+					objectify_section(section, self.keep_data)
+			self._sections[name] = section
+			setattr(self, name, section) # skip __getattr__ from now on
+			if name == 'blocks':
+				self.block_index = block_index(section.data)
+			if len(self._sections) == len(self.section_index):
+				self.close() # everything is in memory
+		return self._sections[name]
+
+	def table(self, name):
+		"""Returns the objectified table called name (e.g. 'layer'), parsing only that table."""
+		name = name.lower()
+		if 'tables' in self._sections:
+			for table in self._sections['tables'].data:
+				if table.name == name:
+					return table
+			raise KeyError(name)
+		if name not in self._tables:
+			for table_name, start, end in self.table_index:
+				if table_name == name:
+					events = self._events(start, end)
+					table = handleObject(events)
+					handleTable(table, events)
+					table.data = objectify(table.data, self.keep_data)
+					self._tables[name] = table
+					break
+			else:
+				raise KeyError(name)
+		return self._tables[name]
+
+	def get_data(self):
+		return [self.section(name) for name in self.section_names()]
+
+	data = property(get_data)
+
+	def close(self):
+		"""Releases the memory map, sections that were not parsed yet become unavailable."""
+		if self._map:
+			self._map.close()
+		self._file.close()
+		self._map = b''
+
+
+CACHE_SIZE = 512 << 20 # bytes kept in the drawing cache before the least recently used entries go
+CACHE_FORMAT = 1 # bump when the layout of the cache files changes
+
+def schema_stamp():
+	"""Returns a stamp of the wrapper classes of dxfImportObjects (names and slots).
+
+	Cache entries written with another stamp are discarded, so changing a wrapper
+	invalidates the cache without any manual version bump.
+	"""
+	classes = sorted(set(type_map.values()) | set([Polyline, Vertex]), key=lambda cls: cls.__name__)
+	text = repr([CACHE_FORMAT] + [(cls.__name__, cls.__slots__) for cls in classes])
+	return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+def default_cache_dir():
+	"""The dxf_cache folder of the FreeCAD macro folder (of this module's folder outside FreeCAD)."""
+	try:
+		import FreeCAD
+		macro_dir = FreeCAD.getUserMacroDir(True)
+	except ImportError:
+		macro_dir = os.path.dirname(os.path.abspath(__file__))
+	return os.path.join(macro_dir, 'dxf_cache')
+
+
+class DrawingCache(object):
+	"""On disk cache of objectified drawings.
+
+	Entries are keyed by the path, size, mtime and content hash of the dxf file
+	(and keep_data), and stamped with schema_stamp().  Sections are stored as
+	pickled pack_wrappers rows.  Reading an entry refreshes its mtime, the least
+	recently used entries are removed once the folder holds more than max_bytes.
+	"""
+
+	def __init__(self, directory=None, max_bytes=CACHE_SIZE):
+		self.directory = directory or default_cache_dir()
+		self.max_bytes = max_bytes
+		self.stamp = schema_stamp()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def key(self, filename, keep_data=True, select=None):
+		"""Returns the cache key of filename: a hash of its path, size, mtime and contents (and of select)."""
+		info = os.stat(filename)
+		digest = hashlib.blake2b(digest_size=16)
+		digest.update(("%s|%d|%d|%d|%r" %(os.path.abspath(filename), info.st_size, info.st_mtime_ns, bool(keep_data), select)).encode())
+		with open(filename, 'rb') as infile:
+			for chunk in iter(lambda: infile.read(CHUNK_SIZE), b''):
+				digest.update(chunk)
+		return digest.hexdigest()
+
+	def path(self, key):
+		return os.path.join(self.directory, key + '.pickle')
+
+	def load(self, filename, keep_data=True, key=None):
+		"""Returns the cached drawing of filename, or None.  key saves hashing the file again."""
+		path = self.path(key or self.key(filename, keep_data))
+		try:
+			with open(path, 'rb') as infile, gc_paused():
+				stamp, name, sections = pickle.load(infile)
+		except Exception: # no entry, or unreadable
+			self.misses += 1
+			return None
+		if stamp != self.stamp:
+			self.misses += 1
+			self.remove(path)
+			return None
+		drawing = Object('drawing')
+		drawing.name = filename
+		drawing.block_index = {}
+		with gc_paused():
+			for section_name, data in sections:
+				section = Object('section')
+				section.name = section_name
+				section.data = unpack_wrappers(data)
+				drawing.data.append(section)
+				if section_name:
+					setattr(drawing, section_name, section)
+				if section_name == 'blocks':
+					drawing.block_index = block_index(section.data)
+		os.utime(path) # most recently used
+		self.hits += 1
+		return drawing
+
+	def store(self, filename, drawing, keep_data=True, key=None):
+		"""Writes drawing to the cache as the entry of filename, then evicts old entries."""
+		if not os.path.isdir(self.directory):
+			os.makedirs(self.directory)
+		sections = [(section.name, pack_wrappers(section.data)) for section in drawing.data]
+		path = self.path(key or self.key(filename, keep_data))
+		temp = path + '.%d.tmp' % os.getpid()
+		with open(temp, 'wb') as out:
+			pickle.dump((self.stamp, filename, sections), out, pickle.HIGHEST_PROTOCOL)
+		os.replace(temp, path) # readers never see a partial entry
+		self.evict()
+
+	def entries(self):
+		"""Returns (mtime, size, path) of the cache entries, least recently used first."""
+		entries = []
+		if os.path.isdir(self.directory):
+			for name in os.listdir(self.directory):
+				if name.endswith('.pickle'):
+					path = os.path.join(self.directory, name)
+					info = os.stat(path)
+					entries.append((info.st_mtime, info.st_size, path))
+		return sorted(entries)
+
+	def evict(self):
+		"""Removes the least recently used entries until the cache fits in max_bytes."""
+		entries = self.entries()
+		total = sum(size for mtime, size, path in entries)
+		for mtime, size, path in entries[:-1]: # always keep the newest entry
+			if total <= self.max_bytes:
+				break
+			self.remove(path)
+			self.evictions += 1
+			total -= size
+
+	def remove(self, path):
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+
+	def clear(self):
+		"""Removes every entry of the cache."""
+		for mtime, size, path in self.entries():
+			self.remove(path)
+
+	def stats(self):
+		"""Returns a dict with the hit/miss/eviction counts and the size of the cache."""
+		entries = self.entries()
+		lookups = self.hits + self.misses
+		return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+				'hit_rate': self.hits / float(lookups) if lookups else 0.0,
+				'entries': len(entries), 'bytes': sum(size for mtime, size, path in entries)}
+
+	def __repr__(self):
+		return "%s: %s - %d hits, %d misses, %d evictions" %(self.__class__.__name__,
+			self.directory, self.hits, self.misses, self.evictions)
+
+_cache = None
+
+def get_cache():
+	"""Returns the DrawingCache used by readDXF(..., cache=True)."""
+	global _cache
+	if _cache is None:
+		_cache = DrawingCache()
+	return _cache
+
+
+PROFILE = None # an ImportProfile (see dxfProfile) recording every readDXF, for importers calling readDXF(filename)
+
+def readDXF(filename, lazy=False, keep_data=True, workers=1, cache=False, spatial=False,
+			layers=None, exclude_layers=None, types=None, exclude_types=None, profile=None):
 	"""Given a file name try to read it as a dxf file.
 
 	Output is an object with the following structure
@@ -389,7 +1243,95 @@ def readDXF(filename):
 			object data
 	where foo data is a list of sub-objects.  True object data
 	is of the form [code, data].
+
+	With lazy=True a LazyDrawing is returned instead: the file is only
+	indexed and each section is parsed when it is first accessed.
+
+	With keep_data=False the entity wrappers do not keep their raw [code, data]
+	pairs (their data attribute is None), which makes large drawings much lighter.
+
+	With workers > 1 (None for one per core) the ENTITIES section of a big file
+	is split and parsed by a pool of processes; the drawing is returned fully read.
+
+	Binary dxf files are recognized by their sentinel and always read at once,
+	lazy and workers only apply to ascii files.
+
+	With cache=True (or a DrawingCache) the objectified drawing is loaded from
+	the on disk cache when the file did not change, and stored there otherwise;
+	lazy is ignored then.
+
+	With spatial=True drawing.spatial_index is a dxfSpatial.SpatialIndex of the
+	entities (INSERTs expanded) for window and nearest queries.
+
+	layers, exclude_layers, types and exclude_types select the entities of the
+	ENTITIES section that are read (see EntityFilter), e.g. layers='E-POWER' or
+	types=['insert', 'lwpolyline']; the other ones are skipped while the file is
+	tokenized, they are never converted nor wrapped.  Blocks are read whole.
+
+	profile (by default the module PROFILE, None) is a dxfProfile.ImportProfile
+	recording the time of each phase of the read, the entity counts and the
+	memory used.
 """
+	if profile is None:
+		profile = PROFILE
+	if profile is None:
+		return _read_dxf(filename, lazy, keep_data, workers, cache, spatial, layers, exclude_layers, types, exclude_types, None)
+	drawing = None
+	profile.start(filename)
+	try:
+		drawing = _read_dxf(filename, lazy, keep_data, workers, cache, spatial, layers, exclude_layers, types, exclude_types, profile)
+	finally:
+		profile.stop(drawing)
+	if profile.detail:
+		profile.split_parse(filename)
+	return drawing
+
+def _phase(profile, name):
+	"""Returns the context timing the phase name of profile, a no-op without profile."""
+	if profile is None:
+		return contextlib.nullcontext()
+	return profile.phase(name)
+
+def _read_dxf(filename, lazy, keep_data, workers, cache, spatial, layers, exclude_layers, types, exclude_types, profile):
+	"""readDXF without the profile start and stop."""
+	select = entity_filter(layers, exclude_layers, types, exclude_types)
+	if spatial:
+		drawing = _read_dxf(filename, lazy, keep_data, workers, cache, False, layers, exclude_layers, types, exclude_types, profile)
+		if drawing:
+			with _phase(profile, 'spatial'):
+				drawing.spatial_index = SpatialIndex.from_drawing(drawing)
+		return drawing
+	if cache:
+		if not isinstance(cache, DrawingCache):
+			cache = get_cache()
+		key = cache.key(filename, keep_data, select)
+		with _phase(profile, 'cache load'):
+			drawing = cache.load(filename, keep_data, key)
+		if drawing is None:
+			drawing = _read_dxf(filename, False, keep_data, workers, False, False, layers, exclude_layers, types, exclude_types, profile)
+			if drawing:
+				with _phase(profile, 'cache store'):
+					cache.store(filename, drawing, keep_data, key)
+		return drawing
+	if is_binary_dxf(filename):
+		with gc_paused():
+			with _phase(profile, 'parse'):
+				drawing = read_binary(filename, select)
+			if drawing:
+				drawing.name = filename
+				with _phase(profile, 'objectify'):
+					objectify_drawing(drawing, keep_data, profile and profile.clock)
+		return drawing
+	if lazy:
+		with _phase(profile, 'index'):
+			return LazyDrawing(filename, keep_data, select)
+	if workers is None or workers > 1 or select is not None:
+		with _phase(profile, 'sections'): # parse and objectify, section by section
+			drawing = LazyDrawing(filename, keep_data, select)
+			if 'entities' in drawing.section_names() and workers != 1:
+				drawing.section('entities', workers or os.cpu_count() or 1)
+			drawing.get_data() # the other sections, this also closes the file
+		return drawing
 	infile = open(filename, encoding=None)
 
 	sm = StateMachine()
@@ -400,24 +1342,172 @@ def readDXF(filename):
 	sm.add_state(start)
 	sm.set_start(start)
 	try:
-		(infile, drawing) = sm.run((infile, None))
-		if drawing:
-			drawing.name = filename
-			for obj in drawing.data:
-				item, name = get_name(obj.data)
-				if name:
-					obj.data.remove(item)
-					obj.name = name.lower()
-					setattr(drawing, name.lower(), obj)
-					# Call the objectify function to cast
-					# raw objects into the right types of object
-					obj.data = objectify(obj.data)
-				#print obj.name
+		with gc_paused():
+			with _phase(profile, 'parse'):
+				(infile, drawing) = sm.run((infile, None))
+			if drawing:
+				drawing.name = filename
+				with _phase(profile, 'objectify'):
+					objectify_drawing(drawing, keep_data, profile and profile.clock)
 	finally:
 		# if an exception occurs in sm.run after it has reopened infile, this will close a file
 		# already closed, and the open file will be closed when garbage-collected.
 		infile.close()
 	return drawing
+
+
+class BatchResult(object):
+	"""What a worker of iter_batch sends back for one file.
+
+	Only the wrappers are sent, without their raw data: layers (Layer objects),
+	blocks (Block objects) and entities (the wrapped entities of the ENTITIES
+	section, entities of unknown type are only counted in skipped).  error holds
+	the message of a file that could not be read, None otherwise.
+	"""
+	__slots__ = ('name', 'size', 'seconds', 'layers', 'blocks', 'entities', 'skipped', 'error')
+
+	def __init__(self, name):
+		self.name = name
+		self.size = 0
+		self.seconds = 0.0
+		self.layers = []
+		self.blocks = []
+		self.entities = []
+		self.skipped = 0
+		self.error = None
+
+	def __getstate__(self):
+		# the wrappers travel as one row of slot values each: much smaller and
+		# faster to pickle than the generic reduction of every __slots__ object
+		state = {}
+		for name in self.__slots__:
+			state[name] = getattr(self, name)
+			if name in ('layers', 'blocks', 'entities'):
+				state[name] = pack_wrappers(state[name])
+		return state
+
+	def __setstate__(self, state):
+		for name, value in state.items():
+			if name in ('layers', 'blocks', 'entities'):
+				value = unpack_wrappers(value)
+			setattr(self, name, value)
+
+	def throughput(self):
+		"""Returns the reading speed in MB/s."""
+		return self.size / 1e6 / self.seconds if self.seconds else 0.0
+
+	def __repr__(self):
+		if self.error:
+			return "%s: %s - error: %s" %(self.__class__.__name__, self.name, self.error)
+		return "%s: %s - %d entities, %.1f MB in %.2f s (%.1f MB/s)" %(self.__class__.__name__,
+			self.name, len(self.entities), self.size / 1e6, self.seconds, self.throughput())
+
+
+def pack_wrappers(objects):
+	"""Returns (classes, rows) where each row is (class index, slot values) of a wrapper object.
+
+	Raw objects and pairs are kept as (-1, item) rows.
+	"""
+	classes, rows = [], []
+	for obj in objects:
+		if type(obj) == list or isinstance(obj, Object):
+			rows.append((-1, obj)) # raw data is pickled as it is
+			continue
+		cls = obj.__class__
+		if cls not in classes:
+			classes.append(cls)
+		rows.append((classes.index(cls),) + tuple(getattr(obj, name, None) for name in cls.__slots__))
+	return classes, rows
+
+def unpack_wrappers(packed):
+	"""Rebuilds the wrapper objects packed by pack_wrappers."""
+	classes, rows = packed
+	objects = []
+	for row in rows:
+		if row[0] == -1:
+			objects.append(row[1])
+			continue
+		cls = classes[row[0]]
+		obj = cls.__new__(cls)
+		for name, value in zip(cls.__slots__, row[1:]):
+			setattr(obj, name, value)
+		objects.append(obj)
+	return objects
+
+def _wrapped(objects):
+	return [obj for obj in objects if type(obj) != list and not isinstance(obj, Object)]
+
+def read_payload(filename, keep_data=False):
+	"""Reads filename and returns a BatchResult, this is the worker of iter_batch."""
+	result = BatchResult(filename)
+	begin = time.time()
+	try:
+		result.size = os.path.getsize(filename)
+		drawing = readDXF(filename, keep_data=keep_data)
+		if not drawing:
+			raise InitializationError("no dxf data found")
+		for table in getattr(getattr(drawing, 'tables', None), 'data', ()):
+			if table.name == 'layer':
+				result.layers = _wrapped(table.data)
+		result.blocks = _wrapped(getattr(getattr(drawing, 'blocks', None), 'data', ()))
+		entities = getattr(getattr(drawing, 'entities', None), 'data', ())
+		result.entities = _wrapped(entities)
+		result.skipped = len(entities) - len(result.entities)
+	except Exception as err:
+		result.error = "%s: %s" %(err.__class__.__name__, err)
+	result.seconds = time.time() - begin
+	return result
+
+def batch_files(paths):
+	"""Expands paths (a glob pattern or a list of file names and patterns) into a list of files.
+
+	The files are sorted biggest first so that the largest file starts at once.
+	"""
+	if isinstance(paths, str):
+		paths = [paths]
+	files = []
+	for path in paths:
+		for name in (glob.glob(path) if glob.has_magic(path) else [path]):
+			if name not in files:
+				files.append(name)
+	return sorted(files, key=lambda name: -os.path.getsize(name) if os.path.exists(name) else 0)
+
+def iter_batch(paths, max_workers=None, keep_data=False):
+	"""Reads several dxf files in a pool of processes.
+
+	paths is a glob pattern or a list of file names and patterns.  BatchResult
+	objects are yielded as soon as each file is read, in completion order.
+	Inside FreeCAD on Windows multiprocessing.set_executable() must point to a
+	python interpreter for the pool to start.
+	"""
+	files = batch_files(paths)
+	if not files:
+		return
+	with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+		futures = [pool.submit(read_payload, name, keep_data) for name in files]
+		for future in concurrent.futures.as_completed(futures):
+			yield future.result()
+
+def readDXFBatch(paths, max_workers=None, keep_data=False, verbose=True):
+	"""Reads several dxf files in parallel, see iter_batch.
+
+	Returns a dict of file name -> BatchResult.  With verbose the time and throughput
+	of each file are printed as it completes, and the totals at the end.
+	"""
+	results = {}
+	begin = time.time()
+	for result in iter_batch(paths, max_workers, keep_data):
+		results[result.name] = result
+		if verbose:
+			print(result)
+	if verbose and results:
+		wall = time.time() - begin
+		size = sum(result.size for result in results.values())
+		work = sum(result.seconds for result in results.values())
+		print("%d files, %.1f MB in %.2f s (%.1f MB/s), %.2f s of reading time" %(len(results),
+			size / 1e6, wall, size / 1e6 / wall if wall else 0.0, work))
+	return results
+
 if __name__ == "__main__":
 	filename = r".\examples\block-test.dxf"
 	drawing = readDXF(filename)
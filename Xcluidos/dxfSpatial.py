@@ -0,0 +1,334 @@
+"""This module provides a spatial index over the entities of an imported dxf drawing.
+
+	The index is a uniform grid of square cells over the XY plane; every entity is
+	registered in the cells its bounding box touches.  Bounding boxes take the true
+	extents of circles, arcs and bulged polyline segments, and INSERTs are expanded
+	(see dxfBlocks) so a symbol is found where it is drawn, not at its insert point.
+
+	Typical use:
+		drawing = dxfReader.readDXF(filename, spatial=True)
+		near = drawing.spatial_index.near(x, y, 500, layers=['E-POWER'])
+"""
+
+import heapq
+from math import sqrt, atan2, degrees, floor, cos, sin, radians
+from array import array
+
+from dxfImportObjects import (Line, LWpolyline, Polyline, Circle, Arc, Ellipse, Text, Mtext,
+	Face, Insert, POLYLINE_3D, POLYGON_MESH, POLYFACE_MESH)
+from dxfBlocks import BlockExpander, ocs_matrix, IDENTITY
+
+
+def arc_bbox(cx, cy, r, start, end):
+	"""Returns (xmin, ymin, xmax, ymax) of a counterclockwise arc, angles in degrees."""
+	start, end = start % 360, end % 360
+	if end <= start:
+		end += 360
+	xs = [cx + r * cos(radians(start)), cx + r * cos(radians(end))]
+	ys = [cy + r * sin(radians(start)), cy + r * sin(radians(end))]
+	quadrant = 90 * floor(start / 90) + 90
+	while quadrant < end: # axis extremes swept by the arc
+		xs.append(cx + r * cos(radians(quadrant)))
+		ys.append(cy + r * sin(radians(quadrant)))
+		quadrant += 90
+	return min(xs), min(ys), max(xs), max(ys)
+
+
+def bulge_bbox(x1, y1, x2, y2, bulge):
+	"""Returns the bbox of a polyline segment from (x1, y1) to (x2, y2) with a bulge.
+
+	The bulge is tan(included angle / 4), positive for counterclockwise arcs.
+	"""
+	if not bulge:
+		return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+	dx, dy = x2 - x1, y2 - y1
+	chord = sqrt(dx*dx + dy*dy)
+	if not chord:
+		return x1, y1, x1, y1
+	# the center is on the left normal of the chord, at (chord / 2) * (1 - b^2) / (2b) from its middle
+	k = (1 - bulge*bulge) / (2 * bulge)
+	cx, cy = (x1 + x2) / 2 - dy * k / 2, (y1 + y2) / 2 + dx * k / 2
+	r = chord * (1 + bulge*bulge) / (4 * abs(bulge))
+	a1, a2 = degrees(atan2(y1 - cy, x1 - cx)), degrees(atan2(y2 - cy, x2 - cx))
+	if bulge < 0: # clockwise: the same arc counterclockwise from the end point
+		a1, a2 = a2, a1
+	return arc_bbox(cx, cy, r, a1, a2)
+
+
+def _union(boxes):
+	return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+			max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+def _points_bbox(points):
+	xs = [point[0] for point in points]
+	ys = [point[1] for point in points]
+	return min(xs), min(ys), max(xs), max(ys)
+
+
+def _to_world(bbox, extrusion, z=0.0):
+	"""Returns the world XY bbox of an OCS bbox (its corners transformed)."""
+	matrix = ocs_matrix(extrusion)
+	if matrix is IDENTITY:
+		return bbox
+	a, b, c, d, e, f, g, h = matrix[:8]
+	xmin, ymin, xmax, ymax = bbox
+	corners = [(a*x + b*y + c*z + d, e*x + f*y + g*z + h) for x in (xmin, xmax) for y in (ymin, ymax)]
+	return _points_bbox(corners)
+
+
+def _vertices_bbox(xy, bulges, step, closed):
+	"""bbox of packed polyline vertices (step 2 for x, y pairs, 3 for x, y, z triples)."""
+	count = len(xy) // step
+	if not count:
+		return None
+	boxes = []
+	segments = count if closed else count - 1
+	for i in range(max(segments, 0)):
+		j = (i + 1) % count
+		boxes.append(bulge_bbox(xy[i*step], xy[i*step+1], xy[j*step], xy[j*step+1], bulges[i]))
+	if not boxes:
+		return xy[0], xy[1], xy[0], xy[1]
+	return _union(boxes)
+
+
+def entity_bbox(entity, expander=None):
+	"""Returns the world XY bounding box (xmin, ymin, xmax, ymax) of a wrapped entity, or None.
+
+	expander (a dxfBlocks.BlockExpander) is needed for INSERTs.
+	"""
+	if isinstance(entity, (Line, Face)):
+		return _points_bbox(entity.points)
+	if isinstance(entity, LWpolyline):
+		bbox = _vertices_bbox(entity.coords, entity.bulges, 2, entity.closed)
+		return bbox and _to_world(bbox, entity.extrusion, entity.elevation)
+	if isinstance(entity, Polyline):
+		if entity.flags & (POLYLINE_3D | POLYGON_MESH | POLYFACE_MESH):
+			xyz = entity.coords
+			if not xyz:
+				return None
+			return _points_bbox([xyz[n:n+2] for n in range(0, len(xyz), 3)])
+		bbox = _vertices_bbox(entity.coords, entity.bulges, 3, entity.closed)
+		return bbox and _to_world(bbox, entity.extrusion, entity.elevation)
+	if isinstance(entity, Circle):
+		x, y, z = entity.loc
+		r = entity.radius
+		return _to_world((x - r, y - r, x + r, y + r), entity.extrusion, z)
+	if isinstance(entity, Arc):
+		x, y, z = entity.loc
+		return _to_world(arc_bbox(x, y, entity.radius, entity.start_angle, entity.end_angle), entity.extrusion, z)
+	if isinstance(entity, Ellipse):
+		x, y, z = entity.loc
+		r = sqrt(entity.major[0]**2 + entity.major[1]**2 + entity.major[2]**2)
+		return x - r, y - r, x + r, y + r
+	if isinstance(entity, (Text, Mtext)):
+		x, y, z = entity.loc
+		h = entity.height
+		return _to_world((x, y, x + h, y + h), entity.extrusion, z)
+	if isinstance(entity, Insert) and expander is not None:
+		return insert_bbox(entity, expander)
+	return None
+
+
+def insert_bbox(insert, expander):
+	"""bbox of the expanded geometry of an INSERT (every copy of its array), or None."""
+	geometry = expander.expand(insert)
+	if geometry is None or not len(geometry.flat):
+		return None
+	coords = geometry.coords
+	xs, ys = coords[0::3], coords[1::3]
+	xmin, ymin, xmax, ymax = min(xs), min(ys), max(xs), max(ys)
+	# points only give circle and arc centers, grow the box by the largest scaled radius
+	scale = max(abs(insert.scale[0]), abs(insert.scale[1]))
+	margin = max([entity.radius for entity, start, count in geometry.flat.items
+				  if isinstance(entity, (Circle, Arc, Ellipse))] or [0]) * scale
+	return float(xmin) - margin, float(ymin) - margin, float(xmax) + margin, float(ymax) + margin
+
+
+class SpatialIndex(object):
+	"""Uniform grid over the XY bounding boxes of entities.
+
+	boxes holds xmin, ymin, xmax, ymax of each entity (array('d')), entities and
+	layers (upper case, dxf layer names ignore case) are parallel lists and cells
+	maps (column, row) to entity numbers.  bounds is the union of the boxes, kept
+	up to date by add (None while the index is empty).
+	"""
+
+	def __init__(self, cell_size=None):
+		self.cell_size = cell_size
+		self.boxes = array('d')
+		self.entities = []
+		self.layers = []
+		self.cells = {}
+		self.bounds = None
+
+	@classmethod
+	def from_entities(cls, entities, blocks=None, cell_size=None):
+		"""Builds the index of the entities that have geometry.
+
+		blocks (a block index or a blocks section's data) lets INSERTs be expanded.
+		Without cell_size the cells hold about a few entities each on average.
+		"""
+		index = cls(cell_size)
+		expander = BlockExpander(blocks) if blocks is not None else None
+		pending = []
+		for entity in entities:
+			if type(entity) == list:
+				continue
+			bbox = entity_bbox(entity, expander)
+			if bbox is not None:
+				pending.append((entity, bbox))
+		if index.cell_size is None:
+			index.cell_size = index.auto_cell_size([bbox for entity, bbox in pending])
+		for entity, bbox in pending:
+			index.add(entity, bbox)
+		return index
+
+	@classmethod
+	def from_drawing(cls, drawing, cell_size=None):
+		"""Builds the index of drawing.entities, INSERTs expanded with drawing.block_index."""
+		entities = drawing.entities.data if hasattr(drawing, 'entities') else []
+		return cls.from_entities(entities, getattr(drawing, 'block_index', None), cell_size)
+
+	@staticmethod
+	def auto_cell_size(boxes):
+		if not boxes:
+			return 1.0
+		xmin, ymin, xmax, ymax = _union(boxes)
+		area = max(xmax - xmin, 1e-9) * max(ymax - ymin, 1e-9)
+		return max(sqrt(area / len(boxes)) * 2, 1e-6)
+
+	def _span(self, xmin, ymin, xmax, ymax):
+		size = self.cell_size
+		return int(floor(xmin / size)), int(floor(ymin / size)), int(floor(xmax / size)), int(floor(ymax / size))
+
+	def add(self, entity, bbox):
+		"""Registers entity with its bbox (xmin, ymin, xmax, ymax)."""
+		number = len(self.entities)
+		self.entities.append(entity)
+		self.layers.append(getattr(entity, 'layer', '0').upper())
+		self.boxes.extend(bbox)
+		bounds = self.bounds
+		if bounds is None:
+			self.bounds = tuple(bbox)
+		elif bbox[0] < bounds[0] or bbox[1] < bounds[1] or bbox[2] > bounds[2] or bbox[3] > bounds[3]:
+			self.bounds = (min(bounds[0], bbox[0]), min(bounds[1], bbox[1]),
+						   max(bounds[2], bbox[2]), max(bounds[3], bbox[3]))
+		c0, r0, c1, r1 = self._span(*bbox)
+		cells = self.cells
+		for column in range(c0, c1 + 1):
+			for row in range(r0, r1 + 1):
+				key = column, row
+				if key in cells:
+					cells[key].append(number)
+				else:
+					cells[key] = [number]
+
+	@staticmethod
+	def _layer_names(layers):
+		"""Returns the upper case set of a layer filter (one name or a collection), None for no filter."""
+		if layers is None:
+			return None
+		if isinstance(layers, str):
+			layers = [layers]
+		return set(name.upper() for name in layers)
+
+	def _candidates(self, xmin, ymin, xmax, ymax):
+		c0, r0, c1, r1 = self._span(xmin, ymin, xmax, ymax)
+		cells = self.cells
+		if (c1 - c0 + 1) * (r1 - r0 + 1) > len(cells): # huge window, walk the cells instead
+			return set(number for (column, row), numbers in cells.items()
+					   if c0 <= column <= c1 and r0 <= row <= r1 for number in numbers)
+		found = set()
+		for column in range(c0, c1 + 1):
+			for row in range(r0, r1 + 1):
+				numbers = cells.get((column, row))
+				if numbers:
+					found.update(numbers)
+		return found
+
+	def window(self, xmin, ymin, xmax, ymax, layers=None):
+		"""Returns the entities whose bbox intersects the window, in drawing order.
+
+		layers, if given, is a collection of layer names to keep (in any case).
+		"""
+		layers = self._layer_names(layers)
+		boxes = self.boxes
+		result = []
+		for number in sorted(self._candidates(xmin, ymin, xmax, ymax)):
+			if layers is not None and self.layers[number] not in layers:
+				continue
+			n = 4 * number
+			if boxes[n] <= xmax and boxes[n+2] >= xmin and boxes[n+1] <= ymax and boxes[n+3] >= ymin:
+				result.append(self.entities[number])
+		return result
+
+	def distance(self, number, x, y):
+		"""Distance from (x, y) to the bbox of entity number (0 inside)."""
+		n = 4 * number
+		xmin, ymin, xmax, ymax = self.boxes[n:n+4]
+		dx = xmin - x if x < xmin else (x - xmax if x > xmax else 0.0)
+		dy = ymin - y if y < ymin else (y - ymax if y > ymax else 0.0)
+		return sqrt(dx*dx + dy*dy)
+
+	def near(self, x, y, distance, layers=None):
+		"""Returns the entities whose bbox is within distance of (x, y), in drawing order."""
+		layers = self._layer_names(layers)
+		result = []
+		for number in sorted(self._candidates(x - distance, y - distance, x + distance, y + distance)):
+			if layers is not None and self.layers[number] not in layers:
+				continue
+			if self.distance(number, x, y) <= distance:
+				result.append(self.entities[number])
+		return result
+
+	def nearest(self, x, y, count=1, layers=None, max_distance=None):
+		"""Returns up to count (distance, entity) pairs closest to (x, y), by bbox distance.
+
+		The cells are searched in growing rings around the point.
+		"""
+		if not self.entities:
+			return []
+		layers = self._layer_names(layers)
+		size = self.cell_size
+		column, row = int(floor(x / size)), int(floor(y / size))
+		c0, r0, c1, r1 = self._span(*self.bounds)
+		limit = max(abs(column - c0), abs(column - c1), abs(row - r0), abs(row - r1)) + 1
+		best = {}
+		for ring in range(limit + 1):
+			for key in self._ring(column, row, ring):
+				for number in self.cells.get(key, ()):
+					if number in best or (layers is not None and self.layers[number] not in layers):
+						continue
+					best[number] = self.distance(number, x, y)
+			found = heapq.nsmallest(count, ((d, number) for number, d in best.items()))
+			# every bbox not seen yet is at least ring cells away
+			if len(found) == count and found[-1][0] <= ring * size:
+				break
+			if max_distance is not None and ring * size > max_distance:
+				break
+		found = heapq.nsmallest(count, ((d, number) for number, d in best.items()
+										if max_distance is None or d <= max_distance))
+		return [(d, self.entities[number]) for d, number in found]
+
+	@staticmethod
+	def _ring(column, row, ring):
+		if not ring:
+			yield column, row
+			return
+		for c in range(column - ring, column + ring + 1):
+			yield c, row - ring
+			yield c, row + ring
+		for r in range(row - ring + 1, row + ring):
+			yield column - ring, r
+			yield column + ring, r
+
+	def __len__(self):
+		return len(self.entities)
+
+	def __repr__(self):
+		return "%s: %d entities, %d cells of %.1f" %(self.__class__.__name__, len(self), len(self.cells), self.cell_size)
+
+
+if __name__ == "__main__":
+	print("No example yet!")